@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.config.execution import get_query_cancel_enabled
+from app.container import Container, get_container
+
+router = APIRouter(prefix="/admin")
+
+
+@router.post("/metrics/reload")
+def reload_metrics(container: Container = Depends(get_container)):
+    try:
+        changed = container.metric_reloader.reload()
+    except Exception as e:
+        # Invalid definitions never replace the serving snapshot
+        raise HTTPException(status_code=422, detail=f"Reload rejected: {e}")
+
+    return {
+        "revision": container.metric_registry.revision,
+        "changed": [f"{name}:{version}" for name, version in changed],
+    }
+
+
+@router.post("/rollups/refresh")
+def refresh_rollups(container: Container = Depends(get_container)):
+    rollup_refresher = container.rollup_refresher
+    if rollup_refresher is None:
+        raise HTTPException(status_code=404, detail="Rollups are disabled")
+
+    try:
+        refreshed = rollup_refresher.refresh()
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Rollup refresh failed: {e}")
+
+    return {"refreshed": refreshed}
+
+
+@router.post("/queries/cancel")
+async def cancel_queries(container: Container = Depends(get_container)):
+    """
+    Aborts every in-flight query on every execution backend.
+    Runs on the event loop: the tasks it cancels belong to it.
+    """
+    if not get_query_cancel_enabled():
+        raise HTTPException(status_code=404, detail="Query cancellation is disabled")
+
+    return {"cancelled": container.backends.cancel()}
+
+
+@router.get("/stats")
+def stats(container: Container = Depends(get_container)):
+    """
+    Runtime state, plus how long each warm-up phase took at startup.
+    """
+    return {
+        "admission": container.admission.stats(),
+        "databases": container.database.stats(),
+        "backends": container.backends.stats(),
+        "startup_ms": {
+            phase: round(seconds * 1000, 1)
+            for phase, seconds in container.startup_seconds.items()
+        },
+    }
@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response
+
+from app.api.query import (
+    CLIENT_CLOSED_REQUEST,
+    prepare_query,
+    rejection,
+    request_budget,
+    request_tenant,
+    stream_rows,
+)
+from app.container import Container, get_container
+from app.core.execution.admission import AdmissionRejected
+from app.core.execution.columnar import (
+    EXPORT_FORMATS,
+    ColumnarExporter,
+    ExportUnavailableError,
+)
+from app.core.execution.errors import DatabaseExecutionError
+from app.core.execution.timeout import (
+    ClientDisconnectedError,
+    QueryTimeoutError,
+    query_timeout,
+    run_until_disconnected,
+)
+
+router = APIRouter()
+
+
+@router.post("/export")
+async def export(
+    payload: dict,
+    request: Request,
+    format: str = "arrow",
+    container: Container = Depends(get_container),
+):
+    """
+    Runs the same validated QueryPlan as /query and returns the rows as an
+    Arrow IPC stream or a Parquet file. Exports are cached in their
+    serialized columnar form, so repeat downloads are served zero-copy.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}",
+        )
+
+    try:
+        exporter = ColumnarExporter(format)
+    except ExportUnavailableError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    budget = request_budget(request)
+    tenant = request_tenant(request)
+    intent, metric, compiled, window, params = prepare_query(container, payload)
+
+    async def compute():
+        async with container.admission.admit(tenant, metric.metric_name):
+            return await exporter.build(stream_rows(container, compiled, params))
+
+    try:
+        with query_timeout(budget):
+            buffer, source = await run_until_disconnected(
+                container.export_caches[format].aget_or_compute(
+                    intent, metric.version, compute,
+                    window=window, definition=metric.fingerprint(),
+                ),
+                request.is_disconnected,
+            )
+    except DatabaseExecutionError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except AdmissionRejected as e:
+        raise rejection(e)
+    except QueryTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ClientDisconnectedError:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+    filename = f"{metric.metric_name}_{metric.version}_{window.start}_{window.end}"
+    extension = "arrows" if format == "arrow" else "parquet"
+
+    return Response(
+        content=memoryview(buffer),
+        media_type=exporter.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{extension}"',
+            "X-Export-Source": source,
+        },
+    )
@@ -1,110 +1,319 @@
-from fastapi import APIRouter, HTTPException
+import json
+import math
+from datetime import date, datetime
+from decimal import Decimal
+from typing import TYPE_CHECKING, NamedTuple, Optional
 
-from app.core.explanation.builder import ExplanationBuilder
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+
+from app.config.execution import get_query_timeout_seconds
+from app.container import Container, get_container
+from app.core.enforcement.time import TimeWindow, resolve_time_window, window_params
+from app.core.execution.admission import AdmissionRejected, Ticket
+from app.core.execution.errors import DatabaseExecutionError
+from app.core.execution.timeout import (
+    ClientDisconnectedError,
+    QueryTimeoutError,
+    query_timeout,
+    run_until_disconnected,
+)
 from app.core.intent.extractor import IntentExtractionError
+from app.core.intent.schema import Intent
 from app.core.intent.validator import IntentValidationError
-from app.core.sql.validator import SQLValidationError
-
-from app.main import (
-    intent_extractor,
-    intent_validator,
-    query_plan_builder,
-    sql_generator,
-    sql_validator,
-    cache,
-    metric_registry,
-    database,   # REAL DB
-)
+from app.core.metrics.models import MetricDefinition
+from app.core.sql.errors import SQLValidationError
+from app.core.telemetry.tracing import RequestTrace, request_trace, stage
+
+if TYPE_CHECKING:
+    from app.core.execution.artifacts import CompiledQuery
 
 router = APIRouter()
-explanation_builder = ExplanationBuilder()
 
+STREAM_CHUNK_SIZE = 1000
 
-@router.post("/query")
-def query(payload: dict):
-    if "question" in payload:
-            raise HTTPException(
-                status_code=400,
-                detail=(
-                    "Free-text questions are not accepted. "
-                    "Submit structured intent JSON."
-                ),
-            )
+# Non-standard "client closed request" status, as used by nginx
+CLIENT_CLOSED_REQUEST = 499
+
+DEFAULT_TENANT = "default"
 
-    #question = payload["question"]
+
+class PreparedQuery(NamedTuple):
+    intent: Intent
+    metric: MetricDefinition
+    compiled: "CompiledQuery"
+    window: TimeWindow
+    params: dict
+
+
+def prepare_query(container: Container, payload: dict) -> PreparedQuery:
+    """
+    Shared front half of every query-shaped endpoint:
+    extract + validate intent, resolve the metric version, fetch the
+    compiled artifacts and pin the calendar window.
+    """
+    if "question" in payload:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                "Free-text questions are not accepted. "
+                "Submit structured intent JSON."
+            ),
+        )
 
     try:
         #Extract + validate intent
-        intent_payload = {
-            "metric": "revenue",
-            "version": None,
-            "time_range": "last_month",
-            "dimensions": [],
-            "requested_filters": []
-        }
-
-        #intent = intent_extractor.extract(intent_payload)
-        if "question" in payload:
-            raise HTTPException(
-                status_code=400,
-                detail=(
-                    "Free-text questions are not accepted. "
-                    "Submit structured intent JSON."
-                ),
+        with stage("intent_extract"):
+            intent = container.intent_extractor.extract(payload)
+
+        with stage("intent_validate"):
+            container.intent_validator.validate(intent)
+
+        #Resolve metric + version
+        with stage("metric_lookup"):
+            metric = container.metric_registry.get(
+                intent.metric.value,
+                intent.version.value if intent.version else None,
             )
 
-        intent = intent_extractor.extract(payload)
+        #Plan + validated SQL + explanation, memoized per query shape
+        with stage("artifact_cache"):
+            compiled = container.artifact_cache.get_or_compile(intent, metric)
 
-        intent_validator.validate(intent)
+    except IntentExtractionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        #Resolve metric + version
-        metric = metric_registry.get(
-            intent.metric.value,
-            intent.version.value if intent.version else None,
-        )
-        resolved_version = metric.version
+    except IntentValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        #Build deterministic query plan (ALWAYS)
-        plan = query_plan_builder.build(intent, metric)
+    except SQLValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        #Cache check
-        cached = cache.get(intent, resolved_version)
-        if cached is not None:
-            explanation = explanation_builder.build(intent, metric, plan)
-            return {
-                "source": "cache",
-                "result": cached,
-                "explanation": explanation,
-            }
+    #Relative range -> concrete calendar window, shared by SQL and cache key
+    window = resolve_time_window(intent.time_range.value)
 
-        #SQL generation + validation
-        sql = sql_generator.generate(plan)
-        sql_validator.validate(sql)
+    return PreparedQuery(intent, metric, compiled, window, window_params(window))
 
-        #REAL DB execution
-        rows = database.execute(sql)
 
-        # Analytics queries -> single scalar
-        result = rows[0][0] if rows else 0
+def request_budget(request: Request) -> float:
+    """
+    Time budget for this request: the server default, optionally tightened
+    (never extended) by an X-Query-Timeout header in seconds.
+    """
+    budget = get_query_timeout_seconds()
+    requested = request.headers.get("X-Query-Timeout")
+    if requested is None:
+        return budget
+
+    try:
+        seconds = float(requested)
+    except ValueError:
+        seconds = math.nan
+    if not math.isfinite(seconds) or seconds <= 0:
+        raise HTTPException(status_code=400, detail="X-Query-Timeout must be a positive number")
+
+    return min(seconds, budget)
+
+
+def database_for(container: Container, compiled: "CompiledQuery"):
+    """
+    Rollup-routed plans read the local rollup store, everything else the
+    metric's execution backend (the warehouse unless its YAML names one).
+    """
+    if compiled.plan.source == "rollup":
+        return container.rollup_database
+    return container.backends.get(compiled.plan.backend)
+
+
+def stream_rows(container: Container, compiled: "CompiledQuery", params: dict):
+    """
+    Chunked result rows, scattered across shards when the fact table is sharded.
+    """
+    sharded_executor = container.sharded_executor
+    if sharded_executor.supports(compiled.plan):
+        return sharded_executor.stream(compiled.plan, params, STREAM_CHUNK_SIZE)
+    return database_for(container, compiled).stream(compiled.sql, params, STREAM_CHUNK_SIZE)
+
+
+def request_tenant(request: Request) -> str:
+    return request.headers.get("X-Tenant-ID") or DEFAULT_TENANT
 
-        #Cache result
-        cache.set(intent, resolved_version, result)
 
-        #Deterministic explanation
-        explanation = explanation_builder.build(intent, metric, plan)
+def rejection(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=e.status_code,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)},
+    )
 
-        return {
-            "source": "computed",
-            "sql": sql,
+
+def wants_trace(request: Request) -> bool:
+    return request.headers.get("X-Debug-Trace", "").lower() in ("1", "true", "yes")
+
+
+@router.post("/query")
+async def query(
+    payload: dict,
+    request: Request,
+    container: Container = Depends(get_container),
+):
+    """
+    X-Debug-Trace: 1 adds a stage-by-stage timing breakdown ("trace").
+    1 in PROFILE_SAMPLE_EVERY requests is captured by the sampling profiler.
+    """
+    with container.profiler.sample("query"), request_trace(wants_trace(request)) as trace:
+        return await _query(container, payload, request, trace)
+
+
+async def _query(
+    container: Container,
+    payload: dict,
+    request: Request,
+    trace: Optional[RequestTrace],
+):
+    admission = container.admission
+    budget = request_budget(request)
+    tenant = request_tenant(request)
+    intent, metric, compiled, window, params = prepare_query(container, payload)
+
+    explanation = dict(compiled.explanation)
+    sql = compiled.sql
+
+    #Dimensional breakdowns stream as NDJSON; KPIs keep the scalar path.
+    #The admission slot is held until the stream finishes.
+    if compiled.plan.group_by:
+        # Resolved before admission, so a failure here holds no slot
+        chunks = stream_rows(container, compiled, params)
+        try:
+            with query_timeout(budget) as deadline:
+                ticket = await admission.acquire(tenant, metric.metric_name)
+        except AdmissionRejected as e:
+            raise rejection(e)
+        except QueryTimeoutError as e:
+            raise HTTPException(status_code=504, detail=str(e))
+
+        try:
+            return StreamingResponse(
+                _stream_grouped(
+                    chunks, sql, params, explanation,
+                    deadline.remaining(), ticket, trace,
+                ),
+                media_type="application/x-ndjson",
+                background=BackgroundTask(ticket.release),
+            )
+        except BaseException:
+            ticket.release()
+            raise
+
+    #REAL DB execution (non-blocking, admitted ahead of the pool).
+    #Concurrent misses for the same semantic key share one execution;
+    #stale entries are served immediately while they refresh.
+    executor = database_for(container, compiled)
+    sharded_executor = container.sharded_executor
+    incremental_executor = container.incremental_executor
+    sharded = sharded_executor.supports(compiled.plan)
+    incremental = (
+        not sharded
+        and incremental_executor is not None
+        and incremental_executor.supports(compiled.plan)
+    )
+
+    async def compute():
+        async with admission.admit(tenant, metric.metric_name):
+            #Sharded fact tables: scatter to relevant shards, merge partials
+            if sharded:
+                return await sharded_executor.execute(compiled.plan, params)
+
+            #Only the day buckets not cached yet hit the database
+            if incremental:
+                return await incremental_executor.execute(compiled.plan, window)
+
+            rows = await executor.execute(sql, params)
+
+        # Analytics queries -> single scalar
+        return rows[0][0] if rows else 0
+
+    #Deadline -> statement timeout + driver cancellation; a client that
+    #disconnects cancels its query too
+    try:
+        with query_timeout(budget), stage("result_cache"):
+            result, source = await run_until_disconnected(
+                container.cache.aget_or_compute(
+                    intent, metric.version, compute,
+                    window=window, definition=metric.fingerprint(),
+                ),
+                request.is_disconnected,
+            )
+    except AdmissionRejected as e:
+        raise rejection(e)
+    except QueryTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ClientDisconnectedError:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+    if source in ("cache", "stale"):
+        return _traced({
+            "source": source,
             "result": result,
             "explanation": explanation,
-        }
+        }, trace)
 
-    except IntentExtractionError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return _traced({
+        "source": source,
+        "sql": sql,
+        "params": params,
+        "result": result,
+        "explanation": explanation,
+    }, trace)
 
-    except IntentValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
 
-    except SQLValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+async def _stream_grouped(
+    chunks,
+    sql: str,
+    params: dict,
+    explanation: dict,
+    budget: float,
+    ticket: Ticket,
+    trace: Optional[RequestTrace] = None,
+):
+    """
+    NDJSON body: one header line, then one line per group-by row.
+    Rows come from a server-side cursor, STREAM_CHUNK_SIZE at a time.
+    Starlette stops iterating (closing the cursor) when the client leaves.
+    A trace in the header line covers the stages up to the first row.
+    """
+    yield _ndjson(_traced({
+        "source": "computed",
+        "sql": sql,
+        "params": params,
+        "explanation": explanation,
+    }, trace))
+
+    try:
+        with query_timeout(budget):
+            async for rows in chunks:
+                yield "".join(_ndjson(row) for row in rows)
+    except (DatabaseExecutionError, QueryTimeoutError) as e:
+        # Headers are already sent; report the failure in-band
+        yield _ndjson({"error": str(e)})
+    finally:
+        ticket.release()
+
+
+def _traced(body: dict, trace: Optional[RequestTrace]) -> dict:
+    if trace is not None:
+        body["trace"] = trace.as_dict()
+    return body
+
+
+def _ndjson(obj) -> str:
+    return json.dumps(obj, default=_json_default, separators=(",", ":")) + "\n"
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
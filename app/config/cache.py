@@ -0,0 +1,43 @@
+import os
+from pathlib import Path
+from typing import Optional
+
+
+def get_cache_l2_path() -> Optional[Path]:
+    """
+    Returns the host-local shared (L2) result cache file.
+    Off unless QUERY_CACHE_L2_PATH is set; point it at a directory only the
+    app's workers can write to.
+    """
+    path = os.getenv("QUERY_CACHE_L2_PATH", "")
+    return Path(path) if path else None
+
+
+def get_cache_ttl_seconds() -> int:
+    return int(os.getenv("QUERY_CACHE_TTL_SECONDS", "300"))
+
+
+def get_cache_stale_ttl_seconds() -> int:
+    """
+    How long an expired entry may still be served while it is refreshed.
+    0 disables stale-while-revalidate.
+    """
+    return int(os.getenv("QUERY_CACHE_STALE_TTL_SECONDS", "600"))
+
+
+def get_cache_refresh_ahead_hits_per_minute() -> Optional[float]:
+    """
+    Hit rate above which entries are refreshed before they expire.
+    Unset or empty disables refresh-ahead.
+    """
+    value = os.getenv("QUERY_CACHE_REFRESH_AHEAD_HITS_PER_MINUTE", "30")
+    return float(value) if value else None
+
+
+def get_cache_data_freshness_seconds() -> Optional[int]:
+    """
+    Upper bound on how long a calendar-window result is trusted, so late
+    arriving data still shows up. Empty means "until the window rolls over".
+    """
+    value = os.getenv("QUERY_CACHE_DATA_FRESHNESS_SECONDS", "21600")
+    return int(value) if value else None
@@ -0,0 +1,79 @@
+import os
+
+
+def get_query_timeout_seconds() -> float:
+    """
+    Default per-request time budget for /query and /export.
+    """
+    return float(os.getenv("QUERY_TIMEOUT_SECONDS", "30"))
+
+
+def get_admission_max_concurrency() -> int:
+    """
+    Queries allowed to run at once; defaults to the pool's
+    pool_size + max_overflow.
+    """
+    return int(os.getenv("ADMISSION_MAX_CONCURRENCY", "15"))
+
+
+def get_admission_max_queue() -> int:
+    """
+    Queries allowed to wait for a slot before new ones are shed with 503.
+    """
+    return int(os.getenv("ADMISSION_MAX_QUEUE", "100"))
+
+
+def get_admission_tenant_limit() -> int:
+    """
+    Running-or-queued queries per X-Tenant-ID before 429. 0 (the default)
+    disables. Requests without the header all share the "default" tenant,
+    so only enable it once callers identify themselves.
+    """
+    return int(os.getenv("ADMISSION_TENANT_LIMIT", "0"))
+
+
+def get_admission_metric_limit() -> int:
+    """
+    Running-or-queued queries per metric before 429. 0 disables.
+    """
+    return int(os.getenv("ADMISSION_METRIC_LIMIT", "0"))
+
+
+def get_bucket_cache_size() -> int:
+    """
+    Day buckets kept for incremental window computation, e.g. 65536.
+    0 (the default) disables it and every window is computed from scratch.
+    """
+    return int(os.getenv("INCREMENTAL_BUCKET_CACHE_SIZE", "0"))
+
+
+def get_bucket_settled_ttl_seconds() -> int:
+    """
+    Lifetime of day buckets old enough not to receive late rows.
+    """
+    return int(os.getenv("INCREMENTAL_SETTLED_TTL_SECONDS", "86400"))
+
+
+def get_query_partitions() -> int:
+    """
+    Concurrent sub-range queries a long scalar window is split into.
+    Only applies with day buckets on (INCREMENTAL_BUCKET_CACHE_SIZE > 0):
+    the gaps of missing days are what gets partitioned.
+    1 (the default) keeps one statement per gap. Each partition holds a
+    pooled connection, so keep it well below the pool size, and benchmark
+    it first (benchmarks/bench_partitioned_execution.py): on a single
+    core, partitioned scans are slower than one statement.
+    """
+    return int(os.getenv("QUERY_PARTITIONS", "1"))
+
+
+def get_query_min_partition_days() -> int:
+    return int(os.getenv("QUERY_MIN_PARTITION_DAYS", "7"))
+
+
+def get_query_cancel_enabled() -> bool:
+    """
+    Exposes POST /admin/queries/cancel, which aborts every in-flight query.
+    Off by default: the admin routes are not authenticated.
+    """
+    return os.getenv("ADMIN_QUERY_CANCEL_ENABLED", "").lower() in ("1", "true", "yes")
@@ -0,0 +1,22 @@
+import os
+from pathlib import Path
+from typing import Optional
+
+
+def get_metrics_watch_interval_seconds() -> Optional[float]:
+    """
+    Polling interval for hot reload of metadata/metrics.
+    Unset or 0 disables the watcher; POST /admin/metrics/reload still works.
+    """
+    value = float(os.getenv("METRICS_WATCH_INTERVAL_SECONDS", "0") or 0)
+    return value or None
+
+
+def get_metrics_snapshot_path() -> Optional[Path]:
+    """
+    Compiled registry snapshot shared by workers on the host.
+    Off unless METRICS_SNAPSHOT_PATH is set; point it at a directory only
+    the app can write to, since the snapshot's definitions are trusted.
+    """
+    path = os.getenv("METRICS_SNAPSHOT_PATH", "")
+    return Path(path) if path else None
@@ -0,0 +1,35 @@
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+def get_rollup_path() -> Optional[Path]:
+    """
+    Local store of daily pre-aggregates answered by the planner.
+    Off unless ROLLUP_PATH is set (fact tables are always scanned); point
+    it at a directory only the app can write to.
+    """
+    path = os.getenv("ROLLUP_PATH", "")
+    return Path(path) if path else None
+
+
+def get_rollup_refresh_interval_seconds() -> Optional[float]:
+    """
+    How often rollups are brought up to date in the background.
+    Unset or 0 disables it; POST /admin/rollups/refresh still works.
+    """
+    value = float(os.getenv("ROLLUP_REFRESH_INTERVAL_SECONDS", "0") or 0)
+    return value or None
+
+
+def get_rollup_dimension_sets() -> List[Tuple[str, ...]]:
+    """
+    Dimension combinations to pre-aggregate, e.g. "region;region,product".
+    The undimensioned rollup is always maintained.
+    """
+    sets = [()]
+    for part in os.getenv("ROLLUP_DIMENSIONS", "region").split(";"):
+        dims = tuple(sorted(d.strip() for d in part.split(",") if d.strip()))
+        if dims and dims not in sets:
+            sets.append(dims)
+    return sets
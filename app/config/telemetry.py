@@ -0,0 +1,19 @@
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+
+def get_profile_sample_every() -> int:
+    """
+    Profile 1 in N /query requests. 0 (the default) disables profiling.
+    """
+    return int(os.getenv("PROFILE_SAMPLE_EVERY", "0"))
+
+
+def get_profile_dir() -> Optional[Path]:
+    path = os.getenv(
+        "PROFILE_DIR",
+        str(Path(tempfile.gettempdir()) / "analytics-copilot" / "profiles"),
+    )
+    return Path(path) if path else None
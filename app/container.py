@@ -0,0 +1,459 @@
+import logging
+import os
+import time
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from fastapi import Request
+
+from app.config.cache import (
+    get_cache_data_freshness_seconds,
+    get_cache_l2_path,
+    get_cache_refresh_ahead_hits_per_minute,
+    get_cache_stale_ttl_seconds,
+    get_cache_ttl_seconds,
+)
+from app.config.database import (
+    get_async_database_url,
+    get_database_url,
+    get_duckdb_parquet_path,
+    get_duckdb_threads,
+    get_replica_health_interval_seconds,
+    get_replica_max_lag_seconds,
+    get_replica_urls,
+    get_shard_map_path,
+)
+from app.config.execution import (
+    get_admission_max_concurrency,
+    get_admission_max_queue,
+    get_admission_metric_limit,
+    get_admission_tenant_limit,
+    get_bucket_cache_size,
+    get_bucket_settled_ttl_seconds,
+    get_query_min_partition_days,
+    get_query_partitions,
+)
+from app.config.metrics import (
+    get_metrics_snapshot_path,
+    get_metrics_watch_interval_seconds,
+)
+from app.config.rollups import (
+    get_rollup_dimension_sets,
+    get_rollup_path,
+    get_rollup_refresh_interval_seconds,
+)
+from app.config.telemetry import get_profile_dir, get_profile_sample_every
+
+if TYPE_CHECKING:
+    from app.core.execution.admission import AdmissionController
+    from app.core.execution.artifacts import ArtifactCache
+    from app.core.execution.backends import ExecutionBackends
+    from app.core.execution.cache import QueryCache
+    from app.core.execution.db import AsyncDatabase
+    from app.core.execution.incremental import IncrementalExecutor
+    from app.core.execution.replicas import ReplicaRouter
+    from app.core.execution.rollups import RollupRefresher, RollupStore
+    from app.core.execution.shards import ShardedExecutor
+    from app.core.intent.extractor import IntentExtractor
+    from app.core.intent.validator import IntentValidator
+    from app.core.metrics.registry import MetricRegistry
+    from app.core.metrics.reload import MetricReloader
+    from app.core.sql.generator import SQLGenerator
+    from app.core.sql.validator import SQLValidator
+    from app.core.telemetry.profiling import SamplingProfiler
+
+logger = logging.getLogger(__name__)
+
+METRICS_PATH = Path(__file__).resolve().parents[1] / "metadata" / "metrics"
+
+
+class Container:
+    """
+    Owns every long-lived component of the app.
+
+    Components are built on first access, and the modules behind them
+    (SQLAlchemy, sqlglot, pyarrow, ...) are only imported then, so
+    importing the app and creating a container cost almost nothing.
+    start() runs the warm-up (registry load, artifact precompile, pool
+    pre-connect) and the background tasks; stop() tears down whatever
+    was built.
+
+    Keyword arguments replace components by name, e.g.
+    Container(database=fake) in tests.
+    """
+
+    def __init__(self, metrics_path: Path = METRICS_PATH, **components: Any):
+        self.metrics_path = metrics_path
+        self.startup_seconds: Dict[str, float] = {}
+        self.__dict__.update(components)
+
+    #EXECUTION
+
+    @cached_property
+    def database(self) -> "ReplicaRouter":
+        from app.core.execution.replicas import ReplicaRouter
+
+        # Primary plus optional read replicas, each with its own health-checked pool
+        return ReplicaRouter(
+            get_async_database_url(),
+            get_replica_urls(),
+            max_lag_seconds=get_replica_max_lag_seconds(),
+        )
+
+    @cached_property
+    def backends(self) -> "ExecutionBackends":
+        from app.core.execution.backends import DEFAULT_BACKEND, DuckDBBackend, ExecutionBackends
+
+        # Metrics pick an execution backend with `backend:` in their YAML
+        backends = {DEFAULT_BACKEND: self.database}
+        duckdb_parquet_path = get_duckdb_parquet_path()
+        if duckdb_parquet_path:
+            backends["duckdb"] = DuckDBBackend(duckdb_parquet_path, get_duckdb_threads())
+        return ExecutionBackends(backends)
+
+    @cached_property
+    def sharded_executor(self) -> "ShardedExecutor":
+        from app.core.execution.shards import ShardedExecutor, load_shard_map
+
+        # Fact tables listed in the shard map are scattered to their shards instead
+        return ShardedExecutor(load_shard_map(get_shard_map_path()), self.sql_validator)
+
+    @cached_property
+    def admission(self) -> "AdmissionController":
+        from app.core.execution.admission import AdmissionController
+
+        # Sheds load before it queues invisibly inside the connection pool
+        return AdmissionController(
+            max_concurrency=get_admission_max_concurrency(),
+            max_queue=get_admission_max_queue(),
+            tenant_limit=get_admission_tenant_limit(),
+            metric_limit=get_admission_metric_limit(),
+        )
+
+    @cached_property
+    def incremental_executor(self) -> Optional["IncrementalExecutor"]:
+        from app.core.execution.incremental import IncrementalExecutor
+
+        # Scalar windows are combined from cached day buckets, long gaps are
+        # fetched as concurrent sub-ranges (native SQL only)
+        if not get_bucket_cache_size() or self.sql_generator.mode != "native":
+            if get_query_partitions() > 1:
+                logger.warning(
+                    "QUERY_PARTITIONS has no effect without day buckets "
+                    "(INCREMENTAL_BUCKET_CACHE_SIZE) in native SQL mode"
+                )
+            return None
+
+        return IncrementalExecutor(
+            self.database,
+            self.sql_generator.compiler,
+            self.sql_validator,
+            maxsize=get_bucket_cache_size(),
+            settled_ttl_seconds=get_bucket_settled_ttl_seconds(),
+            recent_ttl_seconds=get_cache_ttl_seconds(),
+            partitions=get_query_partitions(),
+            min_partition_days=get_query_min_partition_days(),
+        )
+
+    #METRICS AND INTENT
+
+    @cached_property
+    def metric_registry(self) -> "MetricRegistry":
+        from app.core.metrics.registry import MetricRegistry
+
+        # Reloads are held to the same backend check as the initial load
+        registry = MetricRegistry(
+            self.metrics_path, get_metrics_snapshot_path(), check=self.backends.check
+        )
+        registry.load()
+        return registry
+
+    @cached_property
+    def metric_reloader(self) -> "MetricReloader":
+        from app.core.metrics.reload import MetricReloader
+
+        # Hot reload invalidates only the metrics/versions that changed
+        return MetricReloader(
+            self.metric_registry,
+            [self.cache.invalidate, self.artifact_cache.invalidate]
+            + [c.invalidate for c in self.export_caches.values()]
+            + ([self.rollup_store.invalidate] if self.rollup_store else [])
+            + ([self.incremental_executor.invalidate] if self.incremental_executor else []),
+        )
+
+    @cached_property
+    def intent_validator(self) -> "IntentValidator":
+        from app.core.intent.validator import IntentValidator
+
+        return IntentValidator(self.metric_registry)
+
+    @cached_property
+    def intent_extractor(self) -> "IntentExtractor":
+        from app.core.intent.extractor import IntentExtractor
+
+        return IntentExtractor(self.llm_client)
+
+    @cached_property
+    def llm_client(self):
+        from app.llm.client import LLMClient
+
+        # LLM client will be mocked initially
+        return LLMClient()
+
+    #PLANNING AND SQL
+
+    @cached_property
+    def rollup_store(self) -> Optional["RollupStore"]:
+        from app.core.execution.rollups import RollupStore
+
+        # Daily pre-aggregates; plans they can answer exactly skip the fact table
+        rollup_path = get_rollup_path()
+        return RollupStore(rollup_path) if rollup_path else None
+
+    @cached_property
+    def rollup_database(self) -> Optional["AsyncDatabase"]:
+        from app.core.execution.db import AsyncDatabase
+
+        if self.rollup_store is None:
+            return None
+        return AsyncDatabase(self.rollup_store.database_url)
+
+    @cached_property
+    def rollup_refresher(self) -> Optional["RollupRefresher"]:
+        from app.core.execution.db import Database
+        from app.core.execution.rollups import RollupRefresher
+
+        if self.rollup_store is None:
+            return None
+
+        return RollupRefresher(
+            self.rollup_store,
+            self.metric_registry,
+            Database(get_database_url()),
+            self.sql_generator.compiler,
+            self.sql_validator,
+            get_rollup_dimension_sets(),
+            [self.artifact_cache.invalidate],
+        )
+
+    @cached_property
+    def sql_generator(self) -> "SQLGenerator":
+        from app.core.execution.backends import DEFAULT_BACKEND
+        from app.core.sql.dialects import dialect_for_url
+        from app.core.sql.generator import SQLGenerator
+
+        # Native AST compilation by default; "llm" keeps the LLM assembler available
+        return SQLGenerator(
+            self.llm_client,
+            mode=os.getenv("SQL_GENERATION_MODE", "native"),
+            dialect=dialect_for_url(get_database_url()),
+            backend_dialects={
+                name: dialect
+                for name, dialect in self.backends.dialects().items()
+                if name != DEFAULT_BACKEND
+            },
+        )
+
+    @cached_property
+    def artifact_cache(self) -> "ArtifactCache":
+        from app.core.execution.artifacts import ArtifactCache
+        from app.core.explanation.builder import ExplanationBuilder
+        from app.core.planning.builder import QueryPlanBuilder
+
+        return ArtifactCache(
+            self.metric_registry,
+            QueryPlanBuilder(rollups=self.rollup_store),
+            self.sql_generator,
+            self.sql_validator,
+            ExplanationBuilder(),
+        )
+
+    @cached_property
+    def sql_validator(self) -> "SQLValidator":
+        from app.core.sql.validator import SQLValidator
+
+        # Shared by every path that sends generated SQL to a database
+        return SQLValidator()
+
+    #CACHES AND TELEMETRY
+
+    @cached_property
+    def cache(self) -> "QueryCache":
+        from app.core.execution.cache import QueryCache
+        from app.core.execution.cache_backends import SQLiteCacheBackend, database_namespace
+
+        # L2 entries are scoped to the warehouse they were computed from
+        cache_l2_path = get_cache_l2_path()
+        l2 = None
+        if cache_l2_path:
+            l2 = SQLiteCacheBackend(cache_l2_path, database_namespace(get_async_database_url()))
+        return QueryCache(
+            ttl_seconds=get_cache_ttl_seconds(),
+            l2=l2,
+            stale_ttl_seconds=get_cache_stale_ttl_seconds(),
+            refresh_ahead_hits_per_minute=get_cache_refresh_ahead_hits_per_minute(),
+            data_freshness_seconds=get_cache_data_freshness_seconds(),
+        )
+
+    @cached_property
+    def export_caches(self) -> Dict[str, "QueryCache"]:
+        from app.core.execution.cache import QueryCache
+
+        # Columnar exports, cached as serialized Arrow/Parquet buffers (memory only)
+        return {
+            export_format: QueryCache(
+                maxsize=32,
+                ttl_seconds=get_cache_ttl_seconds(),
+                data_freshness_seconds=get_cache_data_freshness_seconds(),
+                name=f"export_{export_format}",
+            )
+            for export_format in ("arrow", "parquet")
+        }
+
+    @cached_property
+    def profiler(self) -> "SamplingProfiler":
+        from app.core.telemetry.profiling import SamplingProfiler
+
+        # Opt-in cProfile capture of 1 in N requests
+        return SamplingProfiler(get_profile_dir(), get_profile_sample_every())
+
+    #LIFECYCLE
+
+    async def warm_up(self) -> Dict[str, float]:
+        """
+        Builds and primes what the first request would otherwise pay for.
+        Returns the seconds spent per phase (also kept in startup_seconds).
+        """
+        with self._phase("metric_registry"):
+            self.metric_registry
+            self.intent_validator
+
+        with self._phase("artifact_precompile"):
+            compiled = self._precompile()
+
+        # An unreachable server is ejected by the health check, not fatal
+        with self._phase("pool_connect"):
+            await self.database.check_health()
+
+        with self._phase("components"):
+            for name in ("admission", "cache", "export_caches", "sharded_executor",
+                         "incremental_executor", "metric_reloader", "rollup_refresher",
+                         "rollup_database", "intent_extractor", "profiler"):
+                getattr(self, name)
+
+        logger.info(
+            "Warm-up: %d artifacts precompiled; %s", compiled,
+            ", ".join(f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in self.startup_seconds.items()),
+        )
+        return dict(self.startup_seconds)
+
+    async def start(self) -> None:
+        await self.warm_up()
+        self._register_gauges()
+
+        self.database.start_health_checks(get_replica_health_interval_seconds())
+
+        metrics_watch_interval = get_metrics_watch_interval_seconds()
+        if metrics_watch_interval:
+            self.metric_reloader.watch(metrics_watch_interval)
+
+        rollup_refresh_interval = get_rollup_refresh_interval_seconds()
+        if self.rollup_refresher and rollup_refresh_interval:
+            self.rollup_refresher.watch(rollup_refresh_interval)
+
+    async def stop(self) -> None:
+        """
+        Stops background work and releases connections of built components only.
+        """
+        built = self.__dict__
+        if "metric_reloader" in built:
+            self.metric_reloader.stop()
+        if built.get("rollup_refresher"):
+            self.rollup_refresher.stop()
+        if "backends" in built:
+            await self.backends.dispose()
+        elif "database" in built:
+            await self.database.dispose()
+        if "sharded_executor" in built:
+            await self.sharded_executor.dispose()
+        if built.get("rollup_database"):
+            await self.rollup_database.dispose()
+
+    #INTERNAL HELPERS
+
+    def _precompile(self) -> int:
+        """
+        Compiles the plain (no dimension, no filter) shape of every metric
+        and time range the validator accepts.
+        """
+        from app.core.intent.schema import Intent, TimeRange
+        from app.core.intent.validator import IntentValidationError
+        from pydantic import ValidationError
+
+        compiled = 0
+        for metric in self.metric_registry.all_metrics():
+            for time_range in TimeRange:
+                try:
+                    intent = Intent(
+                        metric=metric.metric_name,
+                        version=metric.version,
+                        time_range=time_range,
+                    )
+                    self.intent_validator.validate(intent)
+                except (ValidationError, IntentValidationError):
+                    continue
+                self.artifact_cache.get_or_compile(intent, metric)
+                compiled += 1
+        return compiled
+
+    def _phase(self, name: str) -> "_Phase":
+        return _Phase(self.startup_seconds, name)
+
+    def _register_gauges(self) -> None:
+        from app.core.telemetry.instruments import REGISTRY, Gauge
+
+        # Scrape-time gauges: pool utilisation per server and admission queue
+        REGISTRY.register(Gauge(
+            "copilot_db_pool_connections",
+            "Pooled connections per database server and state.",
+            lambda: [
+                ((server["name"], state), server[state])
+                for server in self.database.stats()
+                for state in ("checkedout", "checkedin", "overflow")
+                if state in server
+            ],
+            labelnames=("server", "state"),
+        ))
+        REGISTRY.register(Gauge(
+            "copilot_admission_queries",
+            "Queries holding or waiting for an admission slot.",
+            lambda: [
+                (("active",), self.admission.stats()["active"]),
+                (("queued",), self.admission.stats()["queue_depth"]),
+            ],
+            labelnames=("state",),
+        ))
+
+
+class _Phase:
+    __slots__ = ("timings", "name", "started")
+
+    def __init__(self, timings: Dict[str, float], name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timings[self.name] = time.perf_counter() - self.started
+        return False
+
+
+def get_container(request: Request) -> Container:
+    """
+    FastAPI dependency: the container of the app serving the request.
+    """
+    return request.app.state.container
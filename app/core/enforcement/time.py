@@ -0,0 +1,73 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from app.core.intent.schema import TimeRange
+
+
+START_PARAM = "start_date"
+END_PARAM = "end_date"
+
+
+class TimeRangeResolutionError(Exception):
+    pass
+
+
+class TimeWindow(NamedTuple):
+    """
+    A relative time range pinned to concrete calendar boundaries.
+    The range resolves to this window until rolls_over_at.
+    """
+
+    start: date
+    end: date
+    rolls_over_at: datetime
+
+    def seconds_until_rollover(self, now: Optional[datetime] = None) -> float:
+        now = now or datetime.now()
+        return max((self.rolls_over_at - now).total_seconds(), 0.0)
+
+
+def resolve_time_window(time_range: str, today: Optional[date] = None) -> TimeWindow:
+    """
+    Resolves a relative time range to a half-open calendar window [start, end).
+    Windows are complete calendar periods that end before today.
+    """
+    today = today or date.today()
+
+    if time_range == TimeRange.last_week.value:
+        current = today - timedelta(days=today.weekday())
+        previous, following = current - timedelta(days=7), current + timedelta(days=7)
+
+    elif time_range == TimeRange.last_month.value:
+        current = today.replace(day=1)
+        previous, following = _shift_months(current, -1), _shift_months(current, 1)
+
+    elif time_range == TimeRange.last_quarter.value:
+        current = today.replace(month=3 * ((today.month - 1) // 3) + 1, day=1)
+        previous, following = _shift_months(current, -3), _shift_months(current, 3)
+
+    else:
+        raise TimeRangeResolutionError(f"Cannot resolve time range: {time_range}")
+
+    return TimeWindow(previous, current, datetime.combine(following, datetime.min.time()))
+
+
+def resolve_time_range(time_range: str, today: Optional[date] = None) -> Tuple[date, date]:
+    window = resolve_time_window(time_range, today)
+    return window.start, window.end
+
+
+def window_params(window: TimeWindow) -> Dict[str, date]:
+    """
+    Bind parameters for the time predicate emitted by the SQL compiler.
+    """
+    return {START_PARAM: window.start, END_PARAM: window.end}
+
+
+def time_range_params(time_range: str, today: Optional[date] = None) -> Dict[str, date]:
+    return window_params(resolve_time_window(time_range, today))
+
+
+def _shift_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return day.replace(year=index // 12, month=index % 12 + 1)
@@ -0,0 +1,244 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
+
+from app.core.execution.timeout import run_with_deadline
+from app.core.telemetry.tracing import stage
+
+
+class Priority(IntEnum):
+    """
+    Lower value is admitted first.
+    """
+    INTERACTIVE = 0
+    REFRESH = 1
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised instead of queueing when the request would only add latency.
+    Carries the HTTP status and a Retry-After hint for the API layer.
+    """
+
+    status_code = 503
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueueFullError(AdmissionRejected):
+    status_code = 503
+
+
+class ConcurrencyLimitError(AdmissionRejected):
+    status_code = 429
+
+
+_current_priority: ContextVar[Priority] = ContextVar(
+    "admission_priority", default=Priority.INTERACTIVE
+)
+
+
+def set_priority(priority: Priority) -> None:
+    """
+    Marks work started from the current context (e.g. a background cache
+    refresh) so it queues behind interactive requests.
+    """
+    _current_priority.set(priority)
+
+
+class Ticket:
+    """
+    One admitted unit of work. release() is idempotent, so a ticket can be
+    handed to several cleanup paths (e.g. a streaming body and its
+    background task) without double-counting.
+    """
+
+    __slots__ = ("tenant", "metric", "priority", "enqueued_at", "granted_at", "_controller")
+
+    def __init__(self, controller, tenant: str, metric: str, priority: Priority):
+        self._controller = controller
+        self.tenant = tenant
+        self.metric = metric
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.granted_at: Optional[float] = None
+
+    def release(self) -> None:
+        controller, self._controller = self._controller, None
+        if controller is not None:
+            controller._release(self)
+
+
+class AdmissionController:
+    """
+    Bounded admission in front of the database pool.
+
+    At most max_concurrency queries run at once (match it to the pool's
+    pool_size + max_overflow); up to max_queue more wait in priority order,
+    interactive before refresh, FIFO within a priority. Beyond that callers
+    are rejected immediately with QueueFullError (503).
+
+    A single tenant or metric may hold at most tenant_limit / metric_limit
+    running-or-queued tickets (0 disables); excess is rejected with
+    ConcurrencyLimitError (429) so one caller cannot fill the queue.
+
+    Not thread-safe: use it from a single event loop.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 15,
+        max_queue: int = 100,
+        tenant_limit: int = 0,
+        metric_limit: int = 0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.tenant_limit = tenant_limit
+        self.metric_limit = metric_limit
+
+        self._active = 0
+        self._queue: List[Tuple[int, int, asyncio.Future, Ticket]] = []
+        self._sequence = itertools.count()
+        self._by_tenant: Counter = Counter()
+        self._by_metric: Counter = Counter()
+
+        self._admitted = 0
+        self._rejected: Counter = Counter()
+        self._wait_count = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._hold_ewma = 0.0
+
+    @asynccontextmanager
+    async def admit(self, tenant: str, metric: str, priority: Optional[Priority] = None):
+        ticket = await self.acquire(tenant, metric, priority)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    async def acquire(
+        self, tenant: str, metric: str, priority: Optional[Priority] = None
+    ) -> Ticket:
+        """
+        Waits for a slot (bounded by the current request deadline) or
+        rejects immediately. The caller must release the returned ticket.
+        """
+        if priority is None:
+            priority = _current_priority.get()
+
+        self._check_limits(tenant, metric)
+        ticket = Ticket(self, tenant, metric, priority)
+        self._by_tenant[tenant] += 1
+        self._by_metric[metric] += 1
+
+        if self._active < self.max_concurrency and not self._queue:
+            self._grant(ticket)
+            return ticket
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), future, ticket))
+        try:
+            with stage("admission_wait"):
+                await run_with_deadline(future, "admission")
+        except BaseException:
+            if future.done() and not future.cancelled():
+                # Granted just as we gave up: hand the slot on
+                ticket.release()
+            else:
+                self._forget(ticket)
+            raise
+        return ticket
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Point-in-time queue depth and cumulative admission/wait statistics.
+        """
+        return {
+            "active": self._active,
+            "queue_depth": len(self._queue),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "admitted": self._admitted,
+            "rejected_queue_full": self._rejected["queue_full"],
+            "rejected_tenant_limit": self._rejected["tenant_limit"],
+            "rejected_metric_limit": self._rejected["metric_limit"],
+            "wait_seconds_avg": self._wait_total / self._wait_count if self._wait_count else 0.0,
+            "wait_seconds_max": self._wait_max,
+        }
+
+    #INTERNAL HELPERS
+
+    def _check_limits(self, tenant: str, metric: str) -> None:
+        if self.tenant_limit and self._by_tenant[tenant] >= self.tenant_limit:
+            self._rejected["tenant_limit"] += 1
+            raise ConcurrencyLimitError(
+                f"Tenant '{tenant}' has {self.tenant_limit} queries in flight",
+                self._retry_after(),
+            )
+
+        if self.metric_limit and self._by_metric[metric] >= self.metric_limit:
+            self._rejected["metric_limit"] += 1
+            raise ConcurrencyLimitError(
+                f"Metric '{metric}' has {self.metric_limit} queries in flight",
+                self._retry_after(),
+            )
+
+        if self._active >= self.max_concurrency and len(self._queue) >= self.max_queue:
+            self._rejected["queue_full"] += 1
+            raise QueueFullError("Query queue is full", self._retry_after())
+
+    def _retry_after(self) -> int:
+        # Roughly how long until the current backlog drains
+        backlog = (len(self._queue) + self._active) / max(self.max_concurrency, 1)
+        return max(1, math.ceil(backlog * self._hold_ewma))
+
+    def _grant(self, ticket: Ticket) -> None:
+        ticket.granted_at = time.monotonic()
+        waited = ticket.granted_at - ticket.enqueued_at
+
+        self._active += 1
+        self._admitted += 1
+        self._wait_count += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+
+    def _release(self, ticket: Ticket) -> None:
+        held = time.monotonic() - ticket.granted_at
+        self._hold_ewma = held if not self._hold_ewma else 0.8 * self._hold_ewma + 0.2 * held
+
+        self._active -= 1
+        self._untrack(ticket)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._queue and self._active < self.max_concurrency:
+            _, _, future, ticket = heapq.heappop(self._queue)
+            if future.done():
+                continue
+            self._grant(ticket)
+            future.set_result(None)
+
+    def _forget(self, ticket: Ticket) -> None:
+        self._queue = [item for item in self._queue if item[3] is not ticket]
+        heapq.heapify(self._queue)
+        self._untrack(ticket)
+
+    def _untrack(self, ticket: Ticket) -> None:
+        self._by_tenant[ticket.tenant] -= 1
+        if self._by_tenant[ticket.tenant] <= 0:
+            del self._by_tenant[ticket.tenant]
+
+        self._by_metric[ticket.metric] -= 1
+        if self._by_metric[ticket.metric] <= 0:
+            del self._by_metric[ticket.metric]
@@ -0,0 +1,125 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from cachetools import LRUCache
+from pydantic import BaseModel
+
+from app.core.enforcement.time import resolve_time_window
+from app.core.execution.cache import semantic_key
+from app.core.explanation.builder import ExplanationBuilder
+from app.core.intent.schema import Intent
+from app.core.metrics.models import MetricDefinition
+from app.core.metrics.registry import MetricRegistry
+from app.core.planning.builder import QueryPlanBuilder
+from app.core.planning.query_plan import QueryPlan
+from app.core.sql.generator import SQLGenerator
+from app.core.sql.validator import SQLValidator
+from app.core.telemetry.instruments import CACHE_LOOKUPS
+from app.core.telemetry.tracing import stage
+
+
+class CompiledQuery(BaseModel):
+    """
+    Everything derived deterministically from a query shape.
+    The SQL has already passed validation.
+    """
+
+    plan: QueryPlan
+    sql: str
+    explanation: Dict[str, str]
+
+
+class ArtifactCache:
+    """
+    Memoizes plan, validated SQL and explanation per query shape and
+    metric version. Each artifact remembers the MetricDefinition it was
+    compiled from; a reload that replaces a definition makes its artifacts
+    miss, while unchanged definitions keep theirs.
+
+    Plans routed to a rollup are only valid for the calendar window they
+    were checked against, so they expire when that window rolls over.
+    """
+
+    def __init__(
+        self,
+        metric_registry: MetricRegistry,
+        plan_builder: QueryPlanBuilder,
+        sql_generator: SQLGenerator,
+        sql_validator: SQLValidator,
+        explanation_builder: ExplanationBuilder,
+        maxsize: int = 1024,
+    ):
+        self.metric_registry = metric_registry
+        self.plan_builder = plan_builder
+        self.sql_generator = sql_generator
+        self.sql_validator = sql_validator
+        self.explanation_builder = explanation_builder
+
+        self._artifacts = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def get_or_compile(self, intent: Intent, metric: MetricDefinition) -> CompiledQuery:
+        key = semantic_key(intent, metric.version)
+
+        with self._lock:
+            cached = self._artifacts.get(key)
+
+        if (
+            cached is not None
+            and cached[0] is metric
+            and (cached[2] is None or time.time() < cached[2])
+        ):
+            CACHE_LOOKUPS.inc("artifacts", "hit")
+            return cached[1]
+
+        CACHE_LOOKUPS.inc("artifacts", "miss")
+
+        # Compilation errors propagate and are never memoized
+        compiled = self._compile(intent, metric)
+
+        with self._lock:
+            self._artifacts[key] = (metric, compiled, self._expires_at(compiled))
+
+        return compiled
+
+    def invalidate(self, metric_name: str, version: Optional[str] = None) -> int:
+        with self._lock:
+            stale = [
+                key for key in self._artifacts
+                if key[0] == metric_name and (version is None or key[1] == version)
+            ]
+            for key in stale:
+                del self._artifacts[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._artifacts.clear()
+
+    def __len__(self) -> int:
+        return len(self._artifacts)
+
+    #INTERNAL HELPERS
+
+    def _expires_at(self, compiled: CompiledQuery) -> Optional[float]:
+        if compiled.plan.source != "rollup":
+            return None
+        return resolve_time_window(compiled.plan.time_range).rolls_over_at.timestamp()
+
+    def _compile(self, intent: Intent, metric: MetricDefinition) -> CompiledQuery:
+        with stage("plan_build"):
+            plan = self.plan_builder.build(intent, metric)
+
+        # Validate the tree we built; render text only once it has passed
+        with stage("sql_generate"):
+            ast = self.sql_generator.generate_ast(plan)
+        with stage("sql_validate"):
+            self.sql_validator.validate(ast)
+        with stage("sql_generate"):
+            sql = self.sql_generator.render(ast, plan.backend)
+
+        with stage("explanation_build"):
+            explanation = self.explanation_builder.build(intent, metric, plan)
+
+        return CompiledQuery(plan=plan, sql=sql, explanation=explanation)
@@ -0,0 +1,286 @@
+import asyncio
+import threading
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Protocol, Tuple
+
+from app.core.execution.db import DatabaseExecutionError
+from app.core.execution.timeout import run_with_deadline
+from app.core.metrics.models import DEFAULT_BACKEND, MetricDefinition
+from app.core.telemetry.instruments import ROWS_RETURNED
+from app.core.telemetry.tracing import stage
+
+# Optional dependency, only needed for the duckdb backend; imported when
+# that backend is configured, since ExecutionBackends is built on every
+# start (see _load_duckdb)
+duckdb = None
+
+
+class ExecutionBackend(Protocol):
+    """
+    Where compiled SQL runs. AsyncDatabase and ReplicaRouter (SQLAlchemy)
+    and DuckDBBackend implement it.
+    """
+
+    @property
+    def dialect(self) -> str:
+        """sqlglot dialect plans are compiled to for this backend."""
+
+    async def execute(self, sql: str, params: Optional[dict] = None) -> List[Any]:
+        """All rows; row[0] and row._mapping work as on SQLAlchemy rows."""
+
+    def stream(
+        self, sql: str, params: Optional[dict] = None, chunk_size: int = 1000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Rows as dicts, chunk_size at a time."""
+
+    def cancel(self) -> int:
+        """Cancels in-flight queries; returns how many."""
+
+    def stats(self) -> Any:
+        """JSON-serializable state for /stats."""
+
+    async def dispose(self) -> None:
+        """Releases connections."""
+
+
+class UnknownBackendError(Exception):
+    pass
+
+
+class BackendUnavailableError(Exception):
+    pass
+
+
+class ExecutionBackends:
+    """
+    Named execution backends. A metric selects one with `backend:` in its
+    YAML; plans of metrics without one run on DEFAULT_BACKEND.
+    """
+
+    def __init__(self, backends: Dict[str, ExecutionBackend]):
+        if DEFAULT_BACKEND not in backends:
+            raise ValueError(f"The '{DEFAULT_BACKEND}' backend is required")
+        self._backends = dict(backends)
+
+    def get(self, name: Optional[str] = None) -> ExecutionBackend:
+        backend = self._backends.get(name or DEFAULT_BACKEND)
+        if backend is None:
+            raise UnknownBackendError(f"Execution backend '{name}' is not configured")
+        return backend
+
+    def dialects(self) -> Dict[str, str]:
+        return {name: backend.dialect for name, backend in self._backends.items()}
+
+    def check(self, metrics: Iterable[MetricDefinition]) -> None:
+        """
+        Fails fast when a metric names a backend that is not configured.
+        """
+        for metric in metrics:
+            if metric.backend is not None and metric.backend not in self._backends:
+                raise UnknownBackendError(
+                    f"Metric {metric.metric_name}:{metric.version} uses backend "
+                    f"'{metric.backend}', which is not configured"
+                )
+
+    def cancel(self) -> Dict[str, int]:
+        return {name: backend.cancel() for name, backend in self._backends.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: backend.stats() for name, backend in self._backends.items()}
+
+    async def dispose(self) -> None:
+        for backend in self._backends.values():
+            await backend.dispose()
+
+
+class Record(tuple):
+    """
+    Result row with the positional and ._mapping access of a SQLAlchemy Row.
+    """
+
+    def __new__(cls, values, keys: Tuple[str, ...]):
+        record = super().__new__(cls, values)
+        record._keys = keys
+        return record
+
+    @property
+    def _mapping(self) -> Dict[str, Any]:
+        return dict(zip(self._keys, self))
+
+
+class DuckDBBackend:
+    """
+    Embedded columnar engine over local Parquet extracts of the fact and
+    dimension tables.
+
+    Every <table>.parquet file and <table>/ directory of Parquet files
+    under `path` is exposed as a view named <table>, so the SQL compiled
+    for the warehouse schema runs unchanged (in the duckdb dialect).
+
+    Each query runs on a worker thread with its own cursor, at most
+    max_concurrency at a time; deadline expiry, client disconnects and
+    cancel() interrupt the running statement.
+    """
+
+    dialect = "duckdb"
+
+    def __init__(self, path: Path, threads: int = 0, max_concurrency: int = 4):
+        if not _load_duckdb():
+            raise BackendUnavailableError("The duckdb backend requires the duckdb package")
+
+        self.path = Path(path)
+        self.connection = duckdb.connect(":memory:")
+        if threads:
+            self.connection.execute(f"SET threads = {int(threads)}")
+
+        self.tables = {}
+        for table, source in _parquet_sources(self.path):
+            self.connection.execute(
+                f'CREATE VIEW "{table}" AS SELECT * FROM read_parquet(\'{source}\')'
+            )
+            self.tables[table] = source
+
+        self.max_concurrency = max_concurrency
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._cursors = set()
+        self._lock = threading.Lock()
+        self._queries = 0
+
+    async def execute(self, sql: str, params: Optional[dict] = None) -> List[Record]:
+        with stage("db_execute"):
+            rows = await run_with_deadline(self._run(self._fetch_all, sql, params), "database")
+        ROWS_RETURNED.observe(len(rows))
+        return rows
+
+    async def stream(
+        self, sql: str, params: Optional[dict] = None, chunk_size: int = 1000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        total = 0
+        async with self._slots:
+            cursor = self._open()
+            try:
+                keys = await run_with_deadline(
+                    self._in_thread(cursor, self._start, cursor, sql, params), "database"
+                )
+                while True:
+                    rows = await run_with_deadline(
+                        self._in_thread(cursor, cursor.fetchmany, chunk_size), "database"
+                    )
+                    if not rows:
+                        break
+                    total += len(rows)
+                    yield [dict(zip(keys, row)) for row in rows]
+            finally:
+                self._close(cursor)
+
+        ROWS_RETURNED.observe(total)
+
+    def cancel(self) -> int:
+        with self._lock:
+            cursors = list(self._cursors)
+        for cursor in cursors:
+            cursor.interrupt()
+        return len(cursors)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "duckdb",
+            "path": str(self.path),
+            "tables": sorted(self.tables),
+            "in_flight": len(self._cursors),
+            "max_concurrency": self.max_concurrency,
+            "queries": self._queries,
+        }
+
+    async def dispose(self) -> None:
+        self.cancel()
+        self.connection.close()
+
+    #INTERNAL HELPERS
+
+    async def _run(self, call, sql: str, params: Optional[dict]):
+        async with self._slots:
+            cursor = self._open()
+            try:
+                return await self._in_thread(cursor, call, cursor, sql, params)
+            finally:
+                self._close(cursor)
+
+    async def _in_thread(self, cursor, call, *args):
+        try:
+            return await asyncio.to_thread(call, *args)
+        except asyncio.CancelledError:
+            # The worker thread cannot be cancelled; stop its statement instead
+            cursor.interrupt()
+            raise
+        except duckdb.Error as e:
+            raise DatabaseExecutionError(str(e))
+
+    def _open(self):
+        cursor = self.connection.cursor()
+        with self._lock:
+            self._cursors.add(cursor)
+            self._queries += 1
+        return cursor
+
+    def _close(self, cursor) -> None:
+        with self._lock:
+            self._cursors.discard(cursor)
+
+    def _start(self, cursor, sql: str, params: Optional[dict]) -> Tuple[str, ...]:
+        cursor.execute(dollar_params(sql), params or {})
+        return tuple(column[0] for column in cursor.description)
+
+    def _fetch_all(self, cursor, sql: str, params: Optional[dict]) -> List[Record]:
+        keys = self._start(cursor, sql, params)
+        return [Record(row, keys) for row in cursor.fetchall()]
+
+
+def dollar_params(sql: str) -> str:
+    """
+    Rewrites SQLAlchemy-style :name binds to DuckDB's $name, leaving
+    string literals, quoted identifiers and :: casts alone.
+    """
+    out = []
+    quote = None
+    i = 0
+    while i < len(sql):
+        char = sql[i]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char == ":" and sql.startswith("::", i):
+            out.append("::")
+            i += 2
+            continue
+        elif char == ":" and i + 1 < len(sql) and (sql[i + 1].isalpha() or sql[i + 1] == "_"):
+            char = "$"
+        out.append(char)
+        i += 1
+    return "".join(out)
+
+
+def _parquet_sources(path: Path) -> List[Tuple[str, str]]:
+    if not path.is_dir():
+        raise ValueError(f"Parquet extract directory not found: {path}")
+
+    sources = []
+    for entry in sorted(path.iterdir()):
+        if entry.is_file() and entry.suffix == ".parquet":
+            sources.append((entry.stem, str(entry)))
+        elif entry.is_dir() and any(entry.glob("*.parquet")):
+            sources.append((entry.name, str(entry / "*.parquet")))
+    return [(table, source.replace("'", "''")) for table, source in sources]
+
+
+def _load_duckdb() -> bool:
+    global duckdb
+    if duckdb is None:
+        try:
+            import duckdb as module
+        except ImportError:
+            return False
+        duckdb = module
+    return True
@@ -1,30 +1,462 @@
-from typing import Any, Tuple
-from cachetools import TTLCache
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+from cachetools import TLRUCache
 
+from app.core.enforcement.time import TimeWindow
+from app.core.execution.cache_backends import CacheBackend, serialize_key
+from app.core.execution.admission import Priority, set_priority
+from app.core.execution.timeout import QueryTimeoutError, detach_deadline
 from app.core.intent.schema import Intent
+from app.core.telemetry.instruments import CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+# get_or_compute source -> copilot_cache_lookups_total result label
+LOOKUP_RESULTS = {
+    "cache": "hit",
+    "stale": "stale",
+    "computed": "miss",
+    "coalesced": "coalesced",
+}
+
+
+class _FlightAbandoned(Exception):
+    """
+    Set on a flight whose leader was cancelled (e.g. its client went away)
+    or ran out of its own time budget. Waiters retry under their own
+    deadline instead of failing with someone else's cancellation.
+    """
+
+
+def semantic_key(intent: Intent, metric_version: str) -> Tuple[Any, ...]:
+    """
+    Order-independent identity of a query shape at a resolved metric version.
+    """
+    return (
+        intent.metric.value,
+        metric_version,
+        intent.time_range.value,
+        tuple(sorted(d.value for d in intent.dimensions)),
+        tuple(sorted(f.value for f in intent.requested_filters)),
+    )
+
+
+class CacheEntry:
+    """
+    A cached result with its freshness window.
+    Between fresh_until and stale_until it may still be served as stale.
+    """
+
+    __slots__ = ("value", "stored_at", "fresh_until", "stale_until", "hits")
+
+    def __init__(self, value: Any, stored_at: float, fresh_until: float, stale_until: float):
+        self.value = value
+        self.stored_at = stored_at
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+        self.hits = 0
+
+    def to_record(self) -> list:
+        return [self.value, self.stored_at, self.fresh_until, self.stale_until]
+
+    @classmethod
+    def from_record(cls, record) -> Optional["CacheEntry"]:
+        """
+        Rebuilds an entry read from L2; anything malformed is a miss.
+        """
+        if not isinstance(record, list) or len(record) != 4:
+            return None
+        return cls(*record)
 
 
 class QueryCache:
     """
     Deterministic cache keyed by semantic intent, not SQL text.
+
+    Misses are single-flight: the first caller for a key computes the value,
+    concurrent callers for the same key wait on that in-flight result.
+    Failures are propagated to every waiter and never cached.
+
+    The in-process cache is L1. An optional shared backend acts as L2,
+    so workers on the same host share results and restarts start warm.
+    The asyncio path does its L2 I/O in a worker thread, never on the loop.
+
+    Callers that pass the metric's fingerprint() as `definition` never get
+    a result computed with another definition of the same version, e.g. by
+    a flight that finished after a hot reload.
+
+    Callers that pass the resolved TimeWindow get calendar-aware keys: the
+    entry lives until the window rolls over (bounded by data_freshness_seconds
+    when set) instead of the flat ttl_seconds.
+
+    With stale_ttl_seconds > 0, expired entries are served as "stale" for
+    that long while a background refresh recomputes them. Entries hit more
+    often than refresh_ahead_hits_per_minute are refreshed before they
+    expire, once refresh_ahead_fraction of their freshness has elapsed.
     """
 
-    def __init__(self, maxsize: int = 512, ttl_seconds: int = 300):
-        self._cache = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+    def __init__(
+        self,
+        maxsize: int = 512,
+        ttl_seconds: int = 300,
+        l2: Optional[CacheBackend] = None,
+        stale_ttl_seconds: int = 0,
+        refresh_ahead_hits_per_minute: Optional[float] = None,
+        refresh_ahead_fraction: float = 0.8,
+        data_freshness_seconds: Optional[int] = None,
+        name: str = "query",
+    ):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.data_freshness_seconds = data_freshness_seconds
+        self.stale_ttl_seconds = stale_ttl_seconds
+        self.refresh_ahead_hits_per_minute = refresh_ahead_hits_per_minute
+        self.refresh_ahead_fraction = refresh_ahead_fraction
+        self.l2 = l2
 
-    def _make_key(self, intent: Intent, metric_version: str) -> Tuple[Any, ...]:
-        return (
-            intent.metric.value,
-            metric_version,
-            intent.time_range.value,
-            tuple(sorted(d.value for d in intent.dimensions)),
-            tuple(sorted(f.value for f in intent.requested_filters)),
+        self._cache = TLRUCache(
+            maxsize=maxsize,
+            ttu=lambda key, entry, now: entry.stale_until,
+            timer=time.time,
         )
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple[Any, ...], Future] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    def _make_key(
+        self,
+        intent: Intent,
+        metric_version: str,
+        window: Optional[TimeWindow] = None,
+        definition: Optional[str] = None,
+    ) -> Tuple[Any, ...]:
+        key = semantic_key(intent, metric_version)
+        if window is not None:
+            key += (window.start.isoformat(), window.end.isoformat())
+        if definition is not None:
+            key += (definition,)
+        return key
+
+    def get(
+        self,
+        intent: Intent,
+        metric_version: str,
+        window: Optional[TimeWindow] = None,
+        definition: Optional[str] = None,
+    ):
+        """
+        Returns a fresh value or None. Stale entries are not returned here.
+        """
+        key = self._make_key(intent, metric_version, window, definition)
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(key)
+
+        if entry is None:
+            entry = self._promote(key)
+
+        if entry is None or now >= entry.fresh_until:
+            return None
+        return entry.value
+
+    def set(
+        self,
+        intent: Intent,
+        metric_version: str,
+        value,
+        window: Optional[TimeWindow] = None,
+        definition: Optional[str] = None,
+    ):
+        self._store(self._make_key(intent, metric_version, window, definition), value, window)
+
+    def invalidate(self, metric_name: str, version: Optional[str] = None) -> int:
+        """
+        Drops every entry of a metric (optionally a single version) from L1 and L2.
+        Returns the number of L1 entries removed.
+        """
+        with self._lock:
+            stale = [
+                key for key in list(self._cache.keys())
+                if key[0] == metric_name and (version is None or key[1] == version)
+            ]
+            for key in stale:
+                self._cache.pop(key, None)
+
+        if self.l2 is not None:
+            self.l2.invalidate(metric_name, version)
+
+        return len(stale)
+
+    def get_or_compute(
+        self,
+        intent: Intent,
+        metric_version: str,
+        compute: Callable[[], Any],
+        window: Optional[TimeWindow] = None,
+        definition: Optional[str] = None,
+    ) -> Tuple[Any, str]:
+        """
+        Thread-safe single-flight lookup.
+        Returns (value, source) where source is cache, stale, computed or coalesced.
+        """
+        key = self._make_key(intent, metric_version, window, definition)
+        while True:
+            entry, flight, leader = self._claim(key)
+            if entry is not None or leader:
+                break
+            try:
+                return self._record(flight.result(), "coalesced")
+            except _FlightAbandoned:
+                continue
+
+        if entry is None:
+            try:
+                entry = self._promote(key)
+            except BaseException as e:
+                self._fail(key, flight, e)
+                raise
+            if entry is not None:
+                self._release(key, flight, entry.value)
+
+        if entry is not None:
+            value, source = self._serve(entry)
+            if source == "stale" or self._wants_refresh_ahead(entry):
+                self._refresh_in_thread(key, compute, window)
+            return self._record(value, source)
+
+        try:
+            value = compute()
+        except BaseException as e:
+            self._fail(key, flight, e)
+            raise
+
+        self._complete(key, flight, value, window)
+        return self._record(value, "computed")
+
+    async def aget_or_compute(
+        self,
+        intent: Intent,
+        metric_version: str,
+        compute: Callable[[], Awaitable[Any]],
+        window: Optional[TimeWindow] = None,
+        definition: Optional[str] = None,
+    ) -> Tuple[Any, str]:
+        """
+        Asyncio counterpart of get_or_compute.
+        Shares in-flight state with threaded callers of the same cache.
+        """
+        key = self._make_key(intent, metric_version, window, definition)
+        while True:
+            entry, flight, leader = self._claim(key)
+            if entry is not None or leader:
+                break
+            try:
+                # shield: a cancelled waiter must not cancel the shared flight
+                value = await asyncio.shield(asyncio.wrap_future(flight))
+                return self._record(value, "coalesced")
+            except _FlightAbandoned:
+                continue
+
+        if entry is None and self.l2 is not None:
+            try:
+                entry = await asyncio.to_thread(self._promote, key)
+            except BaseException as e:
+                self._fail(key, flight, e)
+                raise
+            if entry is not None:
+                self._release(key, flight, entry.value)
+
+        if entry is not None:
+            value, source = self._serve(entry)
+            if source == "stale" or self._wants_refresh_ahead(entry):
+                self._refresh_in_task(key, compute, window)
+            return self._record(value, source)
+
+        try:
+            value = await compute()
+        except BaseException as e:
+            self._fail(key, flight, e)
+            raise
+
+        await self._acomplete(key, flight, value, window)
+        return self._record(value, "computed")
+
+    #INTERNAL HELPERS
+
+    def _record(self, value, source: str) -> Tuple[Any, str]:
+        CACHE_LOOKUPS.inc(self.name, LOOKUP_RESULTS[source])
+        return value, source
+
+    def _claim(self, key):
+        """
+        Returns (entry, flight, leader) under a single lock acquisition.
+        A present entry (fresh or stale) means no flight was claimed.
+        """
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                entry.hits += 1
+                return entry, None, False
+
+            flight = self._inflight.get(key)
+            if flight is not None:
+                return None, flight, False
+
+            flight = Future()
+            self._inflight[key] = flight
+            return None, flight, True
+
+    def _serve(self, entry: CacheEntry) -> Tuple[Any, str]:
+        if time.time() < entry.fresh_until:
+            return entry.value, "cache"
+        return entry.value, "stale"
+
+    def _wants_refresh_ahead(self, entry: CacheEntry) -> bool:
+        if self.refresh_ahead_hits_per_minute is None:
+            return False
+
+        now = time.time()
+        lifetime = entry.fresh_until - entry.stored_at
+        if now < entry.stored_at + self.refresh_ahead_fraction * lifetime:
+            return False
+
+        minutes = max(now - entry.stored_at, 1.0) / 60
+        return entry.hits / minutes >= self.refresh_ahead_hits_per_minute
+
+    def _claim_refresh(self, key) -> Optional[Future]:
+        with self._lock:
+            if key in self._inflight:
+                return None
+            flight = Future()
+            self._inflight[key] = flight
+            return flight
+
+    def _refresh_in_task(
+        self, key, compute: Callable[[], Awaitable[Any]], window: Optional[TimeWindow]
+    ) -> None:
+        flight = self._claim_refresh(key)
+        if flight is None:
+            return
+
+        async def refresh():
+            # Not bound by the deadline of the request that triggered it,
+            # and queued behind interactive traffic
+            detach_deadline()
+            set_priority(Priority.REFRESH)
+            try:
+                value = await compute()
+            except Exception as e:
+                logger.warning("Background refresh failed for %s: %s", key, e)
+                self._fail(key, flight, e)
+                return
+            await self._acomplete(key, flight, value, window)
+
+        def done(task: asyncio.Task) -> None:
+            self._background.discard(task)
+            # Cancelled (shutdown, client disconnect), possibly before it
+            # ever ran: waiters retry instead of waiting forever
+            if not flight.done():
+                self._fail(key, flight, _FlightAbandoned())
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        self._background.add(task)
+        task.add_done_callback(done)
+
+    def _refresh_in_thread(
+        self, key, compute: Callable[[], Any], window: Optional[TimeWindow]
+    ) -> None:
+        flight = self._claim_refresh(key)
+        if flight is None:
+            return
+
+        def refresh():
+            try:
+                value = compute()
+            except Exception as e:
+                logger.warning("Background refresh failed for %s: %s", key, e)
+                self._fail(key, flight, e)
+                return
+            except BaseException:
+                self._fail(key, flight, _FlightAbandoned())
+                raise
+            self._complete(key, flight, value, window)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _fresh_until(self, now: float, window: Optional[TimeWindow]) -> float:
+        if window is None:
+            return now + self.ttl_seconds
+
+        # The answer only changes when the calendar window rolls over
+        fresh_until = window.rolls_over_at.timestamp()
+        if self.data_freshness_seconds is not None:
+            fresh_until = min(fresh_until, now + self.data_freshness_seconds)
+        return fresh_until
+
+    def _store(self, key, value, window: Optional[TimeWindow] = None) -> CacheEntry:
+        entry = self._store_l1(key, value, window)
+        self._store_l2(key, entry)
+        return entry
+
+    def _store_l1(self, key, value, window: Optional[TimeWindow]) -> CacheEntry:
+        now = time.time()
+        fresh_until = self._fresh_until(now, window)
+        entry = CacheEntry(value, now, fresh_until, fresh_until + self.stale_ttl_seconds)
+
+        with self._lock:
+            self._cache[key] = entry
+        return entry
+
+    def _store_l2(self, key, entry: CacheEntry) -> None:
+        if self.l2 is not None:
+            self.l2.set(
+                serialize_key(key), entry.to_record(),
+                entry.stale_until - time.time(), key[0], key[1],
+            )
+
+    def _complete(self, key, flight: Future, value, window: Optional[TimeWindow] = None) -> None:
+        try:
+            self._store(key, value, window)
+        finally:
+            self._release(key, flight, value)
+
+    async def _acomplete(
+        self, key, flight: Future, value, window: Optional[TimeWindow] = None
+    ) -> None:
+        # Waiters are released from L1 before the L2 write
+        entry = self._store_l1(key, value, window)
+        self._release(key, flight, value)
+        if self.l2 is not None:
+            await asyncio.to_thread(self._store_l2, key, entry)
+
+    def _release(self, key, flight: Future, value) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+        flight.set_result(value)
+
+    def _promote(self, key) -> Optional[CacheEntry]:
+        """
+        L2 lookup; hits are copied into L1.
+        """
+        if self.l2 is None:
+            return None
+
+        entry = CacheEntry.from_record(self.l2.get(serialize_key(key)))
+        if entry is None:
+            return None
 
-    def get(self, intent: Intent, metric_version: str):
-        key = self._make_key(intent, metric_version)
-        return self._cache.get(key)
+        with self._lock:
+            self._cache[key] = entry
+        return entry
 
-    def set(self, intent: Intent, metric_version: str, value):
-        key = self._make_key(intent, metric_version)
-        self._cache[key] = value
+    def _fail(self, key, flight: Future, error: BaseException) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+        # The leader's deadline is its own (X-Query-Timeout can only tighten it)
+        if isinstance(error, (asyncio.CancelledError, QueryTimeoutError)):
+            error = _FlightAbandoned()
+        flight.set_exception(error)
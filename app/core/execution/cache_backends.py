@@ -0,0 +1,186 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def serialize_key(key: Tuple[Any, ...]) -> str:
+    """
+    Stable text form of a semantic cache key, identical in every worker.
+    """
+    return json.dumps(key, separators=(",", ":"))
+
+
+def database_namespace(database_url: str) -> str:
+    """
+    Short stable identity of the database a cache's results came from, so
+    deployments that share a host but not a warehouse never share entries.
+    """
+    return hashlib.blake2b(database_url.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def encode_value(value: Any) -> str:
+    """
+    JSON with exact decimals. Values stay data: reading one back can never
+    run code, unlike pickle. Raises TypeError for anything else.
+    """
+    return json.dumps(value, default=_encode_default, separators=(",", ":"))
+
+
+def decode_value(text: str) -> Any:
+    return json.loads(text, object_hook=_decode_object)
+
+
+class CacheBackend(ABC):
+    """
+    Shared (L2) result store behind the in-process QueryCache.
+
+    Implementations must be safe to use from several processes at once.
+    A Redis-like service only needs to provide these operations.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the stored value, or None when missing or expired."""
+
+    @abstractmethod
+    def set(
+        self, key: str, value: Any, ttl_seconds: float, metric: str, version: str
+    ) -> None:
+        ...
+
+    @abstractmethod
+    def invalidate(self, metric: str, version: Optional[str] = None) -> int:
+        """Drops every entry of a metric (optionally one version). Returns count."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Host-local L2 cache in a SQLite file (WAL mode).
+    Shared by all workers on the host and survives restarts.
+    Values are stored as JSON (encode_value) and keys are prefixed with
+    `namespace`, usually database_namespace() of the warehouse URL.
+    Storage and decoding errors degrade to cache misses; they never fail
+    a query or an invalidation.
+    """
+
+    PURGE_EVERY = 256
+
+    def __init__(self, path: Path, namespace: str = ""):
+        self.path = Path(path)
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self.namespace = namespace
+        self._local = threading.local()
+        self._writes = 0
+
+        with self._connection() as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS query_cache (
+                    key TEXT PRIMARY KEY,
+                    metric TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS query_cache_metric "
+                "ON query_cache (metric, version)"
+            )
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM query_cache WHERE key = ?",
+                (self._key(key),),
+            ).fetchone()
+            if row is None or row[1] <= time.time():
+                return None
+            return decode_value(row[0])
+        except (sqlite3.Error, ValueError, TypeError) as e:
+            logger.warning("L2 cache read failed, treating as a miss: %s", e)
+            return None
+
+    def set(
+        self, key: str, value: Any, ttl_seconds: float, metric: str, version: str
+    ) -> None:
+        try:
+            encoded = encode_value(value)
+            connection = self._connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO query_cache "
+                "(key, metric, version, value, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (self._key(key), metric, version, encoded, time.time() + ttl_seconds),
+            )
+
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                connection.execute(
+                    "DELETE FROM query_cache WHERE expires_at <= ?", (time.time(),)
+                )
+        except (sqlite3.Error, ValueError, TypeError) as e:
+            logger.warning("L2 cache write skipped: %s", e)
+
+    def invalidate(self, metric: str, version: Optional[str] = None) -> int:
+        # Every namespace on the host: dropping too much is only a miss
+        try:
+            if version is None:
+                cursor = self._connection().execute(
+                    "DELETE FROM query_cache WHERE metric = ?", (metric,)
+                )
+            else:
+                cursor = self._connection().execute(
+                    "DELETE FROM query_cache WHERE metric = ? AND version = ?",
+                    (metric, version),
+                )
+        except sqlite3.Error as e:
+            logger.warning("L2 cache invalidation of %s failed: %s", metric, e)
+            return 0
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        try:
+            self._connection().execute("DELETE FROM query_cache")
+        except sqlite3.Error as e:
+            logger.warning("L2 cache clear failed: %s", e)
+
+    #INTERNAL HELPERS
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}" if self.namespace else key
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shareable across threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+
+def _encode_default(value):
+    if isinstance(value, Decimal):
+        return {"$decimal": str(value)}
+    raise TypeError(f"Not cacheable in L2: {type(value).__name__}")
+
+
+def _decode_object(obj):
+    if obj.keys() == {"$decimal"}:
+        return Decimal(obj["$decimal"])
+    return obj
@@ -0,0 +1,108 @@
+from typing import Any, AsyncIterator, Dict, List
+
+# Optional dependency, only needed for exports; imported on first use
+# since it is the heaviest import of the app (see _load_pyarrow)
+pa = None
+pq = None
+
+
+EXPORT_FORMATS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class ExportUnavailableError(Exception):
+    pass
+
+
+class ColumnarExporter:
+    """
+    Builds Arrow IPC stream or Parquet bytes from chunked cursor output.
+    Each chunk becomes one record batch; rows are never materialized as
+    a whole. The result is a pyarrow Buffer that can be cached and served
+    without copying.
+
+    Column types are inferred from the data. Batches are held back while
+    some column has only been NULL so far, so a later chunk decides its
+    type; after that the schema is fixed and later chunks are cast to it.
+    Inferred decimals are widened to the full decimal128 precision, since
+    the first values seen say nothing about how large later ones get.
+    """
+
+    def __init__(self, export_format: str):
+        if not _load_pyarrow():
+            raise ExportUnavailableError("Columnar export requires pyarrow")
+        if export_format not in EXPORT_FORMATS:
+            raise ExportUnavailableError(f"Unsupported export format: {export_format}")
+
+        self.export_format = export_format
+
+    @property
+    def media_type(self) -> str:
+        return EXPORT_FORMATS[self.export_format]
+
+    async def build(self, chunks: AsyncIterator[List[Dict[str, Any]]]) -> "pa.Buffer":
+        sink = pa.BufferOutputStream()
+        writer = None
+        schema = None
+        pending = []
+
+        async for rows in chunks:
+            if writer is not None:
+                writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+                continue
+
+            batch = pa.RecordBatch.from_pylist(rows)
+            batch = batch.cast(_widen_decimals(batch.schema))
+            schema = batch.schema if schema is None else pa.unify_schemas([schema, batch.schema])
+            pending.append(batch)
+            if not _has_null_columns(schema):
+                writer = self._open(sink, schema)
+                self._write_pending(writer, pending, schema)
+
+        if writer is None:
+            # Still-NULL-only columns stay NULL-typed
+            schema = schema if schema is not None else pa.schema([])
+            writer = self._open(sink, schema)
+            self._write_pending(writer, pending, schema)
+        writer.close()
+
+        return sink.getvalue()
+
+    #INTERNAL HELPERS
+
+    @staticmethod
+    def _write_pending(writer, pending: list, schema) -> None:
+        for batch in pending:
+            writer.write_batch(batch.cast(schema))
+        pending.clear()
+
+    def _open(self, sink, schema):
+        if self.export_format == "parquet":
+            return pq.ParquetWriter(sink, schema)
+        return pa.ipc.new_stream(sink, schema)
+
+
+def _widen_decimals(schema) -> "pa.Schema":
+    return pa.schema([
+        field.with_type(pa.decimal128(38, field.type.scale))
+        if pa.types.is_decimal128(field.type) else field
+        for field in schema
+    ])
+
+
+def _has_null_columns(schema) -> bool:
+    return any(pa.types.is_null(field.type) for field in schema)
+
+
+def _load_pyarrow() -> bool:
+    global pa, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            return False
+        pa, pq = pyarrow, pyarrow.parquet
+    return True
@@ -1,10 +1,59 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set
+
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from app.core.execution.errors import DatabaseExecutionError  # re-exported
+from app.core.execution.timeout import current_deadline, run_with_deadline
+from app.core.sql.dialects import dialect_for_url
+from app.core.telemetry.instruments import POOL_CHECKOUT_SECONDS, ROWS_RETURNED
+from app.core.telemetry.tracing import stage
+
+
+# Server-side statement timeouts, set from the request deadline.
+# MySQL's is session-scoped, so it is reset on pooled connections that carry one.
+STATEMENT_TIMEOUTS = {
+    "mysql": "SET SESSION MAX_EXECUTION_TIME = {ms}",
+    "postgresql": "SET LOCAL statement_timeout = {ms}",
+}
+
+
+def _statement_timeout_sql(dialect: str, info: dict) -> Optional[str]:
+    """
+    Returns the statement that aligns the connection's server-side timeout
+    with the current deadline, or None when nothing needs to be sent.
+    """
+    template = STATEMENT_TIMEOUTS.get(dialect)
+    if template is None:
+        return None
 
+    deadline = current_deadline()
+    if deadline is None:
+        if dialect == "mysql" and info.pop("statement_timeout_ms", None):
+            return template.format(ms=0)
+        return None
 
-class DatabaseExecutionError(Exception):
-    pass
+    ms = max(int(deadline.remaining() * 1000), 1)
+    if dialect == "mysql":
+        info["statement_timeout_ms"] = ms
+    return template.format(ms=ms)
+
+
+def _pool_options(database_url: str, pre_ping: bool = True) -> dict:
+    # SQLite drivers pick their own pool class; sizing args are rejected there
+    if database_url.startswith("sqlite"):
+        return {}
+
+    return {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_pre_ping": pre_ping,
+        "pool_recycle": 1800,
+    }
 
 
 class Database:
@@ -16,15 +65,210 @@ class Database:
     def __init__(self, database_url: str):
         self.engine: Engine = create_engine(
             database_url,
-            pool_size=5,
-            max_overflow=10,
-            pool_pre_ping=True,
+            **_pool_options(database_url),
         )
 
-    def execute(self, sql: str):
+    def execute(self, sql: str, params: Optional[dict] = None):
         try:
+            with stage("db_execute"):
+                checkout = time.perf_counter()
+                with self.engine.connect() as connection:
+                    POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - checkout)
+                    self._apply_statement_timeout(connection)
+                    result = connection.execute(text(sql), params or {})
+                    rows = result.fetchall()
+        except SQLAlchemyError as e:
+            raise DatabaseExecutionError(str(e))
+
+        ROWS_RETURNED.observe(len(rows))
+        return rows
+
+    def stream(
+        self, sql: str, params: Optional[dict] = None, chunk_size: int = 1000
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yields rows in chunks from a server-side cursor.
+        Memory stays bounded by chunk_size regardless of result size.
+        """
+        total = 0
+        try:
+            checkout = time.perf_counter()
             with self.engine.connect() as connection:
-                result = connection.execute(text(sql))
+                POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - checkout)
+                self._apply_statement_timeout(connection)
+                result = connection.execution_options(
+                    stream_results=True, max_row_buffer=chunk_size
+                ).execute(text(sql), params or {})
+                keys = list(result.keys())
+                while True:
+                    rows = result.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    total += len(rows)
+                    yield [dict(zip(keys, row)) for row in rows]
+        except SQLAlchemyError as e:
+            raise DatabaseExecutionError(str(e))
+
+        ROWS_RETURNED.observe(total)
+
+    def _apply_statement_timeout(self, connection) -> None:
+        statement = _statement_timeout_sql(self.engine.dialect.name, connection.info)
+        if statement is not None:
+            connection.exec_driver_sql(statement)
+
+
+class AsyncDatabase:
+    """
+    Non-blocking variant of Database for the async request path.
+    Concurrency is bounded by the connection pool, not by worker threads.
+
+    Under a request deadline the server-side statement timeout is set from
+    the remaining budget, and the driver call is cancelled when it runs out.
+
+    pre_ping=False skips the per-checkout liveness round trip; use it when
+    something else (ReplicaRouter's health checks) watches the server.
+
+    cancel() aborts in-flight execute() calls and open streams; their
+    callers see a DatabaseExecutionError.
+    """
+
+    def __init__(self, database_url: str, pre_ping: bool = True):
+        self.engine: AsyncEngine = create_async_engine(
+            database_url,
+            **_pool_options(database_url, pre_ping),
+        )
+        self._in_flight: Set[asyncio.Task] = set()
+        self._streams: Set["_OpenStream"] = set()
+
+    @property
+    def dialect(self) -> str:
+        return dialect_for_url(self.engine.url.drivername)
+
+    async def execute(self, sql: str, params: Optional[dict] = None):
+        with stage("db_execute"):
+            rows = await run_with_deadline(
+                self._cancellable(self._execute, sql, params), "database"
+            )
+        ROWS_RETURNED.observe(len(rows))
+        return rows
+
+    def cancel(self) -> int:
+        tasks = list(self._in_flight)
+        for task in tasks:
+            task.cancel()
+        streams = list(self._streams)
+        for stream in streams:
+            stream.cancel()
+        return len(tasks) + len(streams)
+
+    async def _cancellable(self, call, *args):
+        # The coroutine is only created once this one runs, so a query that
+        # is refused before it starts leaves nothing un-awaited behind
+        task = asyncio.ensure_future(call(*args))
+        self._in_flight.add(task)
+        try:
+            return await _cancelled_as_error(task)
+        finally:
+            self._in_flight.discard(task)
+
+    async def _execute(self, sql: str, params: Optional[dict]):
+        try:
+            checkout = time.perf_counter()
+            async with self.engine.connect() as connection:
+                POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - checkout)
+                await self._apply_statement_timeout(connection)
+                result = await connection.execute(text(sql), params or {})
                 return result.fetchall()
         except SQLAlchemyError as e:
             raise DatabaseExecutionError(str(e))
+
+    async def stream(
+        self, sql: str, params: Optional[dict] = None, chunk_size: int = 1000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Async counterpart of Database.stream (server-side cursor, fetchmany chunks).
+        """
+        total = 0
+        stream = _OpenStream()
+        self._streams.add(stream)
+        try:
+            checkout = time.perf_counter()
+            async with self.engine.connect() as connection:
+                POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - checkout)
+                await self._apply_statement_timeout(connection)
+                result = await run_with_deadline(
+                    stream.run(connection.stream, text(sql), params or {}), "database"
+                )
+                keys = list(result.keys())
+                partitions = result.partitions(chunk_size).__aiter__()
+                while True:
+                    try:
+                        rows = await run_with_deadline(
+                            stream.run(partitions.__anext__), "database"
+                        )
+                    except StopAsyncIteration:
+                        break
+                    total += len(rows)
+                    yield [dict(zip(keys, row)) for row in rows]
+        except SQLAlchemyError as e:
+            raise DatabaseExecutionError(str(e))
+        finally:
+            self._streams.discard(stream)
+
+        ROWS_RETURNED.observe(total)
+
+    async def _apply_statement_timeout(self, connection: AsyncConnection) -> None:
+        statement = _statement_timeout_sql(self.engine.dialect.name, connection.info)
+        if statement is not None:
+            await connection.exec_driver_sql(statement)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"in_flight": len(self._in_flight), **self.pool_stats()}
+
+    def pool_stats(self) -> Dict[str, Any]:
+        pool = self.engine.sync_engine.pool
+        stats = {"pool": type(pool).__name__}
+        for name in ("size", "checkedout", "checkedin", "overflow"):
+            if hasattr(pool, name):
+                stats[name] = getattr(pool, name)()
+        return stats
+
+    async def dispose(self) -> None:
+        await self.engine.dispose()
+
+
+class _OpenStream:
+    """
+    One open AsyncDatabase.stream. cancel() aborts its current fetch, or
+    the next one when the consumer is busy between chunks.
+    """
+
+    __slots__ = ("cancelled", "task")
+
+    def __init__(self):
+        self.cancelled = False
+        self.task: Optional[asyncio.Task] = None
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        if self.task is not None:
+            self.task.cancel()
+
+    async def run(self, call, *args):
+        if self.cancelled:
+            raise DatabaseExecutionError("Query was cancelled")
+        self.task = asyncio.ensure_future(call(*args))
+        try:
+            return await _cancelled_as_error(self.task)
+        finally:
+            self.task = None
+
+
+async def _cancelled_as_error(task: asyncio.Task):
+    try:
+        return await task
+    except asyncio.CancelledError:
+        # Cancelled through cancel() rather than by our own caller
+        if task.cancelled() and not asyncio.current_task().cancelling():
+            raise DatabaseExecutionError("Query was cancelled")
+        raise
@@ -0,0 +1,2 @@
+class DatabaseExecutionError(Exception):
+    pass
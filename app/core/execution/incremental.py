@@ -0,0 +1,227 @@
+import asyncio
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from cachetools import TLRUCache
+
+from app.core.enforcement.time import END_PARAM, START_PARAM, TimeWindow
+from app.core.execution.db import AsyncDatabase
+from app.core.planning.query_plan import QueryPlan
+from app.core.sql.dialects import SQLCompiler
+from app.core.sql.validator import SQLValidator
+
+# (value, count): count is only meaningful for avg, carried as sum + count
+Partial = Tuple[Any, int]
+
+EMPTY_PARTIAL: Partial = (None, 0)
+
+
+def _sum(partials: Iterable[Partial]):
+    values = [v for v, _ in partials if v is not None]
+    return sum(values) if values else None
+
+
+def _count(partials: Iterable[Partial]):
+    return sum(v for v, _ in partials if v is not None)
+
+
+def _extreme(pick: Callable) -> Callable[[Iterable[Partial]], Any]:
+    def combine(partials: Iterable[Partial]):
+        values = [v for v, _ in partials if v is not None]
+        return pick(values) if values else None
+    return combine
+
+
+def _avg(partials: Iterable[Partial]):
+    partials = list(partials)
+    count = sum(c for _, c in partials)
+    if not count:
+        return None
+    return sum(v for v, _ in partials if v is not None) / count
+
+
+# How day partials of each MeasureDefinition.aggregation combine into a window
+COMBINERS: Dict[str, Callable[[Iterable[Partial]], Any]] = {
+    "sum": _sum,
+    "count": _count,
+    "min": _extreme(min),
+    "max": _extreme(max),
+    "avg": _avg,
+}
+
+
+class IncrementalExecutor:
+    """
+    Computes scalar fact plans from per-day partial aggregates.
+
+    A window is decomposed into day buckets; cached buckets are reused and
+    only the missing days are queried (one GROUP BY day query per
+    contiguous gap) before the partials are combined. Overlapping windows
+    such as last_week, last_month and last_quarter share their days.
+
+    Days older than restate_days are settled and kept for settled_ttl_seconds;
+    more recent days may still receive late rows and use recent_ttl_seconds.
+
+    Gaps of at least 2 * min_partition_days are split into up to
+    `partitions` day-aligned sub-ranges queried concurrently on separate
+    pooled connections, so a cold last_quarter is not one long scan.
+
+    The day queries go through sql_validator like every compiled query,
+    limited to one row per day of the gap.
+    """
+
+    def __init__(
+        self,
+        database: AsyncDatabase,
+        compiler: SQLCompiler,
+        sql_validator: SQLValidator,
+        maxsize: int = 65536,
+        settled_ttl_seconds: int = 86400,
+        recent_ttl_seconds: int = 300,
+        restate_days: int = 2,
+        partitions: int = 1,
+        min_partition_days: int = 7,
+    ):
+        self.database = database
+        self.compiler = compiler
+        self.sql_validator = sql_validator
+        self.settled_ttl_seconds = settled_ttl_seconds
+        self.recent_ttl_seconds = recent_ttl_seconds
+        self.restate_days = restate_days
+        self.partitions = max(partitions, 1)
+        self.min_partition_days = max(min_partition_days, 1)
+
+        self._buckets = TLRUCache(
+            maxsize=maxsize,
+            ttu=lambda key, bucket, now: bucket[1],
+            timer=time.time,
+        )
+        self._lock = threading.Lock()
+
+    def supports(self, plan: QueryPlan) -> bool:
+        return (
+            plan.source == "fact"
+            and plan.backend is None
+            and not plan.group_by
+            and plan.aggregation.lower() in COMBINERS
+        )
+
+    async def execute(self, plan: QueryPlan, window: TimeWindow):
+        shape = self._shape(plan)
+        days = list(_days(window.start, window.end))
+
+        partials: Dict[date, Partial] = {}
+        with self._lock:
+            for day in days:
+                bucket = self._buckets.get((shape, day))
+                if bucket is not None:
+                    partials[day] = bucket[0]
+
+        missing = [day for day in days if day not in partials]
+        for start, end in _ranges(missing):
+            fetched = await self._fetch(plan, start, end)
+            for day in _days(start, end):
+                partials[day] = fetched.get(day, EMPTY_PARTIAL)
+            self._store(shape, start, end, partials)
+
+        return COMBINERS[plan.aggregation.lower()](partials[day] for day in days)
+
+    def invalidate(self, metric_name: str, version: Optional[str] = None) -> int:
+        with self._lock:
+            stale = [
+                key for key in list(self._buckets.keys())
+                if key[0][0] == metric_name and (version is None or key[0][1] == version)
+            ]
+            for key in stale:
+                self._buckets.pop(key, None)
+        return len(stale)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    #INTERNAL HELPERS
+
+    def _shape(self, plan: QueryPlan) -> Tuple[str, str, str]:
+        # Everything that determines a day's value; the time range does not
+        return (
+            plan.metric_name,
+            plan.metric_version,
+            plan.model_dump_json(exclude={"time_range"}),
+        )
+
+    async def _fetch(self, plan: QueryPlan, start: date, end: date) -> Dict[date, Partial]:
+        ast = self.compiler.compile_rollup(plan).limit((end - start).days)
+        self.sql_validator.validate(ast)
+        sql = self.compiler.render(ast)
+        ranges = _split(start, end, self.partitions, self.min_partition_days)
+
+        # Day partials of disjoint sub-ranges merge by plain union
+        fetched = {}
+        for part in await asyncio.gather(
+            *(self._fetch_range(sql, s, e) for s, e in ranges)
+        ):
+            fetched.update(part)
+        return fetched
+
+    async def _fetch_range(self, sql: str, start: date, end: date) -> Dict[date, Partial]:
+        rows = await self.database.execute(sql, {START_PARAM: start, END_PARAM: end})
+
+        fetched = {}
+        for row in rows:
+            values = row._mapping
+            day = values["day"]
+            day = day if isinstance(day, date) else date.fromisoformat(str(day)[:10])
+            fetched[day] = (values["value"], values.get("value_count") or 0)
+        return fetched
+
+    def _store(self, shape, start: date, end: date, partials: Dict[date, Partial]) -> None:
+        now = time.time()
+        settled_before = date.today() - timedelta(days=self.restate_days)
+
+        with self._lock:
+            for day in _days(start, end):
+                ttl = (
+                    self.settled_ttl_seconds if day < settled_before
+                    else self.recent_ttl_seconds
+                )
+                self._buckets[(shape, day)] = (partials[day], now + ttl)
+
+
+def _days(start: date, end: date) -> Iterator[date]:
+    for offset in range((end - start).days):
+        yield start + timedelta(days=offset)
+
+
+def _split(start: date, end: date, partitions: int, min_days: int) -> List[Tuple[date, date]]:
+    """
+    Splits [start, end) into at most `partitions` day-aligned sub-ranges of
+    at least min_days each (sizes differ by at most one day).
+    """
+    total = (end - start).days
+    count = max(min(partitions, total // min_days), 1)
+
+    ranges = []
+    for i in range(count):
+        lower = start + timedelta(days=total * i // count)
+        upper = start + timedelta(days=total * (i + 1) // count)
+        ranges.append((lower, upper))
+    return ranges
+
+
+def _ranges(days: List[date]) -> Iterator[Tuple[date, date]]:
+    """
+    Contiguous half-open [start, end) ranges covering sorted days.
+    """
+    start = previous = None
+    for day in days:
+        if start is None:
+            start = previous = day
+        elif day == previous + timedelta(days=1):
+            previous = day
+        else:
+            yield start, previous + timedelta(days=1)
+            start = previous = day
+    if start is not None:
+        yield start, previous + timedelta(days=1)
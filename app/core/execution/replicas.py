@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import random
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+
+from app.core.execution.db import AsyncDatabase
+
+logger = logging.getLogger(__name__)
+
+
+# Replication lag probes, by SQLAlchemy dialect, tried in order until one
+# runs. Backends without one (e.g. SQLite in tests) report zero lag.
+LAG_QUERIES = {
+    # Fully replayed means caught up, however long the primary has been idle
+    "postgresql": (
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END",
+    ),
+    # SHOW REPLICA STATUS is MySQL 8.0.22+; both need REPLICATION CLIENT
+    "mysql": ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS"),
+}
+
+MYSQL_LAG_COLUMNS = ("Seconds_Behind_Source", "Seconds_Behind_Master")
+
+
+class Replica:
+    """
+    One database server with its own pool and observed health.
+    """
+
+    def __init__(self, name: str, url: str, primary: bool = False):
+        self.name = name
+        self.primary = primary
+        self.database = AsyncDatabase(url, pre_ping=False)
+
+        self.healthy = True
+        self.latency: Optional[float] = None
+        # Seconds behind the primary; None when the server will not say
+        self.lag: Optional[float] = 0.0
+        self.in_flight = 0
+        self.failures = 0
+        self.successes = 0
+        self.checked_at: Optional[float] = None
+
+    def score(self) -> float:
+        # Expected wait: observed latency scaled by work already queued on it
+        return (self.latency or 0.0) * (self.in_flight + 1)
+
+    def observe(self, seconds: float) -> None:
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency = 0.8 * self.latency + 0.2 * seconds
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "primary": self.primary,
+            "healthy": self.healthy,
+            "latency_ms": None if self.latency is None else round(self.latency * 1000, 3),
+            "lag_seconds": self.lag,
+            "in_flight": self.in_flight,
+            "consecutive_failures": self.failures,
+            **self.database.pool_stats(),
+        }
+
+
+class ReplicaRouter:
+    """
+    Drop-in AsyncDatabase for a primary plus read replicas.
+
+    Reads go to the healthy replica with the best latency/in-flight score
+    whose replication lag is within max_lag_seconds (or unknown, when the
+    lag probe is not permitted); the primary serves only when no replica
+    qualifies.
+
+    Liveness comes from background health checks rather than per-checkout
+    pings: eject_after consecutive failures eject a server (and drop its
+    pooled connections), recover_after consecutive successes bring it back.
+    """
+
+    def __init__(
+        self,
+        primary_url: str,
+        replica_urls: Sequence[str] = (),
+        max_lag_seconds: float = 30.0,
+        eject_after: int = 3,
+        recover_after: int = 2,
+        check_timeout_seconds: float = 2.0,
+    ):
+        self.primary = Replica("primary", primary_url, primary=True)
+        self.replicas = [
+            Replica(f"replica-{i}", url) for i, url in enumerate(replica_urls, 1)
+        ]
+        self.max_lag_seconds = max_lag_seconds
+        self.eject_after = eject_after
+        self.recover_after = recover_after
+        self.check_timeout_seconds = check_timeout_seconds
+
+        self._health_task: Optional[asyncio.Task] = None
+
+    @property
+    def servers(self) -> List[Replica]:
+        return [self.primary] + self.replicas
+
+    @property
+    def dialect(self) -> str:
+        return self.primary.database.dialect
+
+    def choose(self) -> Replica:
+        candidates = [
+            r for r in self.replicas
+            if r.healthy and (r.lag is None or r.lag <= self.max_lag_seconds)
+        ]
+        if not candidates:
+            return self.primary
+
+        best = min(r.score() for r in candidates)
+        return random.choice([r for r in candidates if r.score() == best])
+
+    async def execute(self, sql: str, params: Optional[dict] = None):
+        replica = self.choose()
+        with self._track(replica):
+            return await replica.database.execute(sql, params)
+
+    async def stream(
+        self, sql: str, params: Optional[dict] = None, chunk_size: int = 1000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        replica = self.choose()
+        with self._track(replica, observe=False):
+            async for rows in replica.database.stream(sql, params, chunk_size):
+                yield rows
+
+    async def check_health(self) -> None:
+        await asyncio.gather(*(self._check(r) for r in self.servers))
+
+    def start_health_checks(self, interval_seconds: float) -> None:
+        if self._health_task is not None:
+            return
+
+        async def loop():
+            while True:
+                try:
+                    await self.check_health()
+                except Exception as e:
+                    logger.warning("Replica health check failed: %s", e)
+                await asyncio.sleep(interval_seconds)
+
+        self._health_task = asyncio.get_running_loop().create_task(loop())
+
+    async def stop_health_checks(self) -> None:
+        task, self._health_task = self._health_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def cancel(self) -> int:
+        return sum(r.database.cancel() for r in self.servers)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [r.stats() for r in self.servers]
+
+    async def dispose(self) -> None:
+        await self.stop_health_checks()
+        for replica in self.servers:
+            await replica.database.dispose()
+
+    #INTERNAL HELPERS
+
+    @contextmanager
+    def _track(self, replica: Replica, observe: bool = True):
+        replica.in_flight += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            replica.in_flight -= 1
+            if observe:
+                replica.observe(time.monotonic() - started)
+
+    async def _check(self, replica: Replica) -> None:
+        started = time.monotonic()
+        try:
+            lag = await asyncio.wait_for(self._probe(replica), self.check_timeout_seconds)
+        except (SQLAlchemyError, OSError, asyncio.TimeoutError) as e:
+            replica.successes = 0
+            replica.failures += 1
+            if replica.healthy and replica.failures >= self.eject_after:
+                replica.healthy = False
+                logger.warning("Ejecting %s after %d failed checks: %s", replica.name, replica.failures, e)
+                # Connections to a failed server are useless; start clean on recovery
+                await replica.database.dispose()
+            return
+        finally:
+            replica.checked_at = time.time()
+
+        replica.observe(time.monotonic() - started)
+        if lag is None and replica.lag is not None:
+            logger.warning(
+                "Replication lag of %s is unknown (no permission to probe it); "
+                "serving from it unchecked", replica.name,
+            )
+        replica.lag = lag
+        replica.failures = 0
+        replica.successes += 1
+        if not replica.healthy and replica.successes >= self.recover_after:
+            replica.healthy = True
+            logger.info("%s recovered", replica.name)
+
+    async def _probe(self, replica: Replica) -> Optional[float]:
+        """
+        Liveness plus lag. A lag probe the server refuses (privileges,
+        syntax of an older version) is "lag unknown", not a failed check.
+        """
+        engine = replica.database.engine
+        async with engine.connect() as connection:
+            await connection.exec_driver_sql("SELECT 1")
+
+            lag_queries = LAG_QUERIES.get(engine.dialect.name)
+            if not lag_queries or replica.primary:
+                return 0.0
+
+            for lag_query in lag_queries:
+                try:
+                    result = await connection.exec_driver_sql(lag_query)
+                except DBAPIError as e:
+                    if e.connection_invalidated:
+                        raise
+                    await connection.rollback()
+                    continue
+                return self._lag(engine.dialect.name, result.mappings().first())
+
+        return None
+
+    @staticmethod
+    def _lag(dialect: str, row) -> float:
+        if row is None:
+            return 0.0
+        if dialect == "mysql":
+            for column in MYSQL_LAG_COLUMNS:
+                if column in row:
+                    # NULL means replication is stopped
+                    return float("inf") if row[column] is None else float(row[column])
+            return 0.0
+        return float(next(iter(row.values())) or 0.0)
@@ -0,0 +1,390 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.enforcement.time import END_PARAM, START_PARAM, TimeWindow
+from app.core.execution.db import Database
+from app.core.metrics.models import MetricDefinition
+from app.core.metrics.registry import MetricRegistry
+from app.core.planning.builder import ROLLUP_AGGREGATIONS, QueryPlanBuilder, RollupMatch
+from app.core.planning.query_plan import FilterPlan
+from app.core.sql.dialects import SQLCompiler
+from app.core.sql.validator import SQLValidator
+
+logger = logging.getLogger(__name__)
+
+Invalidator = Callable[[str, Optional[str]], object]
+
+DimensionSet = Tuple[str, ...]
+
+
+def rollup_table(metric_name: str, version: str, dimensions: Sequence[str]) -> str:
+    suffix = "".join(f"__{d}" for d in sorted(dimensions))
+    return f"rollup_{metric_name}_{version}{suffix}"
+
+
+def _filters_signature(filters: Sequence[FilterPlan]) -> str:
+    return json.dumps(
+        sorted([f.column, f.operator, f.value] for f in filters),
+        separators=(",", ":"),
+    )
+
+
+class RollupStore:
+    """
+    Daily pre-aggregates per metric version and dimension combination,
+    kept in a local SQLite file (WAL mode).
+
+    Each rollup table holds one row per day and dimension values, built
+    with the metric's required filters. The catalog records those filters
+    and the contiguous day range [covered_from, covered_until) it covers,
+    so the planner only routes windows the rollup can answer exactly.
+
+    Decimal values are stored as their exact text, and the catalog keeps
+    their scale so plans round SQLite's floating-point sums back to it.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        # The planner trusts this catalog: keep it private to the app's user
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        self._connection().execute(
+            """
+            CREATE TABLE IF NOT EXISTS rollup_catalog (
+                table_name TEXT PRIMARY KEY,
+                metric TEXT NOT NULL,
+                version TEXT NOT NULL,
+                dimensions TEXT NOT NULL,
+                filters TEXT NOT NULL,
+                covered_from TEXT NOT NULL,
+                covered_until TEXT NOT NULL,
+                refreshed_at REAL NOT NULL,
+                scale INTEGER
+            )
+            """
+        )
+        columns = {row[1] for row in self._connection().execute("PRAGMA table_info(rollup_catalog)")}
+        if "scale" not in columns:
+            self._connection().execute("ALTER TABLE rollup_catalog ADD COLUMN scale INTEGER")
+
+    @property
+    def database_url(self) -> str:
+        return f"sqlite+aiosqlite:///{self.path}"
+
+    def find(
+        self,
+        metric_name: str,
+        version: str,
+        dimensions: Sequence[str],
+        filters: Sequence[FilterPlan],
+        window: TimeWindow,
+    ) -> Optional[RollupMatch]:
+        """
+        Smallest rollup whose dimensions include the requested ones, built
+        with the same filters and covering the whole window.
+        """
+        try:
+            rows = self._connection().execute(
+                "SELECT table_name, dimensions, scale FROM rollup_catalog "
+                "WHERE metric = ? AND version = ? AND filters = ? "
+                "AND covered_from <= ? AND covered_until >= ?",
+                (
+                    metric_name,
+                    version,
+                    _filters_signature(filters),
+                    window.start.isoformat(),
+                    window.end.isoformat(),
+                ),
+            ).fetchall()
+        except sqlite3.Error:
+            return None
+
+        wanted = set(dimensions)
+        candidates = [
+            (len(dims), table, scale)
+            for table, dims, scale in ((t, json.loads(d), s) for t, d, s in rows)
+            if wanted.issubset(dims)
+        ]
+        if not candidates:
+            return None
+        _, table, scale = min(candidates)
+        return RollupMatch(table, scale)
+
+    def refresh(
+        self,
+        metric: MetricDefinition,
+        dimensions: Sequence[str],
+        source: Database,
+        compiler: SQLCompiler,
+        sql_validator: SQLValidator,
+        through: Optional[date] = None,
+        backfill_days: int = 366,
+        restate_days: int = 2,
+    ) -> Optional[str]:
+        """
+        Brings one rollup up to date through the day before `through`
+        (today by default; the current day is never complete).
+
+        The first refresh backfills backfill_days; later ones reload only the
+        days since the last refresh plus restate_days for late-arriving rows.
+        The query passes sql_validator, limited to the compiler's grouped
+        row limit per day.
+        Returns the table name, or None for non-additive aggregations.
+        """
+        if metric.measure.aggregation.lower() not in ROLLUP_AGGREGATIONS:
+            return None
+
+        dimensions = tuple(sorted(dimensions))
+        table = rollup_table(metric.metric_name, metric.version, dimensions)
+        through = through or date.today()
+
+        plan = QueryPlanBuilder().fact_plan(metric, "custom", dimensions=dimensions)
+        signature = _filters_signature(plan.filters)
+
+        coverage = self._coverage(table, signature)
+        if coverage is None:
+            start = through - timedelta(days=backfill_days)
+        else:
+            start = max(coverage[1] - timedelta(days=restate_days), coverage[0])
+
+        if start >= through:
+            return table
+
+        ast = compiler.compile_rollup(plan).limit(
+            (through - start).days * compiler.grouped_row_limit
+        )
+        sql_validator.validate(ast)
+        sql = compiler.render(ast)
+        scale = _Scale(coverage[2] if coverage else None)
+        rows = self._rows(
+            source.stream(sql, {START_PARAM: start, END_PARAM: through}),
+            dimensions,
+            scale,
+        )
+
+        covered_from = min(start, coverage[0]) if coverage else start
+        self._load(table, metric, dimensions, signature, start, through, covered_from, rows, scale)
+        return table
+
+    def invalidate(self, metric_name: str, version: Optional[str] = None) -> int:
+        """
+        Drops every rollup of a metric (optionally one version).
+        """
+        connection = self._connection()
+        with self._write_lock:
+            if version is None:
+                tables = connection.execute(
+                    "SELECT table_name FROM rollup_catalog WHERE metric = ?",
+                    (metric_name,),
+                ).fetchall()
+            else:
+                tables = connection.execute(
+                    "SELECT table_name FROM rollup_catalog WHERE metric = ? AND version = ?",
+                    (metric_name, version),
+                ).fetchall()
+
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                for (table,) in tables:
+                    connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+                    connection.execute(
+                        "DELETE FROM rollup_catalog WHERE table_name = ?", (table,)
+                    )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return len(tables)
+
+    #INTERNAL HELPERS
+
+    def _coverage(
+        self, table: str, signature: str
+    ) -> Optional[Tuple[date, date, Optional[int]]]:
+        row = self._connection().execute(
+            "SELECT covered_from, covered_until, filters, scale FROM rollup_catalog "
+            "WHERE table_name = ?",
+            (table,),
+        ).fetchone()
+
+        # Rebuild from scratch if the definition's filters changed
+        if row is None or row[2] != signature:
+            return None
+        return date.fromisoformat(row[0]), date.fromisoformat(row[1]), row[3]
+
+    def _rows(
+        self, chunks: Iterable[List[dict]], dimensions: DimensionSet, scale: "_Scale"
+    ) -> Iterable[tuple]:
+        for chunk in chunks:
+            for row in chunk:
+                day = row["day"]
+                value = row["value"]
+                if isinstance(value, Decimal):
+                    # Exact text; sqlite3 cannot bind Decimal
+                    scale.observe(value)
+                    value = str(value)
+                yield (
+                    day.isoformat() if isinstance(day, date) else str(day),
+                    *(row[d] for d in dimensions),
+                    value,
+                )
+
+    def _load(
+        self,
+        table: str,
+        metric: MetricDefinition,
+        dimensions: DimensionSet,
+        signature: str,
+        start: date,
+        end: date,
+        covered_from: date,
+        rows: Iterable[tuple],
+        scale: "_Scale",
+    ) -> None:
+        columns = ", ".join(f'"{d}"' for d in dimensions)
+        placeholders = ", ".join("?" for _ in range(len(dimensions) + 2))
+
+        connection = self._connection()
+        with self._write_lock:
+            # One transaction: readers see the old or the new day range, never a mix
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{table}" '
+                    f"(day TEXT NOT NULL, {columns + ', ' if columns else ''}value NUMERIC)"
+                )
+                connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{table}_day" ON "{table}" (day)'
+                )
+                connection.execute(
+                    f'DELETE FROM "{table}" WHERE day >= ? AND day < ?',
+                    (start.isoformat(), end.isoformat()),
+                )
+                connection.executemany(
+                    f'INSERT INTO "{table}" VALUES ({placeholders})', rows
+                )
+                # After the insert: the scale is observed while rows are consumed
+                connection.execute(
+                    "INSERT OR REPLACE INTO rollup_catalog "
+                    "(table_name, metric, version, dimensions, filters, "
+                    "covered_from, covered_until, refreshed_at, scale) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        table,
+                        metric.metric_name,
+                        metric.version,
+                        json.dumps(list(dimensions)),
+                        signature,
+                        covered_from.isoformat(),
+                        end.isoformat(),
+                        time.time(),
+                        scale.value,
+                    ),
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shareable across threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+
+class _Scale:
+    """
+    Largest number of decimal places seen across a rollup's values.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Optional[int] = None):
+        self.value = value
+
+    def observe(self, value: Decimal) -> None:
+        exponent = value.as_tuple().exponent
+        places = -exponent if isinstance(exponent, int) and exponent < 0 else 0
+        if self.value is None or places > self.value:
+            self.value = places
+
+
+class RollupRefresher:
+    """
+    Keeps every configured rollup current and invalidates derived state
+    (compiled artifacts) so new coverage is routed. Mirrors MetricReloader:
+    triggered explicitly or by a polling daemon thread.
+    """
+
+    def __init__(
+        self,
+        store: RollupStore,
+        registry: MetricRegistry,
+        source: Database,
+        compiler: SQLCompiler,
+        sql_validator: SQLValidator,
+        dimension_sets: Sequence[DimensionSet],
+        invalidators: Sequence[Invalidator] = (),
+    ):
+        self.store = store
+        self.registry = registry
+        self.source = source
+        self.compiler = compiler
+        self.sql_validator = sql_validator
+        self.dimension_sets = list(dimension_sets)
+        self.invalidators = list(invalidators)
+
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    def refresh(self) -> List[str]:
+        refreshed = []
+        for metric in self.registry.all_metrics():
+            for dimensions in self.dimension_sets:
+                # Dimensional rollups only for metrics that allow breakdowns
+                if dimensions and not metric.supports_dimensions:
+                    continue
+
+                table = self.store.refresh(
+                    metric, dimensions, self.source, self.compiler, self.sql_validator
+                )
+                if table is not None:
+                    refreshed.append(table)
+
+            for invalidate in self.invalidators:
+                invalidate(metric.metric_name, metric.version)
+
+        return refreshed
+
+    def watch(self, interval_seconds: float) -> None:
+        if self._watcher is not None:
+            return
+
+        def poll():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.warning("Rollup refresh failed: %s", e)
+                if self._stop.wait(interval_seconds):
+                    return
+
+        self._watcher = threading.Thread(target=poll, name="rollup-refresher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
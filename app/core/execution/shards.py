@@ -0,0 +1,279 @@
+import asyncio
+import os
+import threading
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import yaml
+from cachetools import LRUCache
+from pydantic import BaseModel, Field, validator
+
+from app.config.database import to_async_url
+from app.core.execution.db import AsyncDatabase
+from app.core.execution.errors import DatabaseExecutionError
+from app.core.execution.incremental import COMBINERS, Partial
+from app.core.planning.query_plan import QueryPlan
+from app.core.sql.dialects import SQLCompiler, dialect_for_url
+from app.core.sql.validator import SQLValidator
+
+
+class ShardDefinition(BaseModel):
+    name: str
+    # ${VAR} references are expanded from the environment
+    url: str
+    values: List[str]
+
+
+class TableShards(BaseModel):
+    """
+    Partitioning of one fact table: each shard database holds the rows
+    whose shard key is one of its values (with the dimension tables
+    needed for the metric's joins).
+    """
+
+    key: str
+    shards: List[ShardDefinition]
+
+    @validator("shards")
+    def values_are_disjoint(cls, v):
+        seen = set()
+        for shard in v:
+            overlap = seen.intersection(shard.values)
+            if overlap:
+                raise ValueError(f"Shard values {overlap} are assigned twice")
+            seen.update(shard.values)
+        return v
+
+
+class ShardMap(BaseModel):
+    tables: Dict[str, TableShards] = Field(default_factory=dict)
+
+    def shards_for(self, plan: QueryPlan) -> Optional[List[ShardDefinition]]:
+        """
+        Shards that can hold rows for the plan, or None when the fact table
+        is not sharded. An = or != filter on the shard key prunes the rest;
+        such filters come from a metric's required_filters (requested
+        filters only ever compile to IS NOT NULL, which prunes nothing).
+        """
+        table = self.tables.get(plan.fact_table)
+        if table is None:
+            return None
+
+        key = _column_name(table.key)
+        shards = table.shards
+        for f in plan.filters:
+            if _column_name(f.column) != key:
+                continue
+            if f.operator == "=":
+                shards = [s for s in shards if f.value in s.values]
+            elif f.operator == "!=":
+                shards = [s for s in shards if set(s.values) != {f.value}]
+        return shards
+
+    def is_shard_key(self, table: str, column: str) -> bool:
+        shards = self.tables.get(table)
+        return shards is not None and _column_name(shards.key) == _column_name(column)
+
+
+def load_shard_map(path: Optional[Path]) -> ShardMap:
+    """
+    Reads metadata/shards.yaml. A missing or empty file means no sharding.
+    """
+    if path is None or not Path(path).exists():
+        return ShardMap()
+
+    with open(path, "r", encoding="utf-8") as f:
+        raw = yaml.safe_load(os.path.expandvars(f.read()))
+
+    return ShardMap(**(raw or {}))
+
+
+class ShardedExecutor:
+    """
+    Scatter-gather execution of plans on sharded fact tables.
+
+    The plan is compiled to mergeable partials for each shard's dialect and
+    streamed from every relevant shard concurrently. Partials are merged
+    per group-by key with the measure's combiner (avg as sum + count) as
+    chunks arrive, so only one entry per group is held, and the row limit
+    is applied after merging. When the plan groups by the shard key, groups
+    never span shards and chunks are passed through as soon as they arrive.
+
+    Shard SQL is limited to the row limit, validated and rendered once per
+    plan and dialect. A shard that reaches the limit while groups are being
+    merged fails the query rather than returning partial sums.
+    """
+
+    def __init__(
+        self,
+        shard_map: ShardMap,
+        sql_validator: SQLValidator,
+        row_limit: int = 100,
+        grouped_row_limit: int = 100_000,
+        compiled_cache_size: int = 1024,
+    ):
+        self.shard_map = shard_map
+        self.sql_validator = sql_validator
+        self.row_limit = row_limit
+        self.grouped_row_limit = grouped_row_limit
+
+        self._compiled = LRUCache(maxsize=compiled_cache_size)
+        self._lock = threading.Lock()
+
+        self._databases: Dict[str, AsyncDatabase] = {}
+        self._compilers: Dict[str, SQLCompiler] = {}
+        for table in shard_map.tables.values():
+            for shard in table.shards:
+                url = to_async_url(shard.url)
+                self._databases.setdefault(shard.url, AsyncDatabase(url))
+                self._compilers.setdefault(shard.url, SQLCompiler(dialect_for_url(url)))
+
+    def supports(self, plan: QueryPlan) -> bool:
+        return (
+            plan.source == "fact"
+            and plan.backend is None
+            and plan.fact_table in self.shard_map.tables
+        )
+
+    async def execute(self, plan: QueryPlan, params: dict) -> Any:
+        """
+        Scalar result of an ungrouped plan.
+        """
+        rows = await self.rows(plan, params)
+        # Same as the unsharded path when every shard was pruned
+        return rows[0]["value"] if rows else 0
+
+    async def rows(self, plan: QueryPlan, params: dict) -> List[Dict[str, Any]]:
+        rows = []
+        async for chunk in self.stream(plan, params):
+            rows.extend(chunk)
+        return rows
+
+    async def stream(
+        self, plan: QueryPlan, params: dict, chunk_size: int = 1000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Same chunked interface as AsyncDatabase.stream, over merged rows.
+        """
+        shards = self.shard_map.shards_for(plan) or []
+        combine = COMBINERS[plan.aggregation.lower()]
+        limit = self.grouped_row_limit if plan.group_by else self.row_limit
+        disjoint = bool(plan.group_by) and any(
+            self.shard_map.is_shard_key(plan.fact_table, d) for d in plan.group_by
+        )
+        chunks = self._scatter(
+            [shard.url for shard in shards], plan, params, chunk_size,
+            limit=limit, strict=not disjoint,
+        )
+
+        try:
+            if disjoint:
+                # Disjoint groups: nothing to merge
+                async for chunk in chunks:
+                    rows = [_finish(row, [_partial(row)], combine) for row in chunk[:limit]]
+                    limit -= len(rows)
+                    if rows:
+                        yield rows
+                    if limit <= 0:
+                        break
+                return
+
+            merged: Dict[Tuple[Any, ...], Tuple[dict, List[Partial]]] = {}
+            async for chunk in chunks:
+                for row in chunk:
+                    key = tuple(row[d] for d in plan.group_by)
+                    entry = merged.setdefault(key, (row, []))
+                    entry[1].append(_partial(row))
+        finally:
+            # Also runs when the consumer stops early (client disconnect)
+            await chunks.aclose()
+
+        rows = [_finish(row, partials, combine) for row, partials in merged.values()]
+        rows = rows[:limit]
+        for offset in range(0, len(rows), chunk_size):
+            yield rows[offset:offset + chunk_size]
+
+    async def dispose(self) -> None:
+        for database in self._databases.values():
+            await database.dispose()
+
+    #INTERNAL HELPERS
+
+    def _sql(self, url: str, plan: QueryPlan, limit: int) -> str:
+        compiler = self._compilers[url]
+        key = (compiler.dialect, limit, plan.model_dump_json())
+        with self._lock:
+            sql = self._compiled.get(key)
+        if sql is None:
+            ast = compiler.compile_partials(plan).limit(limit)
+            self.sql_validator.validate(ast)
+            sql = compiler.render(ast)
+            with self._lock:
+                self._compiled[key] = sql
+        return sql
+
+    async def _scatter(
+        self,
+        urls: List[str],
+        plan: QueryPlan,
+        params: dict,
+        chunk_size: int,
+        limit: int,
+        strict: bool,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Chunks of every shard's partials in arrival order. Each shard is
+        read by its own task and buffers at most one chunk ahead. With
+        strict, a shard that returns `limit` rows fails the query.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(len(urls), 1))
+        statements = {url: self._sql(url, plan, limit) for url in urls}
+
+        async def pump(url: str) -> None:
+            returned = 0
+            try:
+                async for chunk in self._databases[url].stream(
+                    statements[url], params, chunk_size
+                ):
+                    returned += len(chunk)
+                    if strict and returned >= limit:
+                        raise DatabaseExecutionError(
+                            f"Shard result reached the row limit ({limit}); "
+                            "merged groups would be incomplete"
+                        )
+                    await queue.put(chunk)
+            except Exception as e:
+                await queue.put(e)
+            else:
+                await queue.put(None)
+
+        tasks = [asyncio.create_task(pump(url)) for url in urls]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                item = await queue.get()
+                if item is None:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            # Early exit or failure: stop the other shards' cursors
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _column_name(reference: str) -> str:
+    return reference.rpartition(".")[2]
+
+
+def _partial(row: Dict[str, Any]) -> Partial:
+    return row["value"], row.get("value_count") or 0
+
+
+def _finish(row: Dict[str, Any], partials: List[Partial], combine) -> Dict[str, Any]:
+    finished = {k: v for k, v in row.items() if k not in ("value", "value_count")}
+    finished["value"] = combine(partials)
+    return finished
@@ -1,26 +1,117 @@
-import signal
+import asyncio
+import time
 from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
 
 
 class QueryTimeoutError(Exception):
     pass
 
 
-@contextmanager
-def query_timeout(seconds: int):
+class ClientDisconnectedError(Exception):
+    pass
+
+
+class Deadline:
     """
-    Enforces a hard execution timeout.
-    If exceeded, the query is aborted.
+    Absolute time budget for one request.
+    Plain monotonic arithmetic: safe in any thread or event loop,
+    unlike the signal.alarm approach it replaces.
     """
 
-    def _handle_timeout(signum, frame):
-        raise QueryTimeoutError(f"Query exceeded {seconds}s timeout")
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self, stage: str = "query") -> None:
+        if self.expired():
+            raise QueryTimeoutError(f"{stage} exceeded {self.seconds}s deadline")
+
 
-    old_handler = signal.signal(signal.SIGALRM, _handle_timeout)
-    signal.alarm(seconds)
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar(
+    "query_deadline", default=None
+)
 
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+@contextmanager
+def query_timeout(seconds: float):
+    """
+    Enforces a hard execution deadline for everything run inside the block.
+    The deadline follows the request through contextvars, so the database
+    layer can turn it into a statement timeout and cancel the driver call.
+    """
+    deadline = Deadline(seconds)
+    token = _current_deadline.set(deadline)
     try:
-        yield
+        yield deadline
     finally:
-        signal.alarm(0)
-        signal.signal(signal.SIGALRM, old_handler)
+        _current_deadline.reset(token)
+
+
+def detach_deadline() -> None:
+    """
+    Clears the deadline inherited by a background task, whose lifetime is
+    not bound to the request that spawned it.
+    """
+    _current_deadline.set(None)
+
+
+async def run_with_deadline(awaitable: Awaitable[T], stage: str = "query") -> T:
+    """
+    Awaits under the current deadline, cancelling the awaitable (and with
+    it the in-flight driver call) when the budget runs out.
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return await awaitable
+
+    if deadline.expired():
+        _discard(awaitable)
+        deadline.check(stage)
+
+    try:
+        return await asyncio.wait_for(awaitable, timeout=deadline.remaining())
+    except asyncio.TimeoutError:
+        raise QueryTimeoutError(f"{stage} exceeded {deadline.seconds}s deadline")
+
+
+async def run_until_disconnected(
+    awaitable: Awaitable[T],
+    is_disconnected: Callable[[], Awaitable[bool]],
+    poll_interval: float = 0.1,
+) -> T:
+    """
+    Awaits while polling the client connection; a disconnect cancels the
+    awaitable so abandoned requests stop holding database slots.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await is_disconnected():
+                task.cancel()
+                raise ClientDisconnectedError("Client disconnected")
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+
+def _discard(awaitable) -> None:
+    # Avoid "coroutine was never awaited" for work we refuse to start
+    if asyncio.iscoroutine(awaitable):
+        awaitable.close()
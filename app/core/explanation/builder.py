@@ -23,17 +23,25 @@ class ExplanationBuilder:
             "description": metric.description,
             "time_range": intent.time_range.value,
             "grain": metric.grain,
-            "aggregation": f"{plan.aggregation.upper()}({plan.measure_expression})",
+            "aggregation": f"{metric.measure.aggregation.upper()}({metric.measure.expression})",
             "filters_applied": self._filters(metric),
             "grouped_by": ", ".join(plan.group_by) if plan.group_by else "none",
-            "data_sources": ", ".join(
-                [metric.tables["fact"]] +
-                metric.tables.get("dimensions", [])
-            ),
+            "data_sources": self._sources(metric, plan),
         }
 
         return explanation
 
+    def _sources(self, metric: MetricDefinition, plan: QueryPlan) -> str:
+        sources = ", ".join(
+            [metric.tables["fact"]] +
+            metric.tables.get("dimensions", [])
+        )
+        if plan.source == "rollup":
+            return f"{plan.fact_table} (daily rollup of {sources})"
+        if plan.backend is not None:
+            return f"{sources} (via the {plan.backend} backend)"
+        return sources
+
     def _filters(self, metric: MetricDefinition) -> str:
         parts = []
         for f in metric.required_filters:
@@ -1,8 +1,12 @@
-from typing import List, Literal
-from pydantic import BaseModel, Field, validator
+import hashlib
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field, PrivateAttr, validator
 
 JoinType = Literal["inner", "left", "right"]
 
+# Execution backend of metrics that do not name one
+DEFAULT_BACKEND = "warehouse"
+
 
 class JoinDefinition(BaseModel):
     left: str
@@ -50,8 +54,17 @@ class MetricDefinition(BaseModel):
     supports_dimensions: bool = Field(default=False)
     pii_exposure: bool = Field(default=False)
 
+    # Execution backend name (e.g. duckdb); None runs on the warehouse
+    backend: Optional[str] = Field(default=None)
+
+    _fingerprint: str = PrivateAttr(default="")
+
     #EXISTING VALIDATORS
 
+    @validator("backend")
+    def default_backend_is_none(cls, v):
+        return None if v == DEFAULT_BACKEND else v
+
     @validator("allowed_filters")
     def no_overlap_with_forbidden(cls, v, values):
         forbidden = set(values.get("forbidden_filters", []))
@@ -78,6 +91,26 @@ class MetricDefinition(BaseModel):
             )
         return v
 
+    def fingerprint(self) -> str:
+        """
+        Hash of the whole definition. Results cached under it can never be
+        served for an edited definition, even by a query that was already
+        in flight when the edit was reloaded.
+        """
+        return self._fingerprint
+
+    def model_post_init(self, __context) -> None:
+        # Computed once per loaded definition, not on every request
+        self._fingerprint = self._hash()
+
+    def model_copy(self, *, update=None, deep: bool = False) -> "MetricDefinition":
+        copy = super().model_copy(update=update, deep=deep)
+        copy._fingerprint = copy._hash()
+        return copy
+
+    def _hash(self) -> str:
+        return hashlib.blake2b(self.model_dump_json().encode("utf-8"), digest_size=8).hexdigest()
+
     #SEMANTIC VALIDATION
 
     def validate_semantics(self) -> None:
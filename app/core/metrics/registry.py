@@ -1,59 +1,141 @@
+import json
+import logging
+import os
+import threading
 import yaml
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Tuple, Optional
+from typing import Callable, Dict, Iterable, List, Tuple, Optional
+
+import pydantic
+
 from app.core.intent.schema import MetricName, MetricVersion
 from .models import MetricDefinition
 
+logger = logging.getLogger(__name__)
+
+MetricKey = Tuple[str, str]
+FileSignature = Tuple[int, int]
+
+# Raises to reject definitions the deployment cannot serve (e.g. unknown backends)
+MetricCheck = Callable[[Iterable[MetricDefinition]], None]
+
+# libyaml-backed loader when available; same safety as SafeLoader
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Bump when the snapshot layout changes
+SNAPSHOT_FORMAT = 3
+
+# Below this many files a process pool costs more than it saves
+PARALLEL_PARSE_THRESHOLD = 64
+
+
+def parse_metric_file(file: Path) -> MetricDefinition:
+    with open(file, "r", encoding="utf-8") as f:
+        raw = yaml.load(f, Loader=YAML_LOADER)
+
+    if raw is None:
+        raise RuntimeError(f"Empty metric file: {file.name}")
+
+    #Structural validation
+    metric = MetricDefinition(**raw)
+
+    #semantic validation
+    metric.validate_semantics()
+
+    return metric
+
 
 class MetricRegistry:
     """
     Loads, validates, and stores metric definitions.
     This is the single source of truth for business semantics.
-    """
 
-    def __init__(self, metrics_path: Path):
-        self.metrics_path = metrics_path
-        self._metrics: Dict[Tuple[str, str], MetricDefinition] = {}
+    The loaded definitions form an immutable snapshot. reload() builds a new
+    snapshot off to the side and swaps it in with a single assignment, so
+    readers never lock and never observe a half-loaded registry.
 
-    def load(self) -> None:
-        if not self.metrics_path.exists():
-            raise RuntimeError(f"Metrics path does not exist: {self.metrics_path}")
+    With a snapshot_path, validated definitions are also persisted as JSON
+    keyed on every file's mtime and size. Workers whose files match load it
+    directly instead of parsing YAML.
 
-        for file in self.metrics_path.glob("*.yaml"):
-            with open(file, "r", encoding="utf-8") as f:
-                raw = yaml.safe_load(f)
+    `check` runs on every candidate snapshot, on load and on reload, before
+    it is swapped in.
+    """
 
-            if raw is None:
-                raise RuntimeError(f"Empty metric file: {file.name}")
+    def __init__(
+        self,
+        metrics_path: Path,
+        snapshot_path: Optional[Path] = None,
+        check: Optional[MetricCheck] = None,
+    ):
+        self.metrics_path = metrics_path
+        self.snapshot_path = snapshot_path
+        self.check = check
+        self._metrics: Dict[MetricKey, MetricDefinition] = {}
+        self._files: Dict[Path, Tuple[FileSignature, MetricDefinition]] = {}
+        self._reload_lock = threading.Lock()
+        # Bumped on every load so derived caches can detect stale contents
+        self.revision = 0
 
-            #Structural validation
-            metric = MetricDefinition(**raw)
+    def load(self) -> None:
+        with self._reload_lock:
+            snapshot = self._read_snapshot()
+            if snapshot is not None:
+                self._check(snapshot[1])
+                self._swap(*snapshot)
+                return
 
-            #semantic validation
-            metric.validate_semantics()
+            files, metrics = self._read({})
+            self._check(metrics)
+            self._swap(files, metrics)
+            self._write_snapshot()
 
-            key = (metric.metric_name, metric.version)
+    def reload(self) -> List[MetricKey]:
+        """
+        Re-validates only files whose mtime or size changed and swaps the
+        snapshot. Unchanged definitions keep their identity.
+        Returns the (metric, version) keys that were added, removed or changed.
+        On any validation error the current snapshot stays in place.
+        """
+        with self._reload_lock:
+            previous = self._metrics
+            files, metrics = self._read(self._files)
 
-            if key in self._metrics:
-                raise RuntimeError(
-                    f"Duplicate metric definition for {metric.metric_name}:{metric.version}"
-                )
+            changed = []
+            for key in set(previous) | set(metrics):
+                old, new = previous.get(key), metrics.get(key)
+                if old is not None and new is not None and old == new:
+                    metrics[key] = old
+                elif old is not new:
+                    changed.append(key)
 
-            self._metrics[key] = metric
+            self._check(metrics)
+            self._swap(files, metrics)
+            if changed:
+                self._write_snapshot()
+            return sorted(changed)
 
     def get(self, metric_name: str, version: Optional[str] = None) -> MetricDefinition:
         if version is None:
             version = self._default_version(metric_name)
 
         key = (metric_name, version)
-        if key not in self._metrics:
+        metric = self._metrics.get(key)
+        if metric is None:
             raise KeyError(f"Metric not found: {metric_name}:{version}")
-        return self._metrics[key]
+        return metric
 
 
     def all_metrics(self):
         return list(self._metrics.values())
-    
+
+    def file_signatures(self) -> Dict[Path, FileSignature]:
+        return {
+            file: self._signature(file)
+            for file in self.metrics_path.glob("*.yaml")
+        }
+
     def _default_version(self, metric_name: str) -> str:
         if metric_name == MetricName.revenue.value:
             return MetricVersion.v1.value
@@ -61,3 +143,119 @@ class MetricRegistry:
             return MetricVersion.v1.value
 
         raise KeyError(f"No default version defined for metric: {metric_name}")
+
+    #INTERNAL HELPERS
+
+    def _read(self, previous_files):
+        if not self.metrics_path.exists():
+            raise RuntimeError(f"Metrics path does not exist: {self.metrics_path}")
+
+        files: Dict[Path, Tuple[FileSignature, MetricDefinition]] = {}
+        metrics: Dict[MetricKey, MetricDefinition] = {}
+
+        signatures = {
+            file: self._signature(file)
+            for file in sorted(self.metrics_path.glob("*.yaml"))
+        }
+        stale = [
+            file for file, signature in signatures.items()
+            if file not in previous_files or previous_files[file][0] != signature
+        ]
+        parsed = dict(zip(stale, self._parse(stale)))
+
+        for file, signature in signatures.items():
+            metric = parsed[file] if file in parsed else previous_files[file][1]
+
+            key = (metric.metric_name, metric.version)
+
+            if key in metrics:
+                raise RuntimeError(
+                    f"Duplicate metric definition for {metric.metric_name}:{metric.version}"
+                )
+
+            files[file] = (signature, metric)
+            metrics[key] = metric
+
+        return files, metrics
+
+    def _parse(self, files: List[Path]) -> List[MetricDefinition]:
+        if len(files) < PARALLEL_PARSE_THRESHOLD:
+            return [parse_metric_file(file) for file in files]
+
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+            return list(pool.map(parse_metric_file, files, chunksize=32))
+
+    def _read_snapshot(self):
+        """
+        Returns (files, metrics) from the compiled snapshot, or None when it
+        is missing, unreadable or no longer matches the files on disk.
+        """
+        if self.snapshot_path is None or not self.snapshot_path.exists():
+            return None
+
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+
+            if snapshot.get("format") != [SNAPSHOT_FORMAT, pydantic.VERSION]:
+                return None
+            if snapshot.get("metrics_path") != str(self.metrics_path):
+                return None
+
+            files: Dict[Path, Tuple[FileSignature, MetricDefinition]] = {}
+            metrics: Dict[MetricKey, MetricDefinition] = {}
+            for entry in snapshot["files"]:
+                metric = MetricDefinition.model_validate(entry["metric"])
+                files[Path(entry["file"])] = (tuple(entry["signature"]), metric)
+                metrics[(metric.metric_name, metric.version)] = metric
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring unreadable metric snapshot: %s", e)
+            return None
+
+        if {f: sig for f, (sig, _) in files.items()} != self.file_signatures():
+            return None
+
+        return files, metrics
+
+    def _write_snapshot(self) -> None:
+        if self.snapshot_path is None:
+            return
+
+        # Data only: a snapshot can never run code when it is read back
+        snapshot = {
+            "format": [SNAPSHOT_FORMAT, pydantic.VERSION],
+            "metrics_path": str(self.metrics_path),
+            "files": [
+                {
+                    "file": str(file),
+                    "signature": list(signature),
+                    "metric": metric.model_dump(mode="json"),
+                }
+                for file, (signature, metric) in self._files.items()
+            ],
+        }
+
+        try:
+            self.snapshot_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            # Write then rename so concurrent workers never read a partial file
+            tmp = self.snapshot_path.with_name(f"{self.snapshot_path.name}.{os.getpid()}.tmp")
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp, self.snapshot_path)
+        except OSError as e:
+            logger.warning("Could not write metric snapshot: %s", e)
+
+    def _check(self, metrics: Dict[MetricKey, MetricDefinition]) -> None:
+        if self.check is not None:
+            self.check(metrics.values())
+
+    def _swap(self, files, metrics) -> None:
+        self._metrics = metrics
+        self._files = files
+        self.revision += 1
+
+    @staticmethod
+    def _signature(file: Path) -> FileSignature:
+        stat = file.stat()
+        return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,63 @@
+import logging
+import threading
+from typing import Callable, List, Optional, Sequence
+
+from .registry import MetricKey, MetricRegistry
+
+logger = logging.getLogger(__name__)
+
+Invalidator = Callable[[str, Optional[str]], object]
+
+
+class MetricReloader:
+    """
+    Hot reload of the metric registry.
+
+    Swaps in a re-validated snapshot and invalidates derived state only for
+    the (metric, version) pairs that actually changed. Can be triggered
+    explicitly (admin endpoint) or by polling the metrics directory.
+    """
+
+    def __init__(self, registry: MetricRegistry, invalidators: Sequence[Invalidator]):
+        self.registry = registry
+        self.invalidators = list(invalidators)
+
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    def reload(self) -> List[MetricKey]:
+        changed = self.registry.reload()
+
+        for metric_name, version in changed:
+            for invalidate in self.invalidators:
+                invalidate(metric_name, version)
+
+        if changed:
+            logger.info("Metric registry reloaded, changed: %s", changed)
+        return changed
+
+    def watch(self, interval_seconds: float) -> None:
+        """
+        Polls file signatures in a daemon thread and reloads on change.
+        Invalid edits are logged and leave the current snapshot serving.
+        """
+        if self._watcher is not None:
+            return
+
+        def poll():
+            seen = self.registry.file_signatures()
+            while not self._stop.wait(interval_seconds):
+                current = self.registry.file_signatures()
+                if current == seen:
+                    continue
+                seen = current
+                try:
+                    self.reload()
+                except Exception as e:
+                    logger.warning("Metric reload rejected: %s", e)
+
+        self._watcher = threading.Thread(target=poll, name="metric-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -1,17 +1,71 @@
-from typing import List
+from typing import NamedTuple, Optional, Protocol, Sequence
 
+from app.core.enforcement.time import (
+    TimeRangeResolutionError,
+    TimeWindow,
+    resolve_time_window,
+)
 from app.core.intent.schema import Intent
 from app.core.metrics.models import MetricDefinition, FilterDefinition
-from .query_plan import QueryPlan, JoinPlan, FilterPlan
+from .query_plan import ROLLUP_BACKEND, QueryPlan, JoinPlan, FilterPlan
+
+
+# Aggregations whose daily partials combine exactly, and how to combine them
+ROLLUP_AGGREGATIONS = {
+    "sum": "sum",
+    "count": "sum",
+    "min": "min",
+    "max": "max",
+}
+
+
+class RollupMatch(NamedTuple):
+    table: str
+    # Decimal places of the source values; None when they are not decimals
+    scale: Optional[int]
+
+
+class RollupCatalog(Protocol):
+    def find(
+        self,
+        metric_name: str,
+        version: str,
+        dimensions: Sequence[str],
+        filters: Sequence[FilterPlan],
+        window: TimeWindow,
+    ) -> Optional[RollupMatch]:
+        """Returns a rollup table that can answer the plan, or None."""
 
 
 class QueryPlanBuilder:
     """
     Builds a deterministic QueryPlan from validated intent and metric metadata.
     No SQL generation happens here.
+
+    With a rollup catalog, plans for additive aggregations that carry only
+    the metric's required filters are answered from a covering daily
+    rollup instead of the fact table.
     """
 
+    def __init__(self, rollups: Optional[RollupCatalog] = None):
+        self.rollups = rollups
+
     def build(self, intent: Intent, metric: MetricDefinition) -> QueryPlan:
+        plan = self.fact_plan(
+            metric,
+            intent.time_range.value,
+            dimensions=[dim.value for dim in intent.dimensions],
+            requested_filters=[f.value for f in intent.requested_filters],
+        )
+        return self._route(metric, plan)
+
+    def fact_plan(
+        self,
+        metric: MetricDefinition,
+        time_range: str,
+        dimensions: Sequence[str] = (),
+        requested_filters: Sequence[str] = (),
+    ) -> QueryPlan:
         joins = [
             JoinPlan(
                 left=j.left,
@@ -21,23 +75,14 @@ class QueryPlanBuilder:
             for j in metric.joins
         ]
 
-        filters: List[FilterPlan] = []
-
         #Required filters from metric definition
-        for rf in metric.required_filters:
-            filters.append(
-                FilterPlan(
-                    column=rf.column,
-                    operator=rf.operator,
-                    value=rf.value,
-                )
-            )
+        filters = self._required_filters(metric)
 
         # User-requested filters
-        for f in intent.requested_filters:
+        for column in requested_filters:
             filters.append(
                 FilterPlan(
-                    column=f.value,
+                    column=column,
                     operator="IS NOT",
                     value="NULL",
                 )
@@ -45,7 +90,7 @@ class QueryPlanBuilder:
 
 
         # Group-by comes ONLY from dimensions
-        group_by = [dim.value for dim in intent.dimensions]
+        group_by = list(dimensions)
 
         return QueryPlan(
             metric_name=metric.metric_name,
@@ -57,5 +102,50 @@ class QueryPlanBuilder:
             filters=filters,
             group_by=group_by,
             time_column=metric.time_column,
-            time_range=intent.time_range.value,
+            time_range=time_range,
+            backend=metric.backend,
+        )
+
+    #INTERNAL HELPERS
+
+    def _required_filters(self, metric: MetricDefinition):
+        return [
+            FilterPlan(column=rf.column, operator=rf.operator, value=rf.value)
+            for rf in metric.required_filters
+        ]
+
+    def _route(self, metric: MetricDefinition, plan: QueryPlan) -> QueryPlan:
+        if self.rollups is None:
+            return plan
+
+        combine = ROLLUP_AGGREGATIONS.get(plan.aggregation.lower())
+        if combine is None:
+            return plan
+
+        # Rollups are built with exactly the metric's required filters
+        if plan.filters != self._required_filters(metric):
+            return plan
+
+        try:
+            window = resolve_time_window(plan.time_range)
+        except TimeRangeResolutionError:
+            return plan
+
+        match = self.rollups.find(
+            plan.metric_name, plan.metric_version, plan.group_by, plan.filters, window
         )
+        if match is None:
+            return plan
+        table = match.table
+
+        return plan.model_copy(update={
+            "source": "rollup",
+            "fact_table": table,
+            "joins": [],
+            "measure_expression": f"{table}.value",
+            "aggregation": combine,
+            "filters": [],
+            "time_column": f"{table}.day",
+            "backend": ROLLUP_BACKEND,
+            "round_to": match.scale,
+        })
@@ -1,6 +1,9 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 
+# Backend of plans answered from the local (SQLite) rollup store
+ROLLUP_BACKEND = "rollup"
+
 
 class JoinPlan(BaseModel):
     left: str
@@ -36,3 +39,14 @@ class QueryPlan(BaseModel):
 
     time_column: str
     time_range: str
+
+    # "fact" scans the fact table; "rollup" reads a daily pre-aggregate
+    source: str = "fact"
+
+    # Execution backend of the metric; None is the default warehouse,
+    # ROLLUP_BACKEND the rollup store
+    backend: Optional[str] = None
+
+    # Decimal places the result is rounded to; rollup sums are floating
+    # point in SQLite, the warehouse's DECIMAL answer is exact
+    round_to: Optional[int] = None
@@ -0,0 +1,164 @@
+from typing import Callable, Dict
+
+import sqlglot
+from sqlglot import exp
+
+from app.core.enforcement.time import END_PARAM, START_PARAM
+from app.core.planning.query_plan import FilterPlan, QueryPlan
+
+
+# SQLAlchemy backend name -> sqlglot dialect
+DIALECTS: Dict[str, str] = {
+    "mysql": "mysql",
+    "postgresql": "postgres",
+    "sqlite": "sqlite",
+    "duckdb": "duckdb",
+}
+
+AGGREGATIONS: Dict[str, Callable[..., exp.Expression]] = {
+    "sum": exp.Sum,
+    "count": exp.Count,
+    "avg": exp.Avg,
+    "min": exp.Min,
+    "max": exp.Max,
+}
+
+COMPARISONS: Dict[str, Callable[..., exp.Expression]] = {
+    "=": exp.EQ,
+    "!=": exp.NEQ,
+    ">": exp.GT,
+    ">=": exp.GTE,
+    "<": exp.LT,
+    "<=": exp.LTE,
+}
+
+
+class SQLCompilationError(Exception):
+    pass
+
+
+def dialect_for_url(database_url: str) -> str:
+    """
+    Maps a SQLAlchemy URL (sync or async driver) to a sqlglot dialect.
+    """
+    backend = database_url.split("://", 1)[0].split("+", 1)[0]
+    if backend not in DIALECTS:
+        raise SQLCompilationError(f"Unsupported database backend: {backend}")
+    return DIALECTS[backend]
+
+
+class SQLCompiler:
+    """
+    Deterministic QueryPlan -> sqlglot AST compiler.
+    No string assembly; the resulting tree is validated as-is and
+    rendered once per dialect.
+    """
+
+    def __init__(
+        self,
+        dialect: str = "mysql",
+        row_limit: int = 100,
+        grouped_row_limit: int = 100_000,
+    ):
+        self.dialect = dialect
+        self.row_limit = row_limit
+        # Grouped results are streamed, so they may be far larger than KPIs
+        self.grouped_row_limit = grouped_row_limit
+
+    def compile(self, plan: QueryPlan) -> exp.Select:
+        aggregation = AGGREGATIONS.get(plan.aggregation.lower())
+        if aggregation is None:
+            raise SQLCompilationError(f"Unsupported aggregation: {plan.aggregation}")
+
+        dimensions = [exp.column(d) for d in plan.group_by]
+        measure = aggregation(this=self._expression(plan.measure_expression))
+        if plan.round_to is not None:
+            measure = exp.Round(this=measure, decimals=exp.Literal.number(plan.round_to))
+
+        select = exp.select(*dimensions, exp.alias_(measure, "value"))
+        select = select.from_(exp.to_table(plan.fact_table))
+
+        for j in plan.joins:
+            select = select.join(
+                exp.to_table(j.right.split(".")[0]),
+                on=exp.EQ(this=self._column(j.left), expression=self._column(j.right)),
+                join_type=j.type,
+            )
+
+        time_column = self._column(plan.time_column)
+        conditions = [
+            exp.GTE(this=time_column, expression=exp.Placeholder(this=START_PARAM)),
+            exp.LT(this=time_column.copy(), expression=exp.Placeholder(this=END_PARAM)),
+        ]
+        conditions.extend(self._filter(f) for f in plan.filters)
+
+        select = select.where(exp.and_(*conditions))
+
+        if dimensions:
+            select = select.group_by(*(d.copy() for d in dimensions))
+            return select.limit(self.grouped_row_limit)
+
+        return select.limit(self.row_limit)
+
+    def compile_partials(self, plan: QueryPlan) -> exp.Select:
+        """
+        Mergeable partial aggregates of a plan, unlimited (the limit applies
+        after merging). avg is carried as value (sum) + value_count so
+        partials combine exactly.
+        """
+        averaged = plan.aggregation.lower() == "avg"
+        if averaged:
+            plan = plan.model_copy(update={"aggregation": "sum"})
+
+        select = self.compile(plan)
+        select.set("limit", None)
+        if averaged:
+            count = exp.Count(this=self._expression(plan.measure_expression))
+            select = select.select(exp.alias_(count, "value_count"))
+        return select
+
+    def compile_rollup(self, plan: QueryPlan) -> exp.Select:
+        """
+        Daily partial aggregates of a plan: one row per day and dimension
+        combination, for rollups and day buckets.
+        """
+        day = exp.TsOrDsToDate(this=self._column(plan.time_column))
+
+        select = self.compile_partials(plan)
+        select = select.select(exp.alias_(day, "day"))
+        return select.group_by(day.copy())
+
+    def render(self, ast: exp.Expression) -> str:
+        # Bind parameters stay in SQLAlchemy's :name form for every dialect
+        ast = ast.transform(
+            lambda node: exp.var(f":{node.name}")
+            if isinstance(node, exp.Placeholder)
+            else node
+        )
+        return ast.sql(dialect=self.dialect)
+
+    #INTERNAL HELPERS
+
+    def _column(self, reference: str) -> exp.Column:
+        table, _, name = reference.rpartition(".")
+        return exp.column(name, table=table or None)
+
+    def _expression(self, expression: str) -> exp.Expression:
+        # Measure expressions come from versioned metadata, not from generated SQL
+        return sqlglot.parse_one(expression, read=self.dialect)
+
+    def _filter(self, f: FilterPlan) -> exp.Expression:
+        column = self._column(f.column)
+        operator = f.operator.upper()
+
+        if operator in ("IS", "IS NOT"):
+            if f.value.upper() != "NULL":
+                raise SQLCompilationError(f"{operator} only supports NULL, got {f.value}")
+            check = exp.Is(this=column, expression=exp.Null())
+            return exp.Not(this=check) if operator == "IS NOT" else check
+
+        comparison = COMPARISONS.get(operator)
+        if comparison is None:
+            raise SQLCompilationError(f"Unsupported filter operator: {f.operator}")
+
+        return comparison(this=column, expression=exp.Literal.string(f.value))
@@ -1,23 +1,86 @@
-from app.core.planning.query_plan import QueryPlan
+from typing import Dict, Optional
+
+from sqlglot import exp, parse_one
+from sqlglot.errors import ParseError
+
+from app.core.planning.query_plan import ROLLUP_BACKEND, QueryPlan
+from app.core.sql.dialects import SQLCompiler
 from app.llm.client import LLMClient
 
 
+GENERATION_MODES = ("native", "llm")
+
+
 class SQLGenerationError(Exception):
     pass
 
 
 class SQLGenerator:
     """
-    Converts a QueryPlan into SQL using an LLM strictly
-    as a syntax assembler.
+    Converts a QueryPlan into SQL.
+
+    The default "native" mode compiles the plan straight into a sqlglot AST.
+    The optional "llm" mode uses an LLM strictly as a syntax assembler.
+
+    Plans of metrics on another execution backend are compiled for that
+    backend's dialect (backend_dialects), rollup plans for SQLite; all
+    others for `dialect`.
     """
 
-    def __init__(self, llm_client: LLMClient):
+    def __init__(
+        self,
+        llm_client: Optional[LLMClient] = None,
+        mode: str = "native",
+        dialect: str = "mysql",
+        backend_dialects: Optional[Dict[str, str]] = None,
+    ):
+        if mode not in GENERATION_MODES:
+            raise SQLGenerationError(f"Unknown SQL generation mode: {mode}")
+        if mode == "llm" and llm_client is None:
+            raise SQLGenerationError("LLM generation mode requires an LLM client")
+
         self.llm = llm_client
+        self.mode = mode
+        self.compiler = SQLCompiler(dialect=dialect)
+        self.backend_compilers = {
+            backend: SQLCompiler(dialect=backend_dialect)
+            for backend, backend_dialect in {
+                ROLLUP_BACKEND: "sqlite", **(backend_dialects or {})
+            }.items()
+        }
 
     def generate(self, plan: QueryPlan) -> str:
-        prompt = self._build_prompt(plan)
+        return self.render(self.generate_ast(plan), plan.backend)
 
+    def generate_ast(self, plan: QueryPlan) -> exp.Expression:
+        """
+        Returns the query as an AST, ready for SQLValidator.
+        Only LLM output is ever parsed from text.
+        """
+        compiler = self.compiler_for(plan.backend)
+        if self.mode == "native":
+            return compiler.compile(plan)
+
+        sql = self._generate_with_llm(plan)
+        try:
+            return parse_one(sql, read=compiler.dialect)
+        except ParseError as e:
+            raise SQLGenerationError(f"LLM returned unparseable SQL: {e}")
+
+    def render(self, ast: exp.Expression, backend: Optional[str] = None) -> str:
+        return self.compiler_for(backend).render(ast)
+
+    def compiler_for(self, backend: Optional[str]) -> SQLCompiler:
+        if backend is None:
+            return self.compiler
+        compiler = self.backend_compilers.get(backend)
+        if compiler is None:
+            raise SQLGenerationError(f"Unknown execution backend: {backend}")
+        return compiler
+
+    #INTERNAL HELPERS
+
+    def _generate_with_llm(self, plan: QueryPlan) -> str:
         sql = self.llm.generate_sql({
         "aggregation": plan.aggregation.upper(),
         "measure_expression": plan.measure_expression,
@@ -33,50 +96,3 @@ class SQLGenerator:
             raise SQLGenerationError("LLM returned empty SQL")
 
         return sql.strip()
-
-    #INTERNAL HELPERS
-
-    def _render_value(self, value):
-        """
-        Render SQL literals correctly.
-        Strings must be quoted, numbers must not.
-        """
-        if isinstance(value, str):
-            return f"'{value}'"
-        return value
-
-    def _build_prompt(self, plan: QueryPlan) -> str:
-        # Joins
-        joins = "\n".join(
-            f"{j.type.upper()} JOIN {j.right.split('.')[0]} ON {j.left} = {j.right}"
-            for j in plan.joins
-        )
-
-        # Filters
-        filters = " AND ".join(
-            f"{f.column} {f.operator} {self._render_value(f.value)}"
-            for f in plan.filters
-        )
-
-        filter_clause = f"\n  AND {filters}" if filters else ""
-
-        # Group by
-        group_by = ", ".join(plan.group_by) if plan.group_by else ""
-        group_by_clause = f"\nGROUP BY {group_by}" if group_by else ""
-
-        return f"""
-You are a SQL formatter.
-
-You are NOT allowed to change logic.
-You MUST follow the structure below exactly.
-
-Generate a single SELECT query.
-
-SELECT
-  {plan.aggregation.upper()}({plan.measure_expression}) AS value
-FROM {plan.fact_table}
-{joins}
-WHERE {plan.time_column} BETWEEN <START_DATE> AND <END_DATE>{filter_clause}
-{group_by_clause}
-LIMIT 100;
-"""
@@ -1,5 +1,11 @@
+import hashlib
+import threading
+from typing import Callable, Dict, List, Set, Tuple, Type, Union
+
+from cachetools import LRUCache
 from sqlglot import parse_one
 from sqlglot.expressions import (
+    Expression,
     Select,
     Insert,
     Update,
@@ -11,52 +17,131 @@ from sqlglot.expressions import (
     Join,
 )
 
+from app.core.sql.errors import SQLValidationError  # re-exported
 
-class SQLValidationError(Exception):
-    pass
 
+NodeRule = Callable[[Expression], None]
+StatementRule = Callable[[Expression, Set[type]], None]
 
 class SQLValidator:
     """
     AST-level SQL validator.
     Rejects unsafe, ambiguous, or non-analytic queries.
+
+    Node rules are dispatched by node type during a single walk of the AST;
+    statement rules run once afterwards. Fingerprints of SQL text that has
+    already passed are remembered, so repeated queries skip parsing entirely.
     """
 
-    def validate(self, sql: str) -> None:
+    def __init__(self, fingerprint_cache_size: int = 1024):
+        self._node_rules: List[Tuple[Tuple[Type[Expression], ...], NodeRule]] = []
+        self._statement_rules: List[StatementRule] = []
+        self._dispatch: Dict[type, Tuple[NodeRule, ...]] = {}
+
+        # A size of 0 disables the fingerprint cache
+        self._validated = LRUCache(maxsize=max(fingerprint_cache_size, 1))
+        self._remember = fingerprint_cache_size > 0
+        self._lock = threading.Lock()
+
+        self.register_node_rule(
+            (Insert, Update, Delete, Drop, Alter, Create), _block_destructive_ops
+        )
+        self.register_node_rule((Subquery,), _block_subqueries)
+        self.register_node_rule((Join,), _block_cross_joins)
+        self.register_statement_rule(_ensure_select_only)
+        self.register_statement_rule(_ensure_limit)
+
+    def register_node_rule(
+        self, node_types: Tuple[Type[Expression], ...], rule: NodeRule
+    ) -> None:
+        with self._lock:
+            self._node_rules.append((tuple(node_types), rule))
+            self._dispatch.clear()
+            self._validated.clear()
+
+    def register_statement_rule(self, rule: StatementRule) -> None:
+        with self._lock:
+            self._statement_rules.append(rule)
+            self._validated.clear()
+
+    def validate(self, sql: Union[str, Expression]) -> None:
+        """
+        Accepts SQL text or an already-built AST.
+        ASTs from the native compiler are checked without a parse round trip.
+        """
+        if isinstance(sql, Expression):
+            self._check(sql)
+            return
+
+        fingerprint = self.fingerprint(sql)
+        with self._lock:
+            if fingerprint in self._validated:
+                return
+
         try:
             ast = parse_one(sql)
         except Exception as e:
             raise SQLValidationError(f"Invalid SQL syntax: {e}")
 
-        self._ensure_select_only(ast)
-        self._block_destructive_ops(ast)
-        self._block_subqueries(ast)
-        self._block_cross_joins(ast)
-        self._ensure_limit(ast)
+        self._check(ast)
 
-    def _ensure_select_only(self, ast) -> None:
-        if not ast.find(Select):
-            raise SQLValidationError("Only SELECT queries are allowed")
+        if self._remember:
+            with self._lock:
+                self._validated[fingerprint] = True
 
-    def _block_destructive_ops(self, ast) -> None:
-        forbidden = (Insert, Update, Delete, Drop, Alter, Create)
-        for node in ast.walk():
-            if isinstance(node, forbidden):
-                raise SQLValidationError(
-                    f"Destructive operation not allowed: {type(node).__name__}"
-                )
+    @staticmethod
+    def fingerprint(sql: str) -> str:
+        # Exact text: even whitespace can change meaning (a newline ends a -- comment)
+        return hashlib.blake2b(sql.encode("utf-8"), digest_size=16).hexdigest()
 
-    def _block_subqueries(self, ast) -> None:
-        for node in ast.walk():
-            if isinstance(node, Subquery):
-                raise SQLValidationError("Subqueries are not allowed")
+    #INTERNAL HELPERS
+
+    def _check(self, ast: Expression) -> None:
+        seen: Set[type] = set()
 
-    def _block_cross_joins(self, ast) -> None:
         for node in ast.walk():
-            if isinstance(node, Join):
-                if node.args.get("kind") == "cross":
-                    raise SQLValidationError("CROSS JOIN is not allowed")
+            node_type = type(node)
+            seen.add(node_type)
+            for rule in self._rules_for(node_type):
+                rule(node)
+
+        for rule in self._statement_rules:
+            rule(ast, seen)
+
+    def _rules_for(self, node_type: type) -> Tuple[NodeRule, ...]:
+        rules = self._dispatch.get(node_type)
+        if rules is None:
+            rules = tuple(
+                rule
+                for types, rule in self._node_rules
+                if issubclass(node_type, types)
+            )
+            self._dispatch[node_type] = rules
+        return rules
+
+
+#DEFAULT RULES
+
+def _ensure_select_only(ast: Expression, seen: Set[type]) -> None:
+    if not any(issubclass(t, Select) for t in seen):
+        raise SQLValidationError("Only SELECT queries are allowed")
+
+
+def _block_destructive_ops(node: Expression) -> None:
+    raise SQLValidationError(
+        f"Destructive operation not allowed: {type(node).__name__}"
+    )
+
+
+def _block_subqueries(node: Expression) -> None:
+    raise SQLValidationError("Subqueries are not allowed")
+
+
+def _block_cross_joins(node: Expression) -> None:
+    if (node.args.get("kind") or "").upper() == "CROSS":
+        raise SQLValidationError("CROSS JOIN is not allowed")
+
 
-    def _ensure_limit(self, ast) -> None:
-        if ast.args.get("limit") is None:
-            raise SQLValidationError("LIMIT clause is required")
+def _ensure_limit(ast: Expression, seen: Set[type]) -> None:
+    if ast.args.get("limit") is None:
+        raise SQLValidationError("LIMIT clause is required")
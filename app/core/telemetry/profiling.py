@@ -0,0 +1,64 @@
+import cProfile
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+    """
+    Captures a cProfile of 1 in every `every` requests and writes it as a
+    pstats file to `directory`, for offline analysis (snakeviz, gprof2dot,
+    flameprof).
+
+    cProfile hooks the event-loop thread, so other requests interleaved on
+    the loop appear in the same profile; only one capture runs at a time.
+    """
+
+    def __init__(self, directory: Optional[Path], every: int = 0):
+        self.directory = Path(directory) if directory else None
+        self.every = every
+
+        self._requests = itertools.count(1)
+        self._busy = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None and self.every > 0
+
+    @contextmanager
+    def sample(self, name: str = "request"):
+        if not self.enabled or next(self._requests) % self.every:
+            yield None
+            return
+
+        if not self._busy.acquire(blocking=False):
+            yield None
+            return
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            try:
+                yield profile
+            finally:
+                profile.disable()
+            self._write(profile, name)
+        finally:
+            self._busy.release()
+
+    #INTERNAL HELPERS
+
+    def _write(self, profile: cProfile.Profile, name: str) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{name}-{time.time_ns()}.prof"
+            profile.dump_stats(path)
+        except OSError as e:
+            # Profiling must never fail the request it observed
+            logger.warning("Could not write profile: %s", e)
@@ -0,0 +1,89 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.telemetry.instruments import STAGE_SECONDS
+
+
+class RequestTrace:
+    """
+    Stage-by-stage timings of one request, offsets relative to its start.
+    Nested stages (e.g. db_execute inside result_cache) overlap in time.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[Tuple[str, float, float]] = []
+
+    def add(self, stage: str, started: float, ended: float) -> None:
+        self.spans.append((stage, started - self.started, ended - started))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total_ms": _ms(time.perf_counter() - self.started),
+            "stages": [
+                {"stage": stage, "start_ms": _ms(offset), "duration_ms": _ms(duration)}
+                for stage, offset, duration in self.spans
+            ],
+        }
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar(
+    "request_trace", default=None
+)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def request_trace(enabled: bool = True):
+    """
+    Collects the stages run inside the block (and in tasks spawned from it).
+    Yields None when disabled, so untraced requests only pay a ContextVar read
+    per stage.
+    """
+    if not enabled:
+        yield None
+        return
+
+    trace = RequestTrace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def stage(name: str) -> "StageTimer":
+    """
+    Times a pipeline stage into copilot_stage_duration_seconds and, when the
+    request is traced, into its RequestTrace.
+    """
+    return StageTimer(name)
+
+
+class StageTimer:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ended = time.perf_counter()
+        STAGE_SECONDS.observe(ended - self.started, self.name)
+
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(self.name, self.started, ended)
+        return False
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
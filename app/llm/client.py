@@ -62,8 +62,8 @@ class LLMClient:
             for j in plan["joins"]
         )
 
-        filters = " AND ".join(
-            f"{f.column} {f.operator} '{f.value}'"
+        filters = "".join(
+            f"\n    AND {f.column} {f.operator} '{f.value}'"
             for f in plan["filters"]
         )
 
@@ -78,8 +78,8 @@ class LLMClient:
     {plan['aggregation']}({plan['measure_expression']}) AS value
     FROM {plan['fact_table']}
     {joins}
-    WHERE {plan['time_column']} BETWEEN '2024-01-01' AND '2024-01-31'
-    AND {filters}
+    WHERE {plan['time_column']} >= :start_date
+    AND {plan['time_column']} < :end_date{filters}
     {group_by}
     LIMIT 100
     """.strip()
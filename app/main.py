@@ -1,46 +1,44 @@
-from pathlib import Path
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from typing import Optional
 
-from app.core.metrics.registry import MetricRegistry
-from app.core.intent.extractor import IntentExtractor
-from app.core.intent.validator import IntentValidator, IntentValidationError
-from app.core.planning.builder import QueryPlanBuilder
-from app.core.sql.generator import SQLGenerator
-from app.core.sql.validator import SQLValidator, SQLValidationError
-from app.core.execution.cache import QueryCache
-from app.llm.client import LLMClient
-from app.config.database import get_database_url
-from app.core.execution.db import Database
-
-database = Database(get_database_url())
-
-
-
-app = FastAPI(title="Enterprise Analytics Copilot")
+from fastapi import FastAPI
 
+from app.api.admin import router as admin_router
+from app.api.export import router as export_router
+from app.api.query import router as query_router
+from app.api.telemetry import router as telemetry_router
+from app.container import Container
 
-#GLOBAL SINGLETONS (intentional, read-only semantics)
 
-METRICS_PATH = Path(__file__).resolve().parents[1] / "metadata" / "metrics"
+def create_app(container: Optional[Container] = None) -> FastAPI:
+    """
+    Components live on app.state.container and are built lazily, so
+    importing this module stays cheap; the lifespan warms them up before
+    the first request is served and releases them on shutdown.
+    """
+    container = container or Container()
 
-metric_registry = MetricRegistry(METRICS_PATH)
-metric_registry.load()
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await container.start()
+        try:
+            yield
+        finally:
+            await container.stop()
 
-intent_validator = IntentValidator(metric_registry)
-query_plan_builder = QueryPlanBuilder()
-sql_validator = SQLValidator()
-cache = QueryCache()
+    app = FastAPI(title="Enterprise Analytics Copilot", lifespan=lifespan)
+    app.state.container = container
 
-# LLM client will be mocked initially
-llm_client = LLMClient()
-intent_extractor = IntentExtractor(llm_client)
-sql_generator = SQLGenerator(llm_client)
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
 
+    app.include_router(query_router)
+    app.include_router(export_router)
+    app.include_router(admin_router)
+    app.include_router(telemetry_router)
 
-@app.get("/health")
-def health():
-    return {"status": "ok"}
+    return app
 
 
-from app.api.query import router as query_router
-app.include_router(query_router)
+app = create_app()
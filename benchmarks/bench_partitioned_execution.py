@@ -0,0 +1,117 @@
+"""
+Benchmark: single-statement vs partition-parallel execution of a long
+(90-day) scalar window on a seeded local SQLite database.
+
+Each partitioned run uses a fresh IncrementalExecutor, so no day bucket
+is reused and every run scans the whole window.
+
+On a single core, every partition count is slower than the single
+statement (the GROUP BY day costs more than one SUM, and SQLite cannot
+scan sub-ranges in parallel); only multi-core warehouses can gain.
+
+    python -m benchmarks.bench_partitioned_execution [ROWS]
+"""
+import asyncio
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from app.core.enforcement.time import TimeWindow, window_params
+from app.core.execution.db import AsyncDatabase
+from app.core.execution.incremental import IncrementalExecutor
+from app.core.metrics.registry import MetricRegistry
+from app.core.planning.builder import QueryPlanBuilder
+from app.core.sql.dialects import SQLCompiler
+from app.core.sql.validator import SQLValidator
+
+METRICS_PATH = Path(__file__).resolve().parents[1] / "metadata" / "metrics"
+
+DAYS = 90
+REPEATS = 3
+
+
+def seed(path: Path, rows: int) -> None:
+    rng = random.Random(42)
+    today = date.today()
+    connection = sqlite3.connect(path)
+    connection.executescript(
+        """
+        CREATE TABLE users (id INTEGER PRIMARY KEY, region TEXT);
+        CREATE TABLE products (id INTEGER PRIMARY KEY);
+        CREATE TABLE orders (
+            order_id INTEGER PRIMARY KEY, user_id INT, product_id INT,
+            amount REAL, status TEXT, order_date TEXT
+        );
+        """
+    )
+    connection.executemany("INSERT INTO users VALUES (?, ?)", [(i, "EU") for i in range(100)])
+    connection.executemany("INSERT INTO products VALUES (?)", [(i,) for i in range(100)])
+    connection.executemany(
+        "INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (
+                i, rng.randrange(100), rng.randrange(100), rng.random() * 100,
+                "COMPLETED" if rng.random() < 0.8 else "PENDING",
+                (today - timedelta(days=1 + rng.randrange(DAYS))).isoformat(),
+            )
+            for i in range(rows)
+        ),
+    )
+    connection.execute("CREATE INDEX orders_order_date ON orders (order_date)")
+    connection.commit()
+    connection.close()
+
+
+async def timed(run) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        await run()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+async def bench(url: str) -> dict:
+    registry = MetricRegistry(METRICS_PATH)
+    registry.load()
+    plan = QueryPlanBuilder().fact_plan(registry.get("revenue", "v1"), "custom")
+    compiler = SQLCompiler("sqlite")
+
+    end = date.today()
+    window = TimeWindow(end - timedelta(days=DAYS), end, datetime.max)
+    sql = compiler.render(compiler.compile(plan))
+
+    database = AsyncDatabase(url)
+    results = {}
+    try:
+        results["single statement (before)"] = await timed(
+            lambda: database.execute(sql, window_params(window))
+        )
+        for partitions in (1, 2, 4, 8):
+            results[f"{partitions} partition(s)"] = await timed(
+                lambda: IncrementalExecutor(
+                    database, compiler, SQLValidator(), partitions=partitions
+                ).execute(plan, window)
+            )
+    finally:
+        await database.dispose()
+    return results
+
+
+def main(rows: int = 1_000_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "warehouse.db"
+        seed(path, rows)
+        results = asyncio.run(bench(f"sqlite+aiosqlite:///{path}"))
+
+    print(f"revenue over {DAYS} days, {rows} orders (best of {REPEATS})")
+    for name, ms in results.items():
+        print(f"  {name:<28} {ms:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,229 @@
+"""
+Benchmark: every pipeline stage and the full /query round trip, for every
+intent shape the validator accepts, against a seeded synthetic warehouse.
+
+Stage timings call the pipeline components directly (no memoization):
+intent_validate, plan_build, sql_generate, sql_validate,
+explanation_build and db_execute. query_cold is a /query round trip with
+the result, artifact and day-bucket caches cleared first; query_warm is
+the same request served from cache.
+
+Results are medians in milliseconds, written to
+benchmarks/baselines/pipeline-<ORDERS>.json with --update-baseline and
+otherwise compared against that file: a stage that is both more than
+--threshold slower (relative) and more than --min-delta-ms slower
+(absolute) than its baseline is a regression, and the run exits 1.
+
+    python -m benchmarks.bench_pipeline [--orders N] [--update-baseline]
+"""
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+
+from benchmarks.warehouse import seed_warehouse, use_warehouse
+
+BASELINES_PATH = Path(__file__).resolve().parent / "baselines"
+
+STAGES = (
+    "intent_validate",
+    "plan_build",
+    "sql_generate",
+    "sql_validate",
+    "explanation_build",
+    "db_execute",
+    "query_cold",
+    "query_warm",
+)
+
+Results = Dict[str, Dict[str, float]]
+
+
+def intent_shapes(validator) -> Iterator[dict]:
+    """
+    Every metric x time range x dimension set x filter set the validator accepts.
+    """
+    from app.core.intent.schema import Dimension, FilterIntent, Intent, MetricName, TimeRange
+    from app.core.intent.validator import IntentValidationError
+
+    for metric, time_range, dimensions, filters in itertools.product(
+        MetricName, TimeRange, _subsets(Dimension), _subsets(FilterIntent)
+    ):
+        payload = {
+            "metric": metric.value,
+            "time_range": time_range.value,
+            "dimensions": [d.value for d in dimensions],
+            "requested_filters": [f.value for f in filters],
+        }
+        try:
+            validator.validate(Intent(**payload))
+        except IntentValidationError:
+            continue
+        yield payload
+
+
+def shape_id(payload: dict) -> str:
+    return "/".join((
+        payload["metric"],
+        payload["time_range"],
+        "dims=" + ",".join(payload["dimensions"]),
+        "filters=" + ",".join(payload["requested_filters"]),
+    ))
+
+
+def run(orders: int, repeats: int) -> Results:
+    use_warehouse(seed_warehouse(orders))
+
+    from fastapi.testclient import TestClient
+
+    from app.core.enforcement.time import resolve_time_window, window_params
+    from app.core.intent.schema import Intent
+    from app.main import create_app
+
+    app = create_app()
+    container = app.state.container
+    results: Results = {}
+
+    with TestClient(app) as client:
+        compiled = container.artifact_cache
+        for payload in intent_shapes(container.intent_validator):
+            intent = Intent(**payload)
+            metric = container.metric_registry.get(intent.metric.value, None)
+            plan = compiled.plan_builder.build(intent, metric)
+            ast = compiled.sql_generator.generate_ast(plan)
+            sql = compiled.sql_generator.render(ast)
+            params = window_params(resolve_time_window(intent.time_range.value))
+
+            def query():
+                response = client.post("/query", json=payload)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{shape_id(payload)}: {response.status_code} {response.text}")
+
+            def cold():
+                container.cache.invalidate(metric.metric_name)
+                compiled.clear()
+                if container.incremental_executor is not None:
+                    container.incremental_executor.invalidate(metric.metric_name)
+                query()
+
+            timings = {
+                "intent_validate": lambda: container.intent_validator.validate(intent),
+                "plan_build": lambda: compiled.plan_builder.build(intent, metric),
+                "sql_generate": lambda: compiled.sql_generator.render(
+                    compiled.sql_generator.generate_ast(plan)
+                ),
+                "sql_validate": lambda: compiled.sql_validator.validate(ast),
+                "explanation_build": lambda: compiled.explanation_builder.build(intent, metric, plan),
+                "db_execute": lambda: client.portal.call(container.database.execute, sql, params),
+                "query_cold": cold,
+                "query_warm": query,
+            }
+            results[shape_id(payload)] = {
+                name: median_ms(timings[name], repeats) for name in STAGES
+            }
+
+    return results
+
+
+def median_ms(fn: Callable[[], object], repeats: int, min_seconds: float = 0.1) -> float:
+    """
+    Median of at least `repeats` runs, and of enough runs to fill
+    min_seconds, so sub-millisecond stages are not one noisy sample.
+    """
+    fn()  # warm-up
+    samples = []
+    deadline = time.perf_counter() + min_seconds
+    while len(samples) < repeats or time.perf_counter() < deadline:
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 4)
+
+
+def compare(
+    current: Results,
+    baseline: Results,
+    threshold: float,
+    min_delta_ms: float,
+) -> List[str]:
+    """
+    Regressions of current against baseline, one message per shape/stage.
+    Shapes or stages missing from either side are not compared.
+    """
+    regressions = []
+    for shape, stages in current.items():
+        for name, ms in stages.items():
+            before = baseline.get(shape, {}).get(name)
+            if before is None:
+                continue
+            if ms > before * (1 + threshold) and ms - before > min_delta_ms:
+                regressions.append(
+                    f"{shape} {name}: {before:.3f} ms -> {ms:.3f} ms "
+                    f"(+{(ms / before - 1) * 100 if before else float('inf'):.0f}%)"
+                )
+    return regressions
+
+
+def baseline_path(orders: int) -> Path:
+    return BASELINES_PATH / f"pipeline-{orders}.json"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="allowed relative slowdown per stage (0.5 = 50%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="ignore slowdowns smaller than this, in ms")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run(args.orders, args.repeats)
+
+    print(f"{len(results)} intent shapes, {args.orders} orders, median of {args.repeats}")
+    print(f"  {'shape':<58}" + "".join(f"{name:>18}" for name in STAGES))
+    for shape, stages in results.items():
+        print(f"  {shape:<58}" + "".join(f"{stages[name]:>15.3f} ms" for name in STAGES))
+
+    path = baseline_path(args.orders)
+    if args.update_baseline:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "orders": args.orders,
+            "repeats": args.repeats,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {path}")
+        return 0
+
+    if not path.exists():
+        print(f"No baseline at {path}; run with --update-baseline to create one")
+        return 0
+
+    baseline = json.loads(path.read_text())["results"]
+    regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    print(f"{len(regressions)} regression(s) against {path}")
+    return 1 if regressions else 0
+
+
+#INTERNAL HELPERS
+
+def _subsets(values) -> Iterator[tuple]:
+    values = list(values)
+    return itertools.chain.from_iterable(
+        itertools.combinations(values, n) for n in range(len(values) + 1)
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
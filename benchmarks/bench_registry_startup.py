@@ -0,0 +1,68 @@
+"""
+Benchmark: MetricRegistry startup time for N synthetic metric files.
+
+Compares the original path (pure-Python SafeLoader, sequential), the
+libyaml loader sequentially and in a process pool, and loading the
+compiled snapshot.
+
+    python -m benchmarks.bench_registry_startup [N]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+import yaml
+
+import app.core.metrics.registry as registry_module
+from app.core.metrics.registry import MetricRegistry
+
+
+TEMPLATE = (
+    Path(__file__).resolve().parents[1] / "metadata" / "metrics" / "revenue_v1.yaml"
+).read_text()
+
+
+def write_metrics(directory: Path, count: int) -> None:
+    directory.mkdir(parents=True)
+    for i in range(count):
+        (directory / f"synthetic_{i}_v1.yaml").write_text(
+            TEMPLATE.replace("metric_name: revenue", f"metric_name: synthetic_{i}")
+        )
+
+
+def timed_load(metrics_path: Path, snapshot_path=None) -> float:
+    registry = MetricRegistry(metrics_path, snapshot_path)
+    started = time.perf_counter()
+    registry.load()
+    elapsed = time.perf_counter() - started
+    assert len(registry.all_metrics()) > 0
+    return elapsed * 1000
+
+
+def main(count: int = 1000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        metrics_path = Path(tmp) / "metrics"
+        snapshot_path = Path(tmp) / "metrics.snapshot"
+        write_metrics(metrics_path, count)
+
+        results = {}
+        with mock.patch.object(registry_module, "PARALLEL_PARSE_THRESHOLD", count + 1):
+            with mock.patch.object(registry_module, "YAML_LOADER", yaml.SafeLoader):
+                results["SafeLoader, sequential (before)"] = timed_load(metrics_path)
+            results["CSafeLoader, sequential"] = timed_load(metrics_path)
+
+        with mock.patch.object(registry_module, "PARALLEL_PARSE_THRESHOLD", 1):
+            results["CSafeLoader, process pool"] = timed_load(metrics_path)
+
+        timed_load(metrics_path, snapshot_path)  # writes the snapshot
+        results["compiled snapshot"] = timed_load(metrics_path, snapshot_path)
+
+    print(f"MetricRegistry.load() with {count} metric files")
+    for name, ms in results.items():
+        print(f"  {name:<34} {ms:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
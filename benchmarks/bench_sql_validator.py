@@ -0,0 +1,82 @@
+"""
+Micro-benchmark: per-validation cost of SQLValidator.
+
+Compares the previous multi-walk validator against the single-pass
+validator on text (cold and with a warm fingerprint cache) and on an
+AST handed over by the native compiler.
+
+    python -m benchmarks.bench_sql_validator
+"""
+import timeit
+
+from sqlglot import parse_one
+from sqlglot.expressions import (
+    Select, Insert, Update, Delete, Drop, Alter, Create, Subquery, Join,
+)
+
+from app.core.planning.query_plan import FilterPlan, JoinPlan, QueryPlan
+from app.core.sql.dialects import SQLCompiler
+from app.core.sql.validator import SQLValidator
+
+
+PLAN = QueryPlan(
+    metric_name="revenue",
+    metric_version="v1",
+    fact_table="orders",
+    joins=[
+        JoinPlan(left="orders.user_id", right="users.id", type="inner"),
+        JoinPlan(left="orders.product_id", right="products.id", type="inner"),
+    ],
+    measure_expression="orders.amount",
+    aggregation="sum",
+    filters=[FilterPlan(column="orders.status", operator="=", value="COMPLETED")],
+    group_by=["region"],
+    time_column="orders.order_date",
+    time_range="last_month",
+)
+
+
+def legacy_validate(sql: str) -> None:
+    """
+    The validator as it was before the single-pass rewrite.
+    """
+    ast = parse_one(sql)
+    assert ast.find(Select)
+    forbidden = (Insert, Update, Delete, Drop, Alter, Create)
+    for node in ast.walk():
+        assert not isinstance(node, forbidden)
+    for node in ast.walk():
+        assert not isinstance(node, Subquery)
+    for node in ast.walk():
+        if isinstance(node, Join):
+            assert node.args.get("kind") != "cross"
+    assert ast.args.get("limit") is not None
+
+
+def _per_call_us(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main(number: int = 2000) -> None:
+    compiler = SQLCompiler()
+    ast = compiler.compile(PLAN)
+    sql = compiler.render(ast)
+
+    cold = SQLValidator(fingerprint_cache_size=0)
+    warm = SQLValidator()
+    warm.validate(sql)
+
+    results = {
+        "legacy (parse + 3 walks + find)": _per_call_us(lambda: legacy_validate(sql), number),
+        "single pass, text, cold": _per_call_us(lambda: cold.validate(sql), number),
+        "single pass, AST from compiler": _per_call_us(lambda: cold.validate(ast), number),
+        "fingerprint hit": _per_call_us(lambda: warm.validate(sql), number),
+    }
+
+    baseline = results["legacy (parse + 3 walks + find)"]
+    for name, us in results.items():
+        print(f"{name:<34} {us:10.1f} us/validation  ({baseline / us:6.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
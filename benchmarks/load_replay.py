@@ -0,0 +1,266 @@
+"""
+Load replay: sends recorded /query traffic at a configurable concurrency
+and arrival rate and reports throughput, latency percentiles, cache hit
+ratio and an error breakdown.
+
+Each JSONL line is either an intent payload or {"payload": ..., "headers": ...}.
+Lines that are neither (e.g. other JSONL files in the repo) are skipped.
+benchmarks/traffic/sample.jsonl is skewed synthetic traffic: a Zipf mix
+of the valid intent shapes over a few tenants, with ~3% invalid requests.
+
+By default the app runs in-process against a seeded synthetic warehouse;
+with --url the traffic goes to a running server instead, e.g.
+
+    uvicorn app.main:app --workers 4
+    python -m benchmarks.load_replay --url http://127.0.0.1:8000
+
+With --rate the arrivals are open-loop (Poisson at that many requests/s,
+at most --concurrency in flight) and latency is measured from the
+scheduled arrival, so a stalled server is not hidden by a stalled client.
+Without it, --concurrency workers send back to back.
+
+Cache, pool and admission settings are read from the environment as
+usual, so runs can be compared by changing e.g. QUERY_CACHE_TTL_SECONDS.
+
+    python -m benchmarks.load_replay [FILE] [--requests N] [--concurrency C] [--rate R]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import httpx
+
+from benchmarks.warehouse import seed_warehouse, use_warehouse
+
+SAMPLE_TRAFFIC = Path(__file__).resolve().parent / "traffic" / "sample.jsonl"
+
+CACHED_SOURCES = ("cache", "stale")
+
+
+class ReplayRequest(NamedTuple):
+    payload: dict
+    headers: Dict[str, str]
+
+
+class Outcome(NamedTuple):
+    latency: float
+    status: Optional[int]
+    source: Optional[str]
+    error: Optional[str]
+
+
+def load_traffic(path: Path) -> Tuple[List[ReplayRequest], int]:
+    """
+    Returns the replayable requests in file order and the number of lines skipped.
+    """
+    traffic, skipped = [], 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                skipped += 1
+                continue
+
+            if isinstance(record, dict) and isinstance(record.get("payload"), dict):
+                traffic.append(ReplayRequest(record["payload"], record.get("headers") or {}))
+            elif isinstance(record, dict) and ("metric" in record or "question" in record):
+                traffic.append(ReplayRequest(record, {}))
+            else:
+                skipped += 1
+    return traffic, skipped
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    traffic: Sequence[ReplayRequest],
+    total: int,
+    concurrency: int,
+    rate: float = 0.0,
+    seed: int = 0,
+) -> Tuple[List[Outcome], float]:
+    """
+    Sends `total` requests, cycling through the traffic in order.
+    Returns the outcomes and the wall-clock duration of the run.
+    """
+    requests = list(itertools.islice(itertools.cycle(traffic), total))
+    outcomes: List[Outcome] = []
+    started = time.perf_counter()
+
+    if rate > 0:
+        rng = random.Random(seed)
+        limit = asyncio.Semaphore(concurrency)
+        arrival = started
+
+        async def scheduled(request: ReplayRequest, at: float):
+            await asyncio.sleep(max(at - time.perf_counter(), 0))
+            async with limit:
+                outcomes.append(await _send(client, request, at))
+
+        tasks = []
+        for request in requests:
+            arrival += rng.expovariate(rate)
+            tasks.append(asyncio.create_task(scheduled(request, arrival)))
+        await asyncio.gather(*tasks)
+    else:
+        queue = iter(requests)
+
+        async def worker():
+            for request in queue:
+                outcomes.append(await _send(client, request, time.perf_counter()))
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return outcomes, time.perf_counter() - started
+
+
+def summarize(outcomes: Sequence[Outcome], elapsed: float) -> dict:
+    latencies = sorted(o.latency for o in outcomes)
+    succeeded = [o for o in outcomes if o.status == 200]
+    sources = Counter(o.source for o in succeeded)
+    cached = sum(sources[s] for s in CACHED_SOURCES)
+
+    return {
+        "requests": len(outcomes),
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(outcomes) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": _ms(percentile(latencies, 0.50)),
+            "p95": _ms(percentile(latencies, 0.95)),
+            "p99": _ms(percentile(latencies, 0.99)),
+            "max": _ms(latencies[-1] if latencies else 0.0),
+        },
+        "cache_hit_ratio": round(cached / len(succeeded), 3) if succeeded else 0.0,
+        "sources": dict(sources),
+        "errors": dict(Counter(o.error for o in outcomes if o.error).most_common()),
+    }
+
+
+def percentile(ordered: Sequence[float], q: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted sequence.
+    """
+    if not ordered:
+        return 0.0
+    # round() first: 0.07 * 100 is 7.000000000000001 in floating point
+    rank = max(math.ceil(round(q * len(ordered), 9)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+@asynccontextmanager
+async def in_process_client(orders: int):
+    """
+    An httpx client bound to app.main over ASGI, with its lifespan running.
+    """
+    use_warehouse(seed_warehouse(orders))
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://replay") as client:
+            yield client
+
+
+async def run(args) -> dict:
+    traffic, skipped = load_traffic(args.file)
+    if not traffic:
+        raise SystemExit(f"No replayable requests in {args.file} ({skipped} lines skipped)")
+
+    timeout = httpx.Timeout(args.timeout)
+    if args.url:
+        client_context = httpx.AsyncClient(
+            base_url=args.url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=args.concurrency),
+        )
+    else:
+        client_context = in_process_client(args.orders)
+
+    async with client_context as client:
+        client.timeout = timeout
+        outcomes, elapsed = await replay(
+            client, traffic, args.requests or len(traffic),
+            args.concurrency, args.rate, args.seed,
+        )
+        summary = summarize(outcomes, elapsed)
+        summary["skipped_lines"] = skipped
+        try:
+            summary["server"] = (await client.get("/admin/stats")).json()
+        except (httpx.HTTPError, ValueError):
+            pass
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("file", nargs="?", type=Path, default=SAMPLE_TRAFFIC)
+    parser.add_argument("--url", help="replay against a running server instead of in-process")
+    parser.add_argument("--requests", type=int, default=0,
+                        help="requests to send, cycling through the file (default: one pass)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="open-loop arrival rate in requests/s (default: closed loop)")
+    parser.add_argument("--orders", type=int, default=100_000,
+                        help="synthetic warehouse size for in-process runs")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    summary = asyncio.run(run(args))
+
+    latency = summary["latency_ms"]
+    print(f"{summary['requests']} requests in {summary['seconds']} s "
+          f"({summary['throughput_rps']} req/s, concurrency {args.concurrency}"
+          + (f", {args.rate} req/s offered)" if args.rate else ", closed loop)"))
+    print(f"  latency   p50 {latency['p50']} ms  p95 {latency['p95']} ms  "
+          f"p99 {latency['p99']} ms  max {latency['max']} ms")
+    print(f"  cache     hit ratio {summary['cache_hit_ratio']}  {summary['sources']}")
+    for error, count in summary["errors"].items():
+        print(f"  error     {count:>6}  {error}")
+    if summary["skipped_lines"]:
+        print(f"  skipped   {summary['skipped_lines']} non-request lines")
+
+    if args.json:
+        args.json.write_text(json.dumps(summary, indent=2) + "\n")
+    return 0
+
+
+#INTERNAL HELPERS
+
+async def _send(client: httpx.AsyncClient, request: ReplayRequest, since: float) -> Outcome:
+    try:
+        response = await client.post("/query", json=request.payload, headers=request.headers)
+    except httpx.HTTPError as e:
+        return Outcome(time.perf_counter() - since, None, None, type(e).__name__)
+
+    latency = time.perf_counter() - since
+    if response.status_code != 200:
+        try:
+            detail = str(response.json().get("detail", ""))
+        except ValueError:
+            detail = response.text
+        return Outcome(latency, response.status_code, None, f"{response.status_code} {detail[:80]}")
+
+    # Grouped results are NDJSON whose first line carries the source
+    header = json.loads(response.text.partition("\n")[0])
+    return Outcome(latency, 200, header.get("source"), None)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Seeded synthetic analytics warehouse for benchmarks.
+
+Builds a local SQLite database with the orders/users/products schema the
+metric definitions in metadata/metrics/*.yaml query: the fact and
+dimension tables, their join keys, the measure, time and required-filter
+columns, and the bare dimension/filter columns (region, user_city,
+product). The same (orders, seed) always produces the same rows, and
+seeded files are cached between runs.
+
+    python -m benchmarks.warehouse [ORDERS]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from app.core.intent.schema import Dimension
+from app.core.metrics.registry import MetricRegistry
+
+METRICS_PATH = Path(__file__).resolve().parents[1] / "metadata" / "metrics"
+
+# Bump when the schema or the row distribution changes, so cached files are rebuilt
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE users (id INTEGER PRIMARY KEY, region TEXT, user_city TEXT);
+CREATE TABLE products (id INTEGER PRIMARY KEY, product TEXT);
+CREATE TABLE orders (
+    order_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    amount REAL,
+    status TEXT NOT NULL,
+    order_date TEXT NOT NULL
+);
+"""
+
+INDEXES = """
+CREATE INDEX orders_order_date ON orders (order_date);
+CREATE INDEX orders_user_id ON orders (user_id);
+CREATE INDEX orders_product_id ON orders (product_id);
+"""
+
+REGIONS = ("EU", "US", "APAC", "LATAM", None)
+CITIES = ("Paris", "Berlin", "New York", "Austin", "Tokyo", "Sydney", "Lima", None)
+STATUSES = ("COMPLETED",) * 8 + ("PENDING", "CANCELLED")
+
+# Orders span this many days before today, covering every relative time range
+HISTORY_DAYS = 400
+
+BATCH_SIZE = 100_000
+
+
+def warehouse_path(orders: int, seed: int = 42, directory: Optional[Path] = None) -> Path:
+    directory = directory or Path(tempfile.gettempdir()) / "analytics-copilot" / "bench"
+    return Path(directory) / f"warehouse-{orders}-s{seed}-v{SCHEMA_VERSION}.db"
+
+
+def seed_warehouse(
+    orders: int,
+    seed: int = 42,
+    directory: Optional[Path] = None,
+    today: Optional[date] = None,
+) -> Path:
+    """
+    Returns the path of a seeded warehouse, building it on first use.
+    Dates are relative to today, so a file is only reused on the day it
+    was built.
+    """
+    today = today or date.today()
+    path = warehouse_path(orders, seed, directory)
+    if path.exists() and date.fromtimestamp(path.stat().st_mtime) == today:
+        return path
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(f".{os.getpid()}.tmp")
+    partial.unlink(missing_ok=True)
+
+    rng = random.Random(seed)
+    users = max(100, orders // 100)
+    products = max(50, orders // 1000)
+
+    connection = sqlite3.connect(partial)
+    try:
+        connection.executescript(
+            "PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;" + SCHEMA
+        )
+        connection.executemany(
+            "INSERT INTO users VALUES (?, ?, ?)",
+            ((i, rng.choice(REGIONS), rng.choice(CITIES)) for i in range(users)),
+        )
+        connection.executemany(
+            "INSERT INTO products VALUES (?, ?)",
+            ((i, f"product-{i}") for i in range(products)),
+        )
+
+        rows = _orders(rng, orders, users, products, today)
+        for _ in range(0, orders, BATCH_SIZE):
+            connection.executemany(
+                "INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?)",
+                (row for _, row in zip(range(BATCH_SIZE), rows)),
+            )
+        connection.executescript(INDEXES)
+        connection.execute("ANALYZE")
+        connection.commit()
+    finally:
+        connection.close()
+
+    _check_schema(partial)
+    os.replace(partial, path)
+    return path
+
+
+def use_warehouse(path: Path) -> None:
+    """
+    Points the app at the warehouse; call before it starts, since its
+    components read their configuration when first built. Local caches, rollups, shards
+    and replicas are off unless the environment already configures them.
+    """
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    for name in ("QUERY_CACHE_L2_PATH", "ROLLUP_PATH", "SHARD_MAP_PATH", "READ_REPLICA_URLS"):
+        os.environ.setdefault(name, "")
+
+
+#INTERNAL HELPERS
+
+def _orders(
+    rng: random.Random, orders: int, users: int, products: int, today: date
+) -> Iterator[Tuple]:
+    for i in range(orders):
+        # Skewed towards recent days, like real order volume
+        age = int(HISTORY_DAYS * rng.random() ** 1.5)
+        yield (
+            i,
+            rng.randrange(users),
+            rng.randrange(products),
+            round(rng.lognormvariate(3.5, 1.0), 2),
+            rng.choice(STATUSES),
+            (today - timedelta(days=1 + age)).isoformat(),
+        )
+
+
+def _check_schema(path: Path) -> None:
+    """
+    Fails fast when a metric definition references a column the
+    synthetic schema does not have.
+    """
+    connection = sqlite3.connect(path)
+    try:
+        columns = {
+            (table, row[1])
+            for (table,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            for row in connection.execute(f"PRAGMA table_info({table})")
+        }
+    finally:
+        connection.close()
+
+    bare = {name for _, name in columns}
+    registry = MetricRegistry(METRICS_PATH)
+    registry.load()
+
+    for metric in registry.all_metrics():
+        qualified = [metric.time_column, metric.measure.expression]
+        qualified += [j.left for j in metric.joins] + [j.right for j in metric.joins]
+        qualified += [f.column for f in metric.required_filters]
+        for reference in qualified:
+            table, _, name = reference.rpartition(".")
+            if (table, name) not in columns:
+                raise RuntimeError(f"{metric.metric_name}: no column {reference} in the warehouse")
+
+        for name in [d.value for d in Dimension] + list(metric.allowed_filters):
+            if name not in bare:
+                raise RuntimeError(f"{metric.metric_name}: no column {name} in the warehouse")
+
+
+def main(orders: int = 1_000_000) -> None:
+    started = time.perf_counter()
+    path = seed_warehouse(orders)
+    print(f"{path} ({orders} orders) ready in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
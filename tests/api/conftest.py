@@ -0,0 +1,47 @@
+import shutil
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.container import Container
+from app.main import create_app
+from benchmarks.warehouse import seed_warehouse
+
+METRICS_PATH = Path(__file__).resolve().parents[2] / "metadata" / "metrics"
+
+
+@pytest.fixture
+def warehouse(tmp_path, monkeypatch):
+    """
+    Points the app at a small seeded warehouse with local caches, rollups,
+    shards and replicas off.
+    """
+    path = seed_warehouse(500, directory=tmp_path)
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{path}")
+    monkeypatch.delenv("ASYNC_DATABASE_URL", raising=False)
+    for name in ("QUERY_CACHE_L2_PATH", "ROLLUP_PATH", "SHARD_MAP_PATH", "READ_REPLICA_URLS"):
+        monkeypatch.setenv(name, "")
+    return path
+
+
+@pytest.fixture
+def client(warehouse):
+    with TestClient(create_app()) as client:
+        yield client
+
+
+@pytest.fixture
+def dimensional_client(warehouse, tmp_path):
+    """
+    Same app, but revenue allows dimensional breakdowns (grouped NDJSON).
+    """
+    metrics_path = tmp_path / "metrics"
+    shutil.copytree(METRICS_PATH, metrics_path)
+    revenue = metrics_path / "revenue_v1.yaml"
+    revenue.write_text(
+        revenue.read_text().replace("supports_dimensions: false", "supports_dimensions: true")
+    )
+
+    with TestClient(create_app(Container(metrics_path))) as client:
+        yield client
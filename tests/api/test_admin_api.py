@@ -0,0 +1,13 @@
+def test_query_cancel_is_disabled_by_default(client):
+    response = client.post("/admin/queries/cancel")
+
+    assert response.status_code == 404
+
+
+def test_query_cancel_runs_when_enabled(client, monkeypatch):
+    monkeypatch.setenv("ADMIN_QUERY_CANCEL_ENABLED", "1")
+
+    response = client.post("/admin/queries/cancel")
+
+    assert response.status_code == 200
+    assert response.json() == {"cancelled": {"warehouse": 0}}
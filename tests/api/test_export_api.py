@@ -0,0 +1,53 @@
+import io
+import json
+
+import pytest
+
+import app.api.query as query_module
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+BY_REGION = {"metric": "revenue", "time_range": "last_quarter", "dimensions": ["region"]}
+
+
+def test_grouped_query_streams_ndjson(dimensional_client):
+    response = dimensional_client.post("/query", json=BY_REGION)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    header, *rows = [json.loads(line) for line in response.text.splitlines()]
+    assert header["source"] == "computed" and "GROUP BY" in header["sql"]
+    assert {row["region"] for row in rows} >= {None, "EU"}
+    assert all(set(row) == {"region", "value"} for row in rows)
+
+
+def test_arrow_export_survives_an_all_null_first_chunk(dimensional_client, monkeypatch):
+    # One group per chunk; the NULL region group comes first
+    monkeypatch.setattr(query_module, "STREAM_CHUNK_SIZE", 1)
+
+    response = dimensional_client.post("/export?format=arrow", json=BY_REGION)
+
+    assert response.status_code == 200
+    assert response.headers["x-export-source"] == "computed"
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.schema.field("region").type == pa.string()
+    assert None in table.column("region").to_pylist()
+    assert "EU" in table.column("region").to_pylist()
+
+
+def test_parquet_export_is_cached(client):
+    payload = {"metric": "revenue", "time_range": "last_month"}
+
+    first = client.post("/export?format=parquet", json=payload)
+    second = client.post("/export?format=parquet", json=payload)
+
+    assert first.status_code == second.status_code == 200
+    assert second.headers["x-export-source"] == "cache"
+    assert pq.read_table(io.BytesIO(second.content)).column_names == ["value"]
+
+
+def test_unknown_export_format_is_rejected(client):
+    response = client.post("/export?format=csv", json={"metric": "revenue", "time_range": "last_month"})
+
+    assert response.status_code == 400
@@ -0,0 +1,72 @@
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.core.execution.admission import ConcurrencyLimitError, QueueFullError
+from app.core.execution.backends import UnknownBackendError
+
+REVENUE = {"metric": "revenue", "time_range": "last_month"}
+
+
+@pytest.mark.parametrize("timeout", ["0", "-1", "nan", "inf", "soon"])
+def test_invalid_query_timeouts_are_rejected(client, timeout):
+    response = client.post("/query", json=REVENUE, headers={"X-Query-Timeout": timeout})
+
+    assert response.status_code == 400
+    assert "X-Query-Timeout" in response.json()["detail"]
+
+
+def test_scalar_query_is_computed_then_cached(client):
+    first = client.post("/query", json=REVENUE)
+    second = client.post("/query", json=REVENUE)
+
+    assert first.status_code == second.status_code == 200
+    assert first.json()["source"] == "computed"
+    assert second.json()["source"] == "cache"
+    assert second.json()["result"] == first.json()["result"]
+
+
+def test_expired_result_is_served_stale_while_it_refreshes(client):
+    first = client.post("/query", json=REVENUE)
+    cache = client.app.state.container.cache
+    for entry in cache._cache.values():
+        entry.fresh_until = time.time() - 1
+
+    stale = client.post("/query", json=REVENUE)
+    assert stale.status_code == 200
+    assert stale.json()["source"] == "stale"
+    assert stale.json()["result"] == first.json()["result"]
+
+    # The background refresh replaces the entry with a fresh one
+    deadline = time.time() + 5
+    while client.post("/query", json=REVENUE).json()["source"] != "cache":
+        assert time.time() < deadline, "stale entry was never refreshed"
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize("error, status", [(QueueFullError, 503), (ConcurrencyLimitError, 429)])
+def test_rejected_queries_tell_clients_when_to_retry(client, monkeypatch, error, status):
+    @asynccontextmanager
+    async def rejected(tenant, metric):
+        raise error("Too busy", retry_after=7)
+        yield
+
+    monkeypatch.setattr(client.app.state.container.admission, "admit", rejected)
+    response = client.post("/query", json=REVENUE)
+
+    assert response.status_code == status
+    assert response.headers["Retry-After"] == "7"
+
+
+def test_grouped_query_holds_no_slot_when_its_backend_fails(dimensional_client, monkeypatch):
+    container = dimensional_client.app.state.container
+
+    def unavailable(name=None):
+        raise UnknownBackendError("gone")
+
+    monkeypatch.setattr(container.backends, "get", unavailable)
+    with pytest.raises(UnknownBackendError):
+        dimensional_client.post("/query", json={**REVENUE, "dimensions": ["region"]})
+
+    assert container.admission.stats()["active"] == 0
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from benchmarks.load_replay import Outcome, ReplayRequest, load_traffic, percentile, summarize
+
+
+def test_percentile_is_nearest_rank():
+    ordered = [float(i) for i in range(1, 101)]
+
+    assert percentile(ordered, 0.50) == 50.0
+    assert percentile(ordered, 0.95) == 95.0
+    assert percentile(ordered, 0.99) == 99.0
+    assert percentile(ordered, 1.0) == 100.0
+    assert percentile(ordered, 0.07) == 7.0
+    assert percentile([7.0], 0.99) == 7.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_summarize_counts_cache_hits_among_successes_only():
+    outcomes = [
+        Outcome(0.010, 200, "computed", None),
+        Outcome(0.001, 200, "cache", None),
+        Outcome(0.002, 200, "stale", None),
+        Outcome(0.003, 200, "coalesced", None),
+        Outcome(0.004, 400, None, "400 bad intent"),
+        Outcome(0.020, None, None, "ReadTimeout"),
+    ]
+
+    summary = summarize(outcomes, elapsed=2.0)
+
+    assert summary["requests"] == 6
+    assert summary["throughput_rps"] == 3.0
+    assert summary["cache_hit_ratio"] == 0.5
+    assert summary["sources"] == {"computed": 1, "cache": 1, "stale": 1, "coalesced": 1}
+    assert summary["errors"] == {"400 bad intent": 1, "ReadTimeout": 1}
+    assert summary["latency_ms"]["p50"] == 3.0
+    assert summary["latency_ms"]["max"] == 20.0
+
+
+def test_summarize_an_empty_run():
+    summary = summarize([], elapsed=0.0)
+
+    assert summary["throughput_rps"] == 0.0
+    assert summary["cache_hit_ratio"] == 0.0
+    assert summary["latency_ms"]["max"] == 0.0
+
+
+def test_load_traffic_keeps_requests_and_skips_other_lines(tmp_path):
+    intent = {"metric": "revenue", "time_range": "last_month"}
+    path = tmp_path / "traffic.jsonl"
+    path.write_text("\n".join([
+        json.dumps(intent),
+        json.dumps({"payload": intent, "headers": {"X-Tenant-ID": "acme"}}),
+        json.dumps({"question": "What was revenue last month?"}),
+        "",
+        "{not json",
+        json.dumps({"request_id": "user-001", "title": "unrelated"}),
+        json.dumps(["not", "an", "object"]),
+    ]) + "\n")
+
+    traffic, skipped = load_traffic(path)
+
+    assert traffic == [
+        ReplayRequest(intent, {}),
+        ReplayRequest(intent, {"X-Tenant-ID": "acme"}),
+        ReplayRequest({"question": "What was revenue last month?"}, {}),
+    ]
+    assert skipped == 3
@@ -0,0 +1,90 @@
+import asyncio
+
+from app.core.execution.admission import (
+    AdmissionController,
+    ConcurrencyLimitError,
+    Priority,
+    QueueFullError,
+)
+from app.core.execution.timeout import QueryTimeoutError, query_timeout
+
+
+def test_queued_work_runs_in_priority_order():
+    controller = AdmissionController(max_concurrency=1, max_queue=10)
+    order = []
+
+    async def job(name, priority):
+        async with controller.admit("t", "revenue", priority):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    async def run():
+        first = await controller.acquire("t", "revenue")
+        jobs = [
+            asyncio.ensure_future(job("refresh", Priority.REFRESH)),
+            asyncio.ensure_future(job("interactive", Priority.INTERACTIVE)),
+        ]
+        await asyncio.sleep(0)
+        assert controller.stats()["queue_depth"] == 2
+        first.release()
+        await asyncio.gather(*jobs)
+
+    asyncio.run(run())
+    assert order == ["interactive", "refresh"]
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    controller = AdmissionController(max_concurrency=1, max_queue=1)
+
+    async def run():
+        held = await controller.acquire("t", "revenue")
+        waiter = asyncio.ensure_future(controller.acquire("t", "revenue"))
+        await asyncio.sleep(0)
+        try:
+            await controller.acquire("t", "revenue")
+            assert False, "Expected rejection"
+        except QueueFullError as e:
+            assert e.status_code == 503
+            assert e.retry_after >= 1
+        held.release()
+        (await waiter).release()
+
+    asyncio.run(run())
+    stats = controller.stats()
+    assert stats["rejected_queue_full"] == 1
+    assert stats["active"] == 0 and stats["queue_depth"] == 0
+
+
+def test_tenant_limit_is_rejected_without_blocking_others():
+    controller = AdmissionController(max_concurrency=5, tenant_limit=1)
+
+    async def run():
+        held = await controller.acquire("noisy", "revenue")
+        try:
+            await controller.acquire("noisy", "revenue")
+            assert False, "Expected rejection"
+        except ConcurrencyLimitError as e:
+            assert e.status_code == 429
+        (await controller.acquire("quiet", "revenue")).release()
+        held.release()
+
+    asyncio.run(run())
+
+
+def test_waiter_leaves_the_queue_at_its_deadline():
+    controller = AdmissionController(max_concurrency=1, max_queue=10)
+
+    async def run():
+        held = await controller.acquire("t", "revenue")
+        try:
+            with query_timeout(0.05):
+                await controller.acquire("t", "revenue")
+            assert False, "Expected timeout"
+        except QueryTimeoutError:
+            pass
+        assert controller.stats()["queue_depth"] == 0
+        held.release()
+        held.release()  # idempotent
+
+    asyncio.run(run())
+    assert controller.stats()["active"] == 0
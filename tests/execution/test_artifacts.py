@@ -0,0 +1,71 @@
+from pathlib import Path
+
+from app.core.execution.artifacts import ArtifactCache
+from app.core.explanation.builder import ExplanationBuilder
+from app.core.intent.schema import Intent, MetricName, TimeRange
+from app.core.metrics.registry import MetricRegistry
+from app.core.planning.builder import QueryPlanBuilder
+from app.core.sql.generator import SQLGenerator
+from app.core.sql.validator import SQLValidator
+from app.llm.client import LLMClient
+
+
+class CountingValidator(SQLValidator):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def validate(self, sql):
+        self.calls += 1
+        super().validate(sql)
+
+
+def _setup():
+    registry = MetricRegistry(
+        Path(__file__).resolve().parents[2] / "metadata" / "metrics"
+    )
+    registry.load()
+
+    validator = CountingValidator()
+    artifacts = ArtifactCache(
+        registry,
+        QueryPlanBuilder(),
+        SQLGenerator(LLMClient()),
+        validator,
+        ExplanationBuilder(),
+    )
+    return registry, validator, artifacts
+
+
+def _intent():
+    return Intent(
+        metric=MetricName.revenue,
+        time_range=TimeRange.last_month,
+        dimensions=[],
+        requested_filters=[]
+    )
+
+
+def test_repeated_shape_is_compiled_once():
+    registry, validator, artifacts = _setup()
+    metric = registry.get("revenue", "v1")
+
+    first = artifacts.get_or_compile(_intent(), metric)
+    second = artifacts.get_or_compile(_intent(), metric)
+
+    assert first is second
+    assert validator.calls == 1
+    assert first.plan.fact_table == "orders"
+    assert first.explanation["metric"] == "revenue (v1)"
+
+
+def test_registry_reload_invalidates_artifacts():
+    registry, validator, artifacts = _setup()
+    metric = registry.get("revenue", "v1")
+
+    artifacts.get_or_compile(_intent(), metric)
+
+    registry.load()
+    artifacts.get_or_compile(_intent(), registry.get("revenue", "v1"))
+
+    assert validator.calls == 2
@@ -0,0 +1,116 @@
+import asyncio
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from app.core.execution.backends import ExecutionBackends, UnknownBackendError, dollar_params
+from app.core.execution.db import AsyncDatabase, DatabaseExecutionError
+from app.core.metrics.models import MetricDefinition
+from app.core.metrics.registry import MetricRegistry
+from app.core.planning.builder import QueryPlanBuilder
+from app.core.sql.generator import SQLGenerator
+
+METRICS_PATH = Path(__file__).resolve().parents[2] / "metadata" / "metrics"
+
+
+def _revenue(**overrides):
+    registry = MetricRegistry(METRICS_PATH)
+    registry.load()
+    return MetricDefinition(**{**registry.get("revenue", "v1").model_dump(), **overrides})
+
+
+def test_plans_compile_for_their_metrics_backend():
+    generator = SQLGenerator(dialect="mysql", backend_dialects={"duckdb": "duckdb"})
+    builder = QueryPlanBuilder()
+
+    warehouse_plan = builder.fact_plan(_revenue(), "last_month")
+    duckdb_plan = builder.fact_plan(_revenue(backend="duckdb"), "last_month")
+
+    assert warehouse_plan.backend is None
+    assert duckdb_plan.backend == "duckdb"
+    assert generator.compiler_for(duckdb_plan.backend).dialect == "duckdb"
+    assert ":start_date" in generator.generate(duckdb_plan)
+
+
+def test_unconfigured_backends_fail_fast(tmp_path):
+    database = AsyncDatabase(f"sqlite+aiosqlite:///{tmp_path / 'w.db'}")
+    backends = ExecutionBackends({"warehouse": database})
+
+    assert backends.get(None) is database
+    assert backends.dialects() == {"warehouse": "sqlite"}
+    with pytest.raises(UnknownBackendError):
+        backends.get("duckdb")
+    with pytest.raises(UnknownBackendError):
+        backends.check([_revenue(backend="duckdb")])
+
+    # Naming the default backend explicitly is the same as omitting it
+    assert _revenue(backend="warehouse").backend is None
+    backends.check([_revenue()])
+
+
+def test_cancel_aborts_in_flight_queries(tmp_path):
+    database = AsyncDatabase(f"sqlite+aiosqlite:///{tmp_path / 'w.db'}")
+
+    async def slow(sql, params):
+        await asyncio.sleep(10)
+
+    database._execute = slow
+
+    async def run():
+        query = asyncio.ensure_future(database.execute("SELECT 1"))
+        await asyncio.sleep(0.01)
+        assert database.cancel() == 1
+        with pytest.raises(DatabaseExecutionError):
+            await query
+        await database.dispose()
+
+    asyncio.run(run())
+
+
+def test_dollar_params_leave_literals_and_casts_alone():
+    sql = "SELECT x::DATE, ':kept' FROM t WHERE d >= :start_date AND d < :end_date"
+
+    assert dollar_params(sql) == (
+        "SELECT x::DATE, ':kept' FROM t WHERE d >= $start_date AND d < $end_date"
+    )
+
+
+def test_duckdb_backend_queries_parquet_extracts(tmp_path):
+    pytest.importorskip("duckdb")
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    from app.core.execution.backends import DuckDBBackend
+
+    (tmp_path / "orders").mkdir()
+    pq.write_table(
+        pa.table({
+            "amount": [10.0, 20.0, 30.0],
+            "order_date": [date(2024, 1, 1), date(2024, 1, 2), date(2024, 2, 1)],
+        }),
+        tmp_path / "orders" / "part-0.parquet",
+    )
+    backend = DuckDBBackend(tmp_path)
+    params = {"start_date": date(2024, 1, 1), "end_date": date(2024, 2, 1)}
+
+    async def run():
+        try:
+            rows = await backend.execute(
+                "SELECT SUM(amount) AS value FROM orders "
+                "WHERE order_date >= :start_date AND order_date < :end_date",
+                params,
+            )
+            chunks = [
+                chunk async for chunk in backend.stream(
+                    "SELECT amount FROM orders ORDER BY amount", chunk_size=2
+                )
+            ]
+            return rows, chunks
+        finally:
+            await backend.dispose()
+
+    rows, chunks = asyncio.run(run())
+    assert rows[0][0] == 30.0
+    assert rows[0]._mapping == {"value": 30.0}
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert backend.stats()["tables"] == ["orders"]
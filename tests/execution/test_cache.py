@@ -1,3 +1,8 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from app.core.execution.cache import QueryCache
 from app.core.intent.schema import Intent, MetricName, TimeRange
 
@@ -22,3 +27,193 @@ def test_cache_key_is_order_independent():
     cache.set(intent1, "v1", 123)
 
     assert cache.get(intent2, "v1") == 123
+
+
+def _revenue_intent():
+    return Intent(
+        metric=MetricName.revenue,
+        time_range=TimeRange.last_month,
+        dimensions=[],
+        requested_filters=[]
+    )
+
+
+def test_concurrent_async_misses_share_one_computation():
+    cache = QueryCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.aget_or_compute(_revenue_intent(), "v1", compute) for _ in range(50))
+        )
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(value == 42 for value, _ in results)
+    assert sorted(source for _, source in results).count("computed") == 1
+    assert cache.get(_revenue_intent(), "v1") == 42
+
+
+def test_concurrent_threaded_misses_share_one_computation():
+    cache = QueryCache()
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(1)
+        return 7
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [
+            pool.submit(cache.get_or_compute, _revenue_intent(), "v1", compute)
+            for _ in range(8)
+        ]
+        time.sleep(0.05)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert all(value == 7 for value, _ in results)
+
+
+def test_errors_reach_all_waiters_and_are_not_cached():
+    cache = QueryCache()
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("db down")
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.aget_or_compute(_revenue_intent(), "v1", compute) for _ in range(5)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.get(_revenue_intent(), "v1") is None
+
+
+def test_expired_entry_is_served_stale_while_revalidating():
+    cache = QueryCache(ttl_seconds=0, stale_ttl_seconds=60)
+    cache.set(_revenue_intent(), "v1", 1)
+
+    async def compute():
+        return 2
+
+    async def run():
+        served = await cache.aget_or_compute(_revenue_intent(), "v1", compute)
+        await asyncio.sleep(0.01)
+        return served
+
+    assert asyncio.run(run()) == (1, "stale")
+    assert cache._cache[cache._make_key(_revenue_intent(), "v1")].value == 2
+
+
+def test_cancelled_background_refresh_releases_its_flight():
+    cache = QueryCache(ttl_seconds=0, stale_ttl_seconds=60)
+    cache.set(_revenue_intent(), "v1", 1)
+    key = cache._make_key(_revenue_intent(), "v1")
+
+    async def hang():
+        await asyncio.Event().wait()
+
+    async def compute():
+        return 2
+
+    async def run():
+        # Cancelled while running, and before it ever got to run
+        for settle in (True, False):
+            await cache.aget_or_compute(_revenue_intent(), "v1", hang)
+            if settle:
+                await asyncio.sleep(0.01)
+            for task in list(cache._background):
+                task.cancel()
+            await asyncio.sleep(0.01)
+            assert key not in cache._inflight
+
+        await cache.aget_or_compute(_revenue_intent(), "v1", compute)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert cache._cache[key].value == 2
+
+
+def test_hot_entries_are_refreshed_ahead_of_expiry():
+    cache = QueryCache(
+        ttl_seconds=300,
+        refresh_ahead_hits_per_minute=1,
+        refresh_ahead_fraction=0,
+    )
+    cache.set(_revenue_intent(), "v1", 1)
+
+    async def compute():
+        return 2
+
+    async def run():
+        served = await cache.aget_or_compute(_revenue_intent(), "v1", compute)
+        await asyncio.sleep(0.01)
+        return served
+
+    assert asyncio.run(run()) == (1, "cache")
+    assert cache.get(_revenue_intent(), "v1") == 2
+
+
+def test_window_keyed_entries_live_until_the_window_rolls_over():
+    from datetime import date
+
+    from app.core.enforcement.time import resolve_time_window
+
+    cache = QueryCache(ttl_seconds=300)
+    window = resolve_time_window("last_quarter", date.today())
+    cache.set(_revenue_intent(), "v1", 10, window=window)
+
+    entry = cache._cache[cache._make_key(_revenue_intent(), "v1", window)]
+    assert entry.fresh_until == window.rolls_over_at.timestamp()
+
+    bounded = QueryCache(data_freshness_seconds=3600)
+    bounded.set(_revenue_intent(), "v1", 10, window=window)
+    entry = bounded._cache[bounded._make_key(_revenue_intent(), "v1", window)]
+    assert entry.fresh_until <= time.time() + 3600
+
+    next_window = resolve_time_window("last_quarter", window.rolls_over_at.date())
+    assert cache.get(_revenue_intent(), "v1", next_window) is None
+
+
+def test_flight_finishing_after_a_reload_is_not_served_for_the_new_definition():
+    cache = QueryCache()
+    started = asyncio.Event()
+    finish = asyncio.Event()
+
+    async def old_definition():
+        started.set()
+        await finish.wait()
+        return "old"
+
+    async def new_definition():
+        return "new"
+
+    async def run():
+        flight = asyncio.ensure_future(cache.aget_or_compute(
+            _revenue_intent(), "v1", old_definition, definition="before"
+        ))
+        await started.wait()
+
+        # Hot reload lands while the old flight is still running
+        cache.invalidate("revenue", "v1")
+        finish.set()
+        await flight
+
+        return await cache.aget_or_compute(
+            _revenue_intent(), "v1", new_definition, definition="after"
+        )
+
+    assert asyncio.run(run()) == ("new", "computed")
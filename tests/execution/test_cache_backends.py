@@ -0,0 +1,88 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from app.core.execution.cache import QueryCache
+from app.core.execution.cache_backends import SQLiteCacheBackend, database_namespace
+from app.core.intent.schema import Intent, MetricName, TimeRange
+
+
+def _intent(metric=MetricName.revenue):
+    return Intent(
+        metric=metric,
+        time_range=TimeRange.last_month,
+        dimensions=[],
+        requested_filters=[]
+    )
+
+
+def test_workers_share_results_through_l2(tmp_path):
+    path = tmp_path / "l2.sqlite3"
+    worker_a = QueryCache(l2=SQLiteCacheBackend(path))
+    worker_b = QueryCache(l2=SQLiteCacheBackend(path))
+
+    async def compute():
+        raise AssertionError("worker B should not hit the database")
+
+    worker_a.set(_intent(), "v1", 123)
+    value, source = asyncio.run(worker_b.aget_or_compute(_intent(), "v1", compute))
+
+    assert (value, source) == (123, "cache")
+
+
+def test_l2_survives_restart_and_invalidates_by_metric(tmp_path):
+    path = tmp_path / "l2.sqlite3"
+    QueryCache(l2=SQLiteCacheBackend(path)).set(_intent(), "v1", 123)
+    QueryCache(l2=SQLiteCacheBackend(path)).set(_intent(MetricName.orders_count), "v1", 9)
+
+    restarted = SQLiteCacheBackend(path)
+    assert QueryCache(l2=restarted).get(_intent(), "v1") == 123
+
+    assert restarted.invalidate("revenue", "v1") == 1
+    assert QueryCache(l2=restarted).get(_intent(), "v1") is None
+    assert QueryCache(l2=restarted).get(_intent(MetricName.orders_count), "v1") == 9
+
+
+def test_l2_is_scoped_to_the_warehouse_and_keeps_decimals(tmp_path):
+    path = tmp_path / "l2.sqlite3"
+    warehouse_a = QueryCache(l2=SQLiteCacheBackend(path, database_namespace("mysql://a/sales")))
+    warehouse_b = QueryCache(l2=SQLiteCacheBackend(path, database_namespace("mysql://b/sales")))
+
+    warehouse_a.set(_intent(), "v1", Decimal("1234.50"))
+
+    assert QueryCache(l2=SQLiteCacheBackend(path, database_namespace("mysql://a/sales"))).get(
+        _intent(), "v1"
+    ) == Decimal("1234.50")
+    assert warehouse_b.get(_intent(), "v1") is None
+
+
+def test_l2_storage_errors_degrade_to_misses(tmp_path):
+    path = tmp_path / "l2.sqlite3"
+    backend = SQLiteCacheBackend(path)
+    backend.set("key", [1, 2, 3, 4], 60, "revenue", "v1")
+
+    # Legacy or tampered rows are never unpickled, just missed
+    backend._connection().execute("UPDATE query_cache SET value = ?", (b"\x80\x04junk",))
+    assert backend.get("key") is None
+
+    backend._connection().execute("DROP TABLE query_cache")
+    assert backend.get("key") is None
+    assert backend.invalidate("revenue") == 0
+    backend.clear()
+
+
+def test_failing_l2_read_releases_the_flight_for_threaded_callers():
+    class BrokenBackend:
+        def get(self, key):
+            raise RuntimeError("backend down")
+
+    cache = QueryCache(l2=BrokenBackend())
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute(_intent(), "v1", lambda: 1)
+
+    # A stuck flight would make this wait forever
+    assert not cache._inflight
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute(_intent(), "v1", lambda: 1)
@@ -0,0 +1,66 @@
+import asyncio
+import io
+from decimal import Decimal
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from app.core.execution.columnar import ColumnarExporter
+
+
+async def _chunks():
+    yield [{"region": "EU", "value": 1.5}, {"region": "US", "value": None}]
+    yield [{"region": "APAC", "value": 3.0}]
+
+
+def test_arrow_export_writes_one_batch_per_chunk():
+    buffer = asyncio.run(ColumnarExporter("arrow").build(_chunks()))
+
+    reader = pa.ipc.open_stream(buffer)
+    batches = list(reader)
+
+    assert [b.num_rows for b in batches] == [2, 1]
+    assert pa.Table.from_batches(batches).column("region").to_pylist() == ["EU", "US", "APAC"]
+
+
+def test_parquet_export_round_trips():
+    buffer = asyncio.run(ColumnarExporter("parquet").build(_chunks()))
+
+    table = pq.read_table(io.BytesIO(buffer.to_pybytes()))
+
+    assert table.column("value").to_pylist() == [1.5, None, 3.0]
+
+
+def test_column_that_starts_all_null_takes_its_type_from_later_chunks():
+    async def chunks():
+        yield [{"region": None, "value": 1.0}]
+        yield [{"region": None, "value": 2.0}]
+        yield [{"region": "EU", "value": 3.0}]
+        yield [{"region": None, "value": 4.0}]
+
+    buffer = asyncio.run(ColumnarExporter("arrow").build(chunks()))
+    table = pa.ipc.open_stream(buffer).read_all()
+
+    assert table.schema.field("region").type == pa.string()
+    assert table.column("region").to_pylist() == [None, None, "EU", None]
+    assert table.num_rows == 4
+
+
+@pytest.mark.parametrize("export_format", ["arrow", "parquet"])
+def test_later_chunks_may_hold_larger_decimals(export_format):
+    async def chunks():
+        yield [{"region": "EU", "value": Decimal("12.50")}]
+        yield [{"region": None, "value": Decimal("123456.78")}]
+        yield [{"region": "US", "value": Decimal("9876543210.01")}]
+
+    buffer = asyncio.run(ColumnarExporter(export_format).build(chunks()))
+    if export_format == "arrow":
+        table = pa.ipc.open_stream(buffer).read_all()
+    else:
+        table = pq.read_table(io.BytesIO(buffer.to_pybytes()))
+
+    assert table.column("value").to_pylist() == [
+        Decimal("12.50"), Decimal("123456.78"), Decimal("9876543210.01")
+    ]
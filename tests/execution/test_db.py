@@ -0,0 +1,115 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from app.config.database import ASYNC_DRIVERS, to_async_url
+from app.core.execution.db import AsyncDatabase, DatabaseExecutionError
+from app.core.execution.replicas import ReplicaRouter
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_async_url_swaps_driver():
+    assert to_async_url("mysql+pymysql://u:p@h/db") == "mysql+aiomysql://u:p@h/db"
+    assert to_async_url("sqlite:///local.db") == "sqlite+aiosqlite:///local.db"
+
+
+def test_every_async_driver_is_a_requirement():
+    requirements = (ROOT / "requirements.txt").read_text().split()
+    drivers = {url.partition("+")[2] for url in ASYNC_DRIVERS.values()}
+
+    assert drivers <= set(requirements)
+
+
+def test_async_database_executes_without_blocking(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'analytics.db'}"
+
+    async def run():
+        database = AsyncDatabase(url)
+        try:
+            rows = await asyncio.gather(
+                *(database.execute(f"SELECT {i}") for i in range(10))
+            )
+        finally:
+            await database.dispose()
+        return [r[0][0] for r in rows]
+
+    assert asyncio.run(run()) == list(range(10))
+
+
+def test_async_database_wraps_driver_errors(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'analytics.db'}"
+
+    async def run():
+        database = AsyncDatabase(url)
+        try:
+            await database.execute("SELECT * FROM missing_table")
+        finally:
+            await database.dispose()
+
+    try:
+        asyncio.run(run())
+        assert False, "Expected rejection"
+    except DatabaseExecutionError:
+        pass
+
+
+def test_async_stream_yields_bounded_chunks(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'analytics.db'}"
+
+    async def run():
+        database = AsyncDatabase(url)
+        try:
+            async with database.engine.begin() as connection:
+                await connection.exec_driver_sql(
+                    "CREATE TABLE sales (region TEXT, amount INTEGER)"
+                )
+                await connection.exec_driver_sql(
+                    "INSERT INTO sales VALUES "
+                    + ", ".join(f"('r{i}', {i})" for i in range(25))
+                )
+
+            return [
+                chunk
+                async for chunk in database.stream(
+                    "SELECT region, amount AS value FROM sales WHERE amount >= :low",
+                    {"low": 0},
+                    chunk_size=10,
+                )
+            ]
+        finally:
+            await database.dispose()
+
+    chunks = asyncio.run(run())
+
+    assert [len(c) for c in chunks] == [10, 10, 5]
+    assert chunks[0][0] == {"region": "r0", "value": 0}
+
+
+def test_cancel_reaches_open_streams_directly_and_through_replicas(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'analytics.db'}"
+
+    async def run():
+        async with AsyncDatabase(url).engine.begin() as connection:
+            await connection.exec_driver_sql("CREATE TABLE sales (amount INTEGER)")
+            await connection.exec_driver_sql(
+                "INSERT INTO sales VALUES " + ", ".join(f"({i})" for i in range(100))
+            )
+
+        router = ReplicaRouter(url, [])
+        database = AsyncDatabase(url)
+        try:
+            for source, cancel in ((database, database.cancel), (router, router.cancel)):
+                chunks = source.stream("SELECT amount AS value FROM sales", chunk_size=10)
+                assert len(await chunks.__anext__()) == 10
+                # Between chunks: the next fetch is refused
+                assert cancel() == 1
+                with pytest.raises(DatabaseExecutionError):
+                    await chunks.__anext__()
+                assert cancel() == 0
+        finally:
+            await database.dispose()
+            await router.dispose()
+
+    asyncio.run(run())
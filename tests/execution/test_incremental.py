@@ -0,0 +1,160 @@
+import asyncio
+import sqlite3
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlglot import exp
+
+from app.core.enforcement.time import TimeWindow, window_params
+from app.core.execution.db import AsyncDatabase
+from app.core.execution.incremental import IncrementalExecutor
+from app.core.metrics.registry import MetricRegistry
+from app.core.planning.builder import QueryPlanBuilder
+from app.core.sql.dialects import SQLCompiler
+from app.core.sql.validator import SQLValidationError, SQLValidator
+
+METRICS_PATH = Path(__file__).resolve().parents[2] / "metadata" / "metrics"
+
+TODAY = date.today()
+
+
+class CountingDatabase(AsyncDatabase):
+    def __init__(self, url):
+        super().__init__(url)
+        self.calls = []
+
+    async def execute(self, sql, params=None):
+        self.calls.append(params)
+        return await super().execute(sql, params)
+
+
+def _warehouse(tmp_path) -> str:
+    path = tmp_path / "warehouse.db"
+    connection = sqlite3.connect(path)
+    connection.executescript(
+        """
+        CREATE TABLE users (id INTEGER PRIMARY KEY);
+        CREATE TABLE products (id INTEGER PRIMARY KEY);
+        CREATE TABLE orders (
+            order_id INTEGER PRIMARY KEY, user_id INT, product_id INT,
+            amount REAL, status TEXT, order_date TEXT
+        );
+        INSERT INTO users VALUES (1);
+        INSERT INTO products VALUES (1);
+        """
+    )
+    connection.executemany(
+        "INSERT INTO orders VALUES (?, 1, 1, ?, ?, ?)",
+        [
+            (i, float(i % 17), "COMPLETED" if i % 4 else "PENDING",
+             (TODAY - timedelta(days=1 + i % 100)).isoformat())
+            for i in range(1, 800)
+        ],
+    )
+    connection.commit()
+    connection.close()
+    return f"sqlite+aiosqlite:///{path}"
+
+
+def _window(days_back: int, length: int) -> TimeWindow:
+    end = TODAY - timedelta(days=days_back)
+    return TimeWindow(end - timedelta(days=length), end, datetime.max)
+
+
+def _plan(aggregation: str):
+    registry = MetricRegistry(METRICS_PATH)
+    registry.load()
+    metric = registry.get("revenue", "v1")
+    metric = metric.model_copy(
+        update={"measure": metric.measure.model_copy(update={"aggregation": aggregation})}
+    )
+    return QueryPlanBuilder().fact_plan(metric, "custom")
+
+
+def test_day_buckets_match_full_window_for_every_aggregation(tmp_path):
+    url = _warehouse(tmp_path)
+    compiler = SQLCompiler("sqlite")
+
+    async def run():
+        database = AsyncDatabase(url)
+        executor = IncrementalExecutor(database, compiler, SQLValidator())
+        try:
+            for aggregation in ("sum", "count", "min", "max", "avg"):
+                plan = _plan(aggregation)
+                for window in (_window(5, 7), _window(1, 30), _window(0, 90)):
+                    expected = (await database.execute(
+                        compiler.render(compiler.compile(plan)), window_params(window)
+                    ))[0][0]
+                    actual = await executor.execute(plan, window)
+                    assert abs(actual - expected) < 1e-9, (aggregation, window)
+        finally:
+            await database.dispose()
+
+    asyncio.run(run())
+
+
+def test_overlapping_window_only_queries_missing_days(tmp_path):
+    url = _warehouse(tmp_path)
+    plan = _plan("sum")
+
+    async def run():
+        database = CountingDatabase(url)
+        executor = IncrementalExecutor(database, SQLCompiler("sqlite"), SQLValidator())
+        try:
+            await executor.execute(plan, _window(1, 90))
+            await executor.execute(plan, _window(0, 90))
+            await executor.execute(plan, _window(10, 30))
+        finally:
+            await database.dispose()
+        return database.calls
+
+    calls = asyncio.run(run())
+    assert len(calls) == 2
+    assert calls[1]["end_date"] - calls[1]["start_date"] == timedelta(days=1)
+
+
+def test_long_gaps_are_fetched_as_concurrent_partitions(tmp_path):
+    url = _warehouse(tmp_path)
+    plan = _plan("avg")
+    window = _window(0, 90)
+
+    async def run():
+        database = CountingDatabase(url)
+        try:
+            single = await IncrementalExecutor(
+                database, SQLCompiler("sqlite"), SQLValidator()
+            ).execute(plan, window)
+            partitioned = await IncrementalExecutor(
+                database, SQLCompiler("sqlite"), SQLValidator(), partitions=4
+            ).execute(plan, window)
+        finally:
+            await database.dispose()
+        return single, partitioned, database.calls[1:]
+
+    single, partitioned, calls = asyncio.run(run())
+    assert abs(single - partitioned) < 1e-9
+    assert len(calls) == 4
+    assert calls[0]["start_date"] == window.start
+    assert calls[-1]["end_date"] == window.end
+    assert all(a["end_date"] == b["start_date"] for a, b in zip(calls, calls[1:]))
+
+
+def test_day_queries_are_validated_before_they_run(tmp_path):
+    def no_group_by(node):
+        raise SQLValidationError("GROUP BY is not allowed")
+
+    validator = SQLValidator()
+    validator.register_node_rule((exp.Group,), no_group_by)
+
+    async def run():
+        database = CountingDatabase(_warehouse(tmp_path))
+        executor = IncrementalExecutor(database, SQLCompiler("sqlite"), validator)
+        try:
+            with pytest.raises(SQLValidationError):
+                await executor.execute(_plan("sum"), _window(1, 30))
+        finally:
+            await database.dispose()
+        return database.calls
+
+    assert asyncio.run(run()) == []
@@ -0,0 +1,87 @@
+import asyncio
+
+from app.core.execution.replicas import LAG_QUERIES, ReplicaRouter
+
+
+def _url(path):
+    return f"sqlite+aiosqlite:///{path}"
+
+
+def test_reads_go_to_the_fastest_healthy_replica(tmp_path):
+    router = ReplicaRouter(
+        _url(tmp_path / "primary.db"),
+        [_url(tmp_path / "a.db"), _url(tmp_path / "b.db")],
+    )
+    fast, slow = router.replicas
+    fast.latency, slow.latency = 0.001, 0.050
+
+    async def run():
+        try:
+            return await router.execute("SELECT 1")
+        finally:
+            await router.dispose()
+
+    assert asyncio.run(run())[0][0] == 1
+    assert router.choose() is fast
+
+    # Lagging replicas are skipped; with none left the primary serves
+    fast.lag = slow.lag = 120
+    assert router.choose() is router.primary
+
+
+def test_unhealthy_replicas_are_ejected_and_recover(tmp_path):
+    missing = tmp_path / "not-yet" / "replica.db"
+    router = ReplicaRouter(
+        _url(tmp_path / "primary.db"),
+        [_url(missing)],
+        eject_after=2,
+        recover_after=2,
+    )
+    replica = router.replicas[0]
+
+    async def run():
+        try:
+            await router.check_health()
+            assert replica.healthy
+            await router.check_health()
+            assert not replica.healthy
+            assert router.choose() is router.primary
+
+            missing.parent.mkdir()
+            await router.check_health()
+            assert not replica.healthy
+            await router.check_health()
+            assert replica.healthy
+            assert router.choose() is replica
+        finally:
+            await router.dispose()
+
+    asyncio.run(run())
+    stats = {s["name"]: s for s in router.stats()}
+    assert stats["replica-1"]["healthy"] and stats["primary"]["primary"]
+    assert "checkedout" in stats["replica-1"]
+
+
+def test_refused_lag_probe_means_unknown_lag_not_a_failed_check(tmp_path, monkeypatch):
+    router = ReplicaRouter(_url(tmp_path / "primary.db"), [_url(tmp_path / "a.db")], eject_after=1)
+    replica = router.replicas[0]
+
+    async def check():
+        await router.check_health()
+        return replica.lag
+
+    async def run():
+        try:
+            # Like MySQL without REPLICATION CLIENT: every probe is refused
+            monkeypatch.setitem(LAG_QUERIES, "sqlite", ("SELECT no_such_function()",))
+            assert await check() is None
+            assert router.choose() is replica
+
+            # The first probe that runs wins (SHOW REPLICA STATUS -> SHOW SLAVE STATUS)
+            monkeypatch.setitem(LAG_QUERIES, "sqlite", ("SELECT no_such_function()", "SELECT 7"))
+            assert await check() == 7.0
+        finally:
+            await router.dispose()
+
+    asyncio.run(run())
+    assert replica.healthy and replica.failures == 0
@@ -0,0 +1,182 @@
+import sqlite3
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from sqlglot import exp
+
+from app.config.rollups import get_rollup_path
+from app.core.enforcement.time import END_PARAM, START_PARAM, resolve_time_window, window_params
+from app.core.execution.db import Database
+from app.core.execution.rollups import RollupStore
+from app.core.intent.schema import Dimension, FilterIntent, Intent, MetricName, TimeRange
+from app.core.metrics.registry import MetricRegistry
+from app.core.planning.builder import QueryPlanBuilder
+from app.core.sql.dialects import SQLCompiler
+from app.core.sql.generator import SQLGenerator
+from app.core.sql.validator import SQLValidationError, SQLValidator
+
+METRICS_PATH = Path(__file__).resolve().parents[2] / "metadata" / "metrics"
+
+
+def _warehouse(tmp_path) -> Database:
+    path = tmp_path / "warehouse.db"
+    connection = sqlite3.connect(path)
+    connection.executescript(
+        """
+        CREATE TABLE users (id INTEGER PRIMARY KEY, region TEXT);
+        CREATE TABLE products (id INTEGER PRIMARY KEY);
+        CREATE TABLE orders (
+            order_id INTEGER PRIMARY KEY, user_id INT, product_id INT,
+            amount REAL, status TEXT, order_date TEXT
+        );
+        INSERT INTO users VALUES (1, 'EU'), (2, 'US');
+        INSERT INTO products VALUES (1);
+        """
+    )
+    today = date.today()
+    connection.executemany(
+        "INSERT INTO orders VALUES (?, ?, 1, ?, ?, ?)",
+        [
+            (i, 1 + i % 2, float(i), "COMPLETED" if i % 3 else "PENDING",
+             (today - timedelta(days=i % 150)).isoformat() + " 10:00:00")
+            for i in range(1, 600)
+        ],
+    )
+    connection.commit()
+    connection.close()
+    return Database(f"sqlite:///{path}")
+
+
+def _setup(tmp_path):
+    registry = MetricRegistry(METRICS_PATH)
+    registry.load()
+    metric = registry.get("revenue", "v1")
+    metric = metric.model_copy(update={"supports_dimensions": True})
+
+    store = RollupStore(tmp_path / "rollups.sqlite3")
+    warehouse = _warehouse(tmp_path)
+    compiler = SQLCompiler("sqlite")
+    for dims in [(), ("region",)]:
+        store.refresh(metric, dims, warehouse, compiler, SQLValidator())
+    return metric, store, warehouse, compiler
+
+
+def _run(database: Database, compiler: SQLCompiler, plan):
+    params = window_params(resolve_time_window(plan.time_range))
+    rows = database.execute(compiler.render(compiler.compile(plan)), params)
+    return sorted(tuple(r) for r in rows)
+
+
+def test_rollup_answers_match_the_fact_table(tmp_path):
+    metric, store, warehouse, compiler = _setup(tmp_path)
+    routed = QueryPlanBuilder(rollups=store)
+    direct = QueryPlanBuilder()
+    rollups = Database(f"sqlite:///{store.path}")
+
+    for dimensions in ([], [Dimension.region]):
+        intent = Intent(
+            metric=MetricName.revenue,
+            time_range=TimeRange.last_quarter,
+            dimensions=dimensions,
+        )
+        plan = routed.build(intent, metric)
+        assert plan.source == "rollup"
+        assert _run(rollups, compiler, plan) == _run(
+            warehouse, compiler, direct.build(intent, metric)
+        )
+
+
+def test_extra_filters_and_uncovered_windows_fall_back(tmp_path):
+    metric, store, _, _ = _setup(tmp_path)
+    builder = QueryPlanBuilder(rollups=store)
+
+    filtered = Intent(
+        metric=MetricName.revenue,
+        time_range=TimeRange.last_month,
+        requested_filters=[FilterIntent.region],
+    )
+    assert builder.build(filtered, metric).source == "fact"
+
+    # Invalidated rollups no longer cover anything
+    store.invalidate("revenue", "v1")
+    plain = Intent(metric=MetricName.revenue, time_range=TimeRange.last_month)
+    assert builder.build(plain, metric).source == "fact"
+
+
+def test_non_additive_aggregations_are_not_rolled_up(tmp_path):
+    registry = MetricRegistry(METRICS_PATH)
+    registry.load()
+    metric = registry.get("revenue", "v1")
+    metric = metric.model_copy(
+        update={"measure": metric.measure.model_copy(update={"aggregation": "avg"})}
+    )
+
+    store = RollupStore(tmp_path / "rollups.sqlite3")
+    assert store.refresh(
+        metric, (), _warehouse(tmp_path), SQLCompiler("sqlite"), SQLValidator()
+    ) is None
+
+    intent = Intent(metric=MetricName.revenue, time_range=TimeRange.last_month)
+    assert QueryPlanBuilder(rollups=store).build(intent, metric).source == "fact"
+
+
+class _DecimalSource:
+    """
+    A warehouse whose driver returns DECIMAL columns, like MySQL or Postgres.
+    """
+
+    def stream(self, sql, params, chunk_size=None):
+        start, end = params[START_PARAM], params[END_PARAM]
+        yield [
+            {"day": start + timedelta(days=i), "value": Decimal("0.10")}
+            for i in range((end - start).days)
+        ]
+
+
+def test_decimal_rollups_sum_back_to_the_exact_amount(tmp_path):
+    registry = MetricRegistry(METRICS_PATH)
+    registry.load()
+    metric = registry.get("revenue", "v1")
+
+    store = RollupStore(tmp_path / "rollups.sqlite3")
+    store.refresh(metric, (), _DecimalSource(), SQLCompiler("sqlite"), SQLValidator())
+
+    intent = Intent(metric=MetricName.revenue, time_range=TimeRange.last_quarter)
+    plan = QueryPlanBuilder(rollups=store).build(intent, metric)
+    assert plan.source == "rollup"
+    assert plan.round_to == 2
+
+    # The warehouse dialect must not leak into SQL that runs on SQLite
+    sql = SQLGenerator(dialect="mysql").generate(plan)
+    assert "`" not in sql
+
+    rollups = Database(f"sqlite:///{store.path}")
+    params = window_params(resolve_time_window(plan.time_range))
+    [(total,)] = rollups.execute(sql, params)
+    window = resolve_time_window(plan.time_range)
+    assert Decimal(str(total)) == Decimal("0.10") * (window.end - window.start).days
+
+
+def test_rollup_queries_are_validated_and_the_store_is_private(tmp_path, monkeypatch):
+    def no_group_by(node):
+        raise SQLValidationError("GROUP BY is not allowed")
+
+    validator = SQLValidator()
+    validator.register_node_rule((exp.Group,), no_group_by)
+
+    registry = MetricRegistry(METRICS_PATH)
+    registry.load()
+    metric = registry.get("revenue", "v1")
+
+    store = RollupStore(tmp_path / "private" / "rollups.sqlite3")
+    assert (store.path.parent.stat().st_mode & 0o777) == 0o700
+    with pytest.raises(SQLValidationError):
+        store.refresh(metric, (), _DecimalSource(), SQLCompiler("sqlite"), validator)
+
+    intent = Intent(metric=MetricName.revenue, time_range=TimeRange.last_month)
+    assert QueryPlanBuilder(rollups=store).build(intent, metric).source == "fact"
+
+    monkeypatch.delenv("ROLLUP_PATH", raising=False)
+    assert get_rollup_path() is None
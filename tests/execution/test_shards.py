@@ -0,0 +1,243 @@
+import asyncio
+import sqlite3
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from app.core.enforcement.time import resolve_time_window, window_params
+from app.core.execution.db import AsyncDatabase
+from app.core.execution.errors import DatabaseExecutionError
+from app.core.execution.shards import ShardedExecutor, ShardMap, load_shard_map
+from app.core.intent.schema import FilterIntent, Intent, MetricName, TimeRange
+from app.core.metrics.models import FilterDefinition
+from app.core.metrics.registry import MetricRegistry
+from app.core.planning.builder import QueryPlanBuilder
+from app.core.sql.dialects import SQLCompiler
+from app.core.sql.validator import SQLValidator
+
+METRICS_PATH = Path(__file__).resolve().parents[2] / "metadata" / "metrics"
+
+REGIONS = {"eu": ["EU"], "us": ["US", "CA"]}
+
+
+def _orders(i):
+    region = ["EU", "US", "CA"][i % 3]
+    day = date.today().replace(day=1) - timedelta(days=1 + i % 25)
+    return region, (i, i, i % 4, float(i % 13), "COMPLETED" if i % 5 else "PENDING", day.isoformat())
+
+
+def _database(path: Path, rows):
+    connection = sqlite3.connect(path)
+    connection.executescript(
+        """
+        CREATE TABLE users (id INTEGER PRIMARY KEY, region TEXT);
+        CREATE TABLE products (id INTEGER PRIMARY KEY, product TEXT);
+        CREATE TABLE orders (
+            order_id INTEGER PRIMARY KEY, user_id INT, product_id INT,
+            amount REAL, status TEXT, order_date TEXT
+        );
+        INSERT INTO products VALUES (0, 'a'), (1, 'b'), (2, 'c'), (3, 'd');
+        """
+    )
+    for region, order in rows:
+        connection.execute("INSERT INTO users VALUES (?, ?)", (order[1], region))
+        connection.execute("INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?)", order)
+    connection.commit()
+    connection.close()
+
+
+def _setup(tmp_path):
+    rows = [_orders(i) for i in range(1, 400)]
+    _database(tmp_path / "all.db", rows)
+    for name, values in REGIONS.items():
+        _database(tmp_path / f"{name}.db", [r for r in rows if r[0] in values])
+
+    (tmp_path / "shards.yaml").write_text(
+        "tables:\n"
+        "  orders:\n"
+        "    key: users.region\n"
+        "    shards:\n"
+        + "".join(
+            f"      - name: {name}\n"
+            f"        url: sqlite:///${{SHARD_DIR}}/{name}.db\n"
+            f"        values: {values}\n"
+            for name, values in REGIONS.items()
+        )
+    )
+    return load_shard_map(tmp_path / "shards.yaml")
+
+
+def _plan(aggregation, dimensions=()):
+    registry = MetricRegistry(METRICS_PATH)
+    registry.load()
+    metric = registry.get("revenue", "v1")
+    metric = metric.model_copy(
+        update={"measure": metric.measure.model_copy(update={"aggregation": aggregation})}
+    )
+    return QueryPlanBuilder().fact_plan(metric, "last_month", dimensions=dimensions)
+
+
+def test_scatter_gather_matches_the_unsharded_database(tmp_path, monkeypatch):
+    monkeypatch.setenv("SHARD_DIR", str(tmp_path))
+    shard_map = _setup(tmp_path)
+    params = window_params(resolve_time_window("last_month"))
+    compiler = SQLCompiler("sqlite")
+
+    async def run():
+        reference = AsyncDatabase(f"sqlite+aiosqlite:///{tmp_path / 'all.db'}")
+        executor = ShardedExecutor(shard_map, SQLValidator())
+        try:
+            for aggregation in ("sum", "count", "avg", "min", "max"):
+                for dimensions in ((), ("region",), ("product",)):
+                    plan = _plan(aggregation, dimensions)
+                    expected = await reference.execute(
+                        compiler.render(compiler.compile(plan)), params
+                    )
+                    expected = sorted((tuple(r[:-1]), round(r[-1], 9)) for r in expected)
+                    actual = sorted(
+                        (tuple(r[d] for d in dimensions), round(r["value"], 9))
+                        for r in await executor.rows(plan, params)
+                    )
+                    assert actual == expected, (aggregation, dimensions)
+        finally:
+            await reference.dispose()
+            await executor.dispose()
+
+    asyncio.run(run())
+
+
+def test_shard_key_filters_prune_shards(tmp_path, monkeypatch):
+    monkeypatch.setenv("SHARD_DIR", str(tmp_path))
+    shard_map = _setup(tmp_path)
+    params = window_params(resolve_time_window("last_month"))
+
+    # A metric scoped to one shard key value through its required filters
+    registry = MetricRegistry(METRICS_PATH)
+    registry.load()
+    revenue = registry.get("revenue", "v1")
+    canada = revenue.model_copy(update={
+        "required_filters": revenue.required_filters
+        + [FilterDefinition(column="users.region", operator="=", value="CA")],
+    })
+    builder = QueryPlanBuilder()
+    plan = builder.build(
+        Intent(metric=MetricName.revenue, time_range=TimeRange.last_month), canada
+    )
+    assert [s.name for s in shard_map.shards_for(plan)] == ["us"]
+
+    async def run():
+        reference = AsyncDatabase(f"sqlite+aiosqlite:///{tmp_path / 'all.db'}")
+        executor = ShardedExecutor(shard_map, SQLValidator())
+        try:
+            compiler = SQLCompiler("sqlite")
+            [(expected,)] = await reference.execute(
+                compiler.render(compiler.compile(plan)), params
+            )
+            return expected, await executor.execute(plan, params)
+        finally:
+            await reference.dispose()
+            await executor.dispose()
+
+    expected, actual = asyncio.run(run())
+    assert round(actual, 9) == round(expected, 9)
+
+    # Requested filters compile to IS NOT NULL and keep every shard
+    requested = builder.build(Intent(
+        metric=MetricName.revenue,
+        time_range=TimeRange.last_month,
+        requested_filters=[FilterIntent.region],
+    ), revenue)
+    assert [s.name for s in shard_map.shards_for(requested)] == ["eu", "us"]
+
+    unsharded = _plan("sum").model_copy(update={"fact_table": "refunds"})
+    assert shard_map.shards_for(unsharded) is None
+    assert not ShardedExecutor(ShardMap(), SQLValidator()).supports(_plan("sum"))
+
+
+def test_shard_key_groups_stream_before_every_shard_has_finished(tmp_path, monkeypatch):
+    monkeypatch.setenv("SHARD_DIR", str(tmp_path))
+    shard_map = _setup(tmp_path)
+    params = window_params(resolve_time_window("last_month"))
+    plan = _plan("sum", ("region",))
+    eu_url = shard_map.tables["orders"].shards[0].url
+
+    async def run():
+        executor = ShardedExecutor(shard_map, SQLValidator())
+        released = asyncio.Event()
+        eu = executor._databases[eu_url]
+        stream = eu.stream
+
+        async def held(sql, params=None, chunk_size=1000):
+            await released.wait()
+            async for chunk in stream(sql, params, chunk_size):
+                yield chunk
+
+        monkeypatch.setattr(eu, "stream", held)
+        try:
+            chunks = executor.stream(plan, params, chunk_size=1)
+            first = await asyncio.wait_for(chunks.__anext__(), timeout=5)
+            released.set()
+            rest = [row async for chunk in chunks for row in chunk]
+
+            limited = ShardedExecutor(shard_map, SQLValidator(), grouped_row_limit=2)
+            try:
+                capped = await limited.rows(plan, params)
+            finally:
+                await limited.dispose()
+            return first, rest, capped
+        finally:
+            await executor.dispose()
+
+    first, rest, capped = asyncio.run(run())
+    assert first[0]["region"] in REGIONS["us"]
+    assert {row["region"] for row in first + rest} == {"EU", "US", "CA"}
+    assert len(capped) == 2
+
+
+def test_overlapping_shard_values_are_rejected():
+    try:
+        ShardMap(tables={"orders": {"key": "region", "shards": [
+            {"name": "a", "url": "sqlite://", "values": ["EU"]},
+            {"name": "b", "url": "sqlite://", "values": ["EU", "US"]},
+        ]}})
+        assert False, "Expected rejection"
+    except ValueError:
+        pass
+
+
+def test_shard_sql_is_validated_once_per_plan_and_limited(tmp_path, monkeypatch):
+    monkeypatch.setenv("SHARD_DIR", str(tmp_path))
+    shard_map = _setup(tmp_path)
+    params = window_params(resolve_time_window("last_month"))
+    validated = []
+
+    class CountingValidator(SQLValidator):
+        def validate(self, sql):
+            validated.append(sql)
+            super().validate(sql)
+
+    # Every shard value filtered out: nothing to scatter to
+    registry = MetricRegistry(METRICS_PATH)
+    registry.load()
+    revenue = registry.get("revenue", "v1")
+    nowhere = QueryPlanBuilder().fact_plan(revenue.model_copy(update={
+        "required_filters": [FilterDefinition(column="users.region", operator="=", value="XX")],
+    }), "last_month")
+
+    async def run():
+        executor = ShardedExecutor(shard_map, CountingValidator(), grouped_row_limit=3)
+        try:
+            for _ in range(3):
+                await executor.execute(_plan("sum"), params)
+            pruned = await executor.execute(nowhere, params)
+            with pytest.raises(DatabaseExecutionError):
+                await executor.rows(_plan("sum", ("product",)), params)
+            return pruned
+        finally:
+            await executor.dispose()
+
+    assert asyncio.run(run()) == 0
+    # One statement per dialect and plan, not per shard or per request
+    assert len(validated) == 2
+    assert all(ast.args.get("limit") is not None for ast in validated)
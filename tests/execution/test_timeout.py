@@ -0,0 +1,127 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.execution.cache import QueryCache
+from app.core.execution.db import _statement_timeout_sql
+from app.core.execution.timeout import (
+    ClientDisconnectedError,
+    QueryTimeoutError,
+    current_deadline,
+    query_timeout,
+    run_until_disconnected,
+    run_with_deadline,
+)
+from app.core.intent.schema import Intent, MetricName, TimeRange
+
+
+def test_deadline_works_outside_the_main_thread():
+    def in_worker():
+        with query_timeout(0.01) as deadline:
+            assert current_deadline() is deadline
+            while not deadline.expired():
+                pass
+            try:
+                deadline.check()
+            except QueryTimeoutError:
+                return "timed out"
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        assert pool.submit(in_worker).result() == "timed out"
+
+
+def test_slow_call_is_cancelled_at_the_deadline():
+    cancelled = []
+
+    async def slow_driver_call():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def run():
+        with query_timeout(0.05):
+            await run_with_deadline(slow_driver_call())
+
+    try:
+        asyncio.run(run())
+        assert False, "Expected timeout"
+    except QueryTimeoutError:
+        pass
+
+    assert cancelled == [True]
+
+
+def test_statement_timeout_follows_the_deadline():
+    info = {}
+    with query_timeout(2):
+        sql = _statement_timeout_sql("mysql", info)
+    assert sql.startswith("SET SESSION MAX_EXECUTION_TIME = ")
+    assert 0 < int(sql.rsplit(" ", 1)[1]) <= 2000
+
+    # A pooled MySQL connection that carries a timeout is reset afterwards
+    assert _statement_timeout_sql("mysql", info) == "SET SESSION MAX_EXECUTION_TIME = 0"
+    assert _statement_timeout_sql("mysql", info) is None
+    assert _statement_timeout_sql("sqlite", {}) is None
+
+
+def test_client_disconnect_cancels_the_query():
+    async def disconnected():
+        return True
+
+    async def run():
+        await run_until_disconnected(asyncio.sleep(5), disconnected, poll_interval=0.01)
+
+    try:
+        asyncio.run(run())
+        assert False, "Expected disconnect"
+    except ClientDisconnectedError:
+        pass
+
+
+def test_waiter_takes_over_when_the_leader_is_cancelled():
+    cache = QueryCache()
+    intent = Intent(metric=MetricName.revenue, time_range=TimeRange.last_month)
+
+    async def hang():
+        await asyncio.sleep(5)
+
+    async def compute():
+        return 42
+
+    async def run():
+        leader = asyncio.ensure_future(cache.aget_or_compute(intent, "v1", hang))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(cache.aget_or_compute(intent, "v1", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(run()) == (42, "computed")
+
+
+def test_leader_timeout_does_not_fail_waiters_with_a_longer_budget():
+    cache = QueryCache()
+    intent = Intent(metric=MetricName.revenue, time_range=TimeRange.last_month)
+
+    async def slow():
+        await run_with_deadline(asyncio.sleep(0.2))
+        return 42
+
+    async def leader():
+        with query_timeout(0.05):
+            return await cache.aget_or_compute(intent, "v1", slow)
+
+    async def waiter():
+        with query_timeout(30):
+            return await cache.aget_or_compute(intent, "v1", slow)
+
+    async def run():
+        first = asyncio.ensure_future(leader())
+        await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(waiter())
+        return await asyncio.gather(first, second, return_exceptions=True)
+
+    timed_out, served = asyncio.run(run())
+    assert isinstance(timed_out, QueryTimeoutError)
+    assert served == (42, "computed")
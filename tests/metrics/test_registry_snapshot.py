@@ -0,0 +1,61 @@
+import json
+import os
+import shutil
+import stat
+from pathlib import Path
+
+import app.core.metrics.registry as registry_module
+from app.core.metrics.registry import MetricRegistry
+
+
+METRICS_PATH = Path(__file__).resolve().parents[2] / "metadata" / "metrics"
+
+
+def test_matching_snapshot_skips_yaml_parsing(tmp_path, monkeypatch):
+    snapshot = tmp_path / "metrics.snapshot"
+    MetricRegistry(METRICS_PATH, snapshot).load()
+    assert snapshot.exists()
+
+    def fail_parse(file):
+        raise AssertionError(f"parsed {file.name} despite a valid snapshot")
+
+    monkeypatch.setattr(registry_module, "parse_metric_file", fail_parse)
+
+    registry = MetricRegistry(METRICS_PATH, snapshot)
+    registry.load()
+    assert registry.get("revenue", "v1").measure.aggregation == "sum"
+
+
+def test_stale_snapshot_falls_back_to_yaml(tmp_path):
+    metrics_path = tmp_path / "metrics"
+    shutil.copytree(METRICS_PATH, metrics_path)
+    snapshot = tmp_path / "metrics.snapshot"
+    MetricRegistry(metrics_path, snapshot).load()
+
+    revenue = metrics_path / "revenue_v1.yaml"
+    revenue.write_text(revenue.read_text().replace("Total revenue", "Net revenue"))
+    stat = revenue.stat()
+    os.utime(revenue, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    registry = MetricRegistry(metrics_path, snapshot)
+    registry.load()
+    assert "Net revenue" in registry.get("revenue", "v1").description
+
+
+def test_snapshot_is_plain_json_in_a_private_file(tmp_path):
+    snapshot = tmp_path / "private" / "metrics.snapshot"
+    MetricRegistry(METRICS_PATH, snapshot).load()
+
+    data = json.loads(snapshot.read_text())
+    assert {entry["metric"]["metric_name"] for entry in data["files"]} >= {"revenue"}
+    assert stat.S_IMODE(snapshot.stat().st_mode) == 0o600
+    assert stat.S_IMODE(snapshot.parent.stat().st_mode) == 0o700
+
+
+def test_unreadable_snapshot_falls_back_to_yaml(tmp_path):
+    snapshot = tmp_path / "metrics.snapshot"
+    snapshot.write_bytes(b"\x80\x04not json")
+
+    registry = MetricRegistry(METRICS_PATH, snapshot)
+    registry.load()
+    assert registry.get("revenue", "v1").metric_name == "revenue"
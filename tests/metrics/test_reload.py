@@ -0,0 +1,106 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app.core.execution.backends import UnknownBackendError
+from app.core.execution.cache import QueryCache
+from app.core.intent.schema import Intent, MetricName, TimeRange
+from app.core.metrics.models import MetricDefinition
+from app.core.metrics.registry import MetricRegistry
+from app.core.metrics.reload import MetricReloader
+
+
+METRICS_PATH = Path(__file__).resolve().parents[2] / "metadata" / "metrics"
+
+
+def _registry(tmp_path):
+    shutil.copytree(METRICS_PATH, tmp_path / "metrics")
+    registry = MetricRegistry(tmp_path / "metrics")
+    registry.load()
+    return registry
+
+
+def _edit(path: Path, old: str, new: str):
+    path.write_text(path.read_text().replace(old, new))
+    # Make sure the signature changes even on coarse-mtime filesystems
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _intent(metric):
+    return Intent(metric=metric, time_range=TimeRange.last_month)
+
+
+def test_reload_swaps_only_changed_metrics_and_invalidates_them(tmp_path):
+    registry = _registry(tmp_path)
+    orders_count = registry.get("orders_count", "v1")
+
+    cache = QueryCache()
+    cache.set(_intent(MetricName.revenue), "v1", 1)
+    cache.set(_intent(MetricName.orders_count), "v1", 2)
+
+    _edit(
+        tmp_path / "metrics" / "revenue_v1.yaml",
+        "Total revenue from completed orders.",
+        "Total recognized revenue from completed orders.",
+    )
+
+    reloader = MetricReloader(registry, [cache.invalidate])
+    assert reloader.reload() == [("revenue", "v1")]
+
+    assert "recognized" in registry.get("revenue", "v1").description
+    assert registry.get("orders_count", "v1") is orders_count
+    assert cache.get(_intent(MetricName.revenue), "v1") is None
+    assert cache.get(_intent(MetricName.orders_count), "v1") == 2
+
+
+def test_invalid_edit_keeps_serving_the_previous_snapshot(tmp_path):
+    registry = _registry(tmp_path)
+    revenue = registry.get("revenue", "v1")
+
+    _edit(tmp_path / "metrics" / "revenue_v1.yaml", "aggregation: sum", "aggregation: median")
+
+    try:
+        MetricReloader(registry, []).reload()
+        assert False, "Expected rejection"
+    except Exception:
+        pass
+
+    assert registry.get("revenue", "v1") is revenue
+
+
+def test_reload_runs_the_same_check_as_load(tmp_path):
+    shutil.copytree(METRICS_PATH, tmp_path / "metrics")
+
+    def no_duckdb(metrics):
+        for metric in metrics:
+            if metric.backend == "duckdb":
+                raise UnknownBackendError(metric.backend)
+
+    registry = MetricRegistry(tmp_path / "metrics", check=no_duckdb)
+    registry.load()
+    revenue = registry.get("revenue", "v1")
+
+    _edit(tmp_path / "metrics" / "revenue_v1.yaml", "metric_name:", "backend: duckdb\nmetric_name:")
+    with pytest.raises(UnknownBackendError):
+        MetricReloader(registry, []).reload()
+
+    assert registry.get("revenue", "v1") is revenue
+
+
+def test_definition_fingerprint_is_computed_once_and_follows_copies(tmp_path, monkeypatch):
+    metric = _registry(tmp_path).get("revenue", "v1")
+    fingerprint = metric.fingerprint()
+
+    def rehash(self):
+        raise AssertionError("fingerprint recomputed on the request path")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(MetricDefinition, "_hash", rehash)
+        assert metric.fingerprint() == fingerprint
+
+    assert metric.model_copy().fingerprint() == fingerprint
+    edited = metric.model_copy(update={"description": "edited"})
+    assert edited.fingerprint() != fingerprint
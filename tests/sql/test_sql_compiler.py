@@ -0,0 +1,65 @@
+from datetime import date
+
+from app.core.enforcement.time import resolve_time_range
+from app.core.planning.query_plan import FilterPlan, JoinPlan, QueryPlan
+from app.core.sql.dialects import SQLCompiler, dialect_for_url
+from app.core.sql.validator import SQLValidator
+
+
+def _plan(**overrides):
+    fields = dict(
+        metric_name="revenue",
+        metric_version="v1",
+        fact_table="orders",
+        joins=[JoinPlan(left="orders.user_id", right="users.id", type="inner")],
+        measure_expression="orders.amount",
+        aggregation="sum",
+        filters=[FilterPlan(column="orders.status", operator="=", value="COMPLETED")],
+        group_by=[],
+        time_column="orders.order_date",
+        time_range="last_month",
+    )
+    fields.update(overrides)
+    return QueryPlan(**fields)
+
+
+def test_compiled_ast_passes_validation_without_parsing():
+    ast = SQLCompiler().compile(_plan())
+    SQLValidator().validate(ast)
+
+
+def test_rendering_is_dialect_aware_and_keeps_bind_parameters():
+    compiler = SQLCompiler(dialect="postgres")
+    sql = compiler.render(compiler.compile(_plan(
+        group_by=["region"],
+        filters=[FilterPlan(column="region", operator="IS NOT", value="NULL")],
+    )))
+
+    assert sql == (
+        "SELECT region, SUM(orders.amount) AS value FROM orders "
+        "INNER JOIN users ON orders.user_id = users.id "
+        "WHERE orders.order_date >= :start_date AND orders.order_date < :end_date "
+        "AND NOT region IS NULL GROUP BY region LIMIT 100000"
+    )
+
+
+def test_dialect_is_derived_from_database_url():
+    assert dialect_for_url("mysql+aiomysql://u@h/db") == "mysql"
+    assert dialect_for_url("postgresql+asyncpg://u@h/db") == "postgres"
+
+
+def test_relative_ranges_resolve_to_calendar_windows():
+    today = date(2024, 5, 15)
+
+    assert resolve_time_range("last_week", today) == (date(2024, 5, 6), date(2024, 5, 13))
+    assert resolve_time_range("last_month", today) == (date(2024, 4, 1), date(2024, 5, 1))
+    assert resolve_time_range("last_quarter", today) == (date(2024, 1, 1), date(2024, 4, 1))
+
+
+def test_windows_roll_over_at_the_next_period_boundary():
+    from datetime import datetime
+
+    from app.core.enforcement.time import resolve_time_window
+
+    window = resolve_time_window("last_quarter", date(2024, 5, 15))
+    assert window.rolls_over_at == datetime(2024, 7, 1)
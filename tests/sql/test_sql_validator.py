@@ -20,3 +20,54 @@ def test_missing_limit_rejected():
         assert False, "Expected rejection"
     except SQLValidationError:
         pass
+
+
+def test_cross_join_rejected():
+    sql = "SELECT SUM(amount) FROM orders CROSS JOIN users LIMIT 10"
+    try:
+        SQLValidator().validate(sql)
+        assert False, "Expected rejection"
+    except SQLValidationError:
+        pass
+
+
+def test_validated_fingerprint_skips_parsing(monkeypatch):
+    import app.core.sql.validator as module
+
+    validator = SQLValidator()
+    validator.validate("SELECT SUM(amount) FROM orders LIMIT 10")
+
+    def fail_parse(sql):
+        raise AssertionError("parsed a known-valid fingerprint")
+
+    monkeypatch.setattr(module, "parse_one", fail_parse)
+    validator.validate("SELECT SUM(amount) FROM orders LIMIT 10")
+
+
+def test_fingerprint_keeps_whitespace_that_changes_meaning():
+    validator = SQLValidator()
+    validator.validate("SELECT a FROM orders --\nWHERE tenant_id = 5 LIMIT 10")
+
+    # Same text with the newline collapsed: the comment now swallows the LIMIT
+    try:
+        validator.validate("SELECT a FROM orders -- WHERE tenant_id = 5 LIMIT 10")
+        assert False, "Expected rejection"
+    except SQLValidationError:
+        pass
+
+
+def test_custom_rules_join_the_single_pass():
+    from sqlglot.expressions import Star
+
+    def no_star(node):
+        raise SQLValidationError("SELECT * is not allowed")
+
+    validator = SQLValidator()
+    validator.validate("SELECT * FROM orders LIMIT 10")
+    validator.register_node_rule((Star,), no_star)
+
+    try:
+        validator.validate("SELECT * FROM orders LIMIT 10")
+        assert False, "Expected rejection"
+    except SQLValidationError:
+        pass
@@ -0,0 +1,84 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Measured at ~0.12 s on top of FastAPI itself; generous for slow CI hosts
+IMPORT_BUDGET_SECONDS = 0.5
+
+HEAVY_MODULES = ("sqlalchemy", "sqlglot", "pyarrow", "duckdb")
+
+_MEASURE = """
+import json, sys, time
+import fastapi
+started = time.perf_counter()
+import app.main
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "loaded": sorted(m for m in %r if m in sys.modules),
+}))
+""" % (HEAVY_MODULES,)
+
+
+def test_importing_the_app_stays_within_budget():
+    env = {k: v for k, v in os.environ.items() if k not in ("DATABASE_URL", "ASYNC_DATABASE_URL")}
+
+    # Best of three, so one slow run on a busy host does not fail the build
+    runs = [
+        json.loads(subprocess.run(
+            [sys.executable, "-c", _MEASURE],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+        ).stdout)
+        for _ in range(3)
+    ]
+
+    assert runs[0]["loaded"] == []
+    assert min(run["seconds"] for run in runs) < IMPORT_BUDGET_SECONDS
+
+
+_WARM_UP = """
+import json, sys
+from fastapi.testclient import TestClient
+from app.main import create_app
+with TestClient(create_app()):
+    print(json.dumps(sorted(m for m in ("pyarrow", "duckdb") if m in sys.modules)))
+"""
+
+
+def test_warm_up_leaves_optional_engines_unimported(tmp_path):
+    env = {k: v for k, v in os.environ.items() if k != "ASYNC_DATABASE_URL"}
+    env["DATABASE_URL"] = f"sqlite:///{tmp_path / 'warehouse.db'}"
+    for name in ("QUERY_CACHE_L2_PATH", "ROLLUP_PATH", "SHARD_MAP_PATH",
+                 "READ_REPLICA_URLS", "DUCKDB_PARQUET_PATH"):
+        env[name] = ""
+
+    loaded = json.loads(subprocess.run(
+        [sys.executable, "-c", _WARM_UP],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout.strip().splitlines()[-1])
+
+    assert loaded == []
+
+
+def test_lifespan_warms_up_before_serving(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'warehouse.db'}")
+    monkeypatch.delenv("ASYNC_DATABASE_URL", raising=False)
+    for name in ("QUERY_CACHE_L2_PATH", "ROLLUP_PATH", "SHARD_MAP_PATH", "READ_REPLICA_URLS"):
+        monkeypatch.setenv(name, "")
+
+    app = create_app()
+    container = app.state.container
+    assert "metric_registry" not in container.__dict__
+
+    with TestClient(app) as client:
+        startup = client.get("/admin/stats").json()["startup_ms"]
+        assert set(startup) >= {"metric_registry", "artifact_precompile", "pool_connect"}
+        assert len(container.artifact_cache) > 0
+        assert container.database.stats()[0]["healthy"]
@@ -0,0 +1,37 @@
+from app.core.execution.cache import QueryCache
+from app.core.intent.schema import Intent, MetricName, TimeRange
+from app.core.telemetry.instruments import CACHE_LOOKUPS, Counter, Histogram, Registry
+
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    registry = Registry()
+    histogram = registry.register(
+        Histogram("stage_seconds", "Stage time.", labelnames=("stage",), buckets=(0.1, 1.0))
+    )
+    counter = registry.register(Counter("lookups_total", "Lookups.", labelnames=("result",)))
+
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "db_execute")
+    with histogram.time("sql_validate"):
+        pass
+    counter.inc('say "hi"')
+
+    text = registry.render()
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'stage_seconds_bucket{stage="db_execute",le="0.1"} 2' in text
+    assert 'stage_seconds_bucket{stage="db_execute",le="1"} 3' in text
+    assert 'stage_seconds_bucket{stage="db_execute",le="+Inf"} 4' in text
+    assert 'stage_seconds_sum{stage="db_execute"} 3.65' in text
+    assert 'stage_seconds_count{stage="sql_validate"} 1' in text
+    assert 'lookups_total{result="say \\"hi\\""} 1' in text
+
+
+def test_query_cache_counts_hits_and_misses():
+    cache = QueryCache(name="telemetry_test")
+    intent = Intent(metric=MetricName.revenue, time_range=TimeRange.last_week)
+
+    cache.get_or_compute(intent, "v1", lambda: 1)
+    cache.get_or_compute(intent, "v1", lambda: 1)
+
+    assert CACHE_LOOKUPS.value("telemetry_test", "miss") == 1
+    assert CACHE_LOOKUPS.value("telemetry_test", "hit") == 1
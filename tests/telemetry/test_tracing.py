@@ -0,0 +1,58 @@
+import asyncio
+import pstats
+
+from app.core.telemetry.instruments import STAGE_SECONDS
+from app.core.telemetry.profiling import SamplingProfiler
+from app.core.telemetry.tracing import current_trace, request_trace, stage
+
+
+def test_trace_collects_stages_including_spawned_tasks():
+    async def run():
+        with request_trace() as trace:
+            with stage("outer"):
+                async def child():
+                    with stage("inner"):
+                        await asyncio.sleep(0)
+
+                await asyncio.create_task(child())
+        return trace
+
+    trace = asyncio.run(run())
+    body = trace.as_dict()
+
+    assert [s["stage"] for s in body["stages"]] == ["inner", "outer"]
+    assert all(s["duration_ms"] >= 0 for s in body["stages"])
+    assert current_trace() is None
+
+
+def test_disabled_trace_still_records_histogram():
+    before = STAGE_SECONDS.count("untraced_stage")
+
+    with request_trace(enabled=False) as trace:
+        with stage("untraced_stage"):
+            pass
+
+    assert trace is None
+    assert STAGE_SECONDS.count("untraced_stage") == before + 1
+
+
+def test_profiler_writes_every_nth_request(tmp_path):
+    profiler = SamplingProfiler(tmp_path, every=2)
+
+    for _ in range(4):
+        with profiler.sample("query"):
+            sum(range(100))
+
+    profiles = sorted(tmp_path.glob("query-*.prof"))
+    assert len(profiles) == 2
+    assert pstats.Stats(str(profiles[0])).total_calls > 0
+
+
+def test_profiler_disabled_by_default(tmp_path):
+    profiler = SamplingProfiler(tmp_path)
+
+    with profiler.sample("query") as profile:
+        pass
+
+    assert profile is None
+    assert not list(tmp_path.iterdir())